@@ -51,8 +51,7 @@ def process(path: str, output: str | None, fmt: str | None):
     elif target.is_dir():
         files = _collect_files(target)
         logger.info(f"📁 发现 {len(files)} 个可处理文件")
-        for f in files:
-            _process_file(f, output_dir, fmt)
+        _process_files(files, output_dir, fmt)
     else:
         click.echo(f"❌ 无效路径: {path}", err=True)
         sys.exit(1)
@@ -79,6 +78,25 @@ def _process_file(file_path: Path, output_dir: Path, fmt: str | None):
         logger.error(f"  ❌ 失败: {file_path.name} — {e}")
 
 
+def _process_files(files: list[Path], output_dir: Path, fmt: str | None):
+    """批量处理多个文件（提取与 AI 提炼阶段并发执行）"""
+    logger = logging.getLogger("deepdistill.cli")
+    try:
+        from .pipeline import Pipeline
+        pipeline = Pipeline(output_dir=output_dir, output_format=fmt)
+        results = pipeline.process_batch(files)
+    except Exception as e:
+        logger.error(f"  ❌ 批量处理失败: {e}")
+        return
+    for file_path, result in zip(files, results):
+        if result and result.output_path:
+            logger.info(f"  ✅ 完成: {result.output_path}")
+        elif result:
+            logger.error(f"  ❌ 失败: {file_path.name} — {'; '.join(result.errors)}")
+        else:
+            logger.warning(f"  ⚠️  跳过: {file_path.name}（不支持的格式或处理失败）")
+
+
 # 支持的文件扩展名
 SUPPORTED_EXTENSIONS = {
     # 视频
@@ -111,6 +111,7 @@ def extract_knowledge(
     """
     import time
 
+    from .. import cache
     from ..config import cfg
     from .llm_client import call_llm
     from .prompt_stats import prompt_stats
@@ -142,6 +143,14 @@ def extract_knowledge(
         "不要输出任何其他内容。确保 JSON 格式正确。"
     )
 
+    # 相同 prompt + 模型的结果直接复用磁盘缓存，不再调用 LLM
+    cache_key = cache.make_key(cfg.AI_PROVIDER, cfg.AI_MODEL, system_prompt, user_prompt)
+    cached = cache.get("ai", cache_key)
+    if cached is not None:
+        logger.info("AI 提炼命中缓存，跳过 LLM 调用")
+        prompt_stats.record(template_name, success=True, cache_hit=True)
+        return cached
+
     t0 = time.perf_counter()
     try:
         response, usage = call_llm(
@@ -158,6 +167,9 @@ def extract_knowledge(
             cache_hit=False,
         )
         result = _parse_json_response(response)
+        if not result.get("parse_error"):
+            # JSON 解析失败的结果不缓存，下次重新调用 LLM
+            cache.put("ai", cache_key, result)
         return result
     except Exception as e:
         duration_ms = int((time.perf_counter() - t0) * 1000)
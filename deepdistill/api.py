@@ -533,10 +533,25 @@ async def _run_url_pipeline(task_id: str, url: str):
 
             # ── Step 1: 智能探测 — yt-dlp 检测是否为视频 ──
             from .ingestion.video_downloader import (
-                probe_video, download_video, _get_platform_hint, VideoCookieRequired,
+                probe_video, download_video_async, probe_and_download_async,
+                _get_platform_hint, _looks_like_video_url, VideoCookieRequired,
             )
+            platform = _get_platform_hint(url)
+
+            def _on_video_info(info: dict):
+                # yt-dlp 开始下载前回调：先展示标题和时长
+                title = info.get("title", "")
+                task["filename"] = f"[{platform}] {title[:40]}" if title else task["filename"]
+                task["progress"] = 5
+                task["step_label"] = f"检测到{platform}视频（{info.get('duration', 0)}s），正在下载"
+
             try:
-                video_info = await loop.run_in_executor(None, probe_video, url)
+                if _looks_like_video_url(url):
+                    # 已知视频平台 / 视频直链：探测与下载合并为一次 yt-dlp 调用
+                    combined = await probe_and_download_async(url, upload_dir, _on_video_info)
+                    file_path, video_info = combined if combined else (None, None)
+                else:
+                    video_info = await loop.run_in_executor(None, probe_video, url)
             except VideoCookieRequired as e:
                 # 确认是视频平台但需要 Cookie → 直接报错，不降级为网页
                 task["status"] = "failed"
@@ -548,14 +563,9 @@ async def _run_url_pipeline(task_id: str, url: str):
             if video_info:
                 # ── 视频路径：yt-dlp 下载 → ASR 转文字 ──
                 is_video = True
-                platform = _get_platform_hint(url)
-                title = video_info.get("title", "")
-                duration = video_info.get("duration", 0)
-                task["filename"] = f"[{platform}] {title[:40]}" if title else task["filename"]
-                task["progress"] = 5
-                task["step_label"] = f"检测到{platform}视频（{duration}s），正在下载"
-
-                file_path = await loop.run_in_executor(None, download_video, url, upload_dir)
+                if file_path is None:
+                    _on_video_info(video_info)
+                    file_path = await download_video_async(url, upload_dir)
 
                 task["progress"] = 15
                 task["step_label"] = f"视频下载完成，开始语音转文字"
@@ -0,0 +1,87 @@
+"""
+结果磁盘缓存
+按输入内容哈希缓存耗时层的结果，重复处理同一文件时跳过 ASR/OCR 与 LLM 调用：
+- extract：文本提取结果，键 = 文件路径 + 大小 + mtime + 影响提取结果的配置
+- ai：AI 提炼结果，键 = 完整 prompt + LLM 提供方/模型（模板内容变化即自动失效）
+
+每条缓存是 <缓存目录>/<命名空间>/<键前 2 位>/<键>.json，写入时先写临时文件再原子替换，
+多线程/多进程并发读写安全。清空缓存直接删除缓存目录即可。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import orjson  # 可选：快速 JSON 序列化
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("deepdistill.cache")
+
+RESULT_CACHE_ENABLE = os.getenv("DEEPDISTILL_RESULT_CACHE", "1") == "1"
+
+
+def _cache_dir() -> Path:
+    from .config import cfg
+
+    return Path(os.getenv("DEEPDISTILL_RESULT_CACHE_DIR", str(cfg.MODEL_CACHE_DIR / "results")))
+
+
+def make_key(*parts) -> str:
+    """由任意可 JSON 序列化的部分计算缓存键（sha1 十六进制；固定用标准库 json，是否安装 orjson 键都一致）"""
+    data = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+def file_key(file_path: Path, *parts) -> str | None:
+    """以文件身份（绝对路径 + 大小 + mtime）及附加部分计算缓存键；文件不存在时返回 None（不缓存）"""
+    try:
+        st = file_path.stat()
+    except OSError:
+        return None
+    return make_key(str(file_path.resolve()), st.st_size, st.st_mtime_ns, *parts)
+
+
+def get(namespace: str, key: str | None) -> dict | None:
+    """读取缓存；未启用、未命中或缓存文件损坏时返回 None"""
+    if not RESULT_CACHE_ENABLE or key is None:
+        return None
+    path = _cache_dir() / namespace / key[:2] / f"{key}.json"
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except ValueError:
+        logger.warning(f"缓存文件损坏，已忽略: {path}")
+        return None
+
+
+def put(namespace: str, key: str | None, value: dict):
+    """写入缓存；失败（磁盘满、无权限等）只记录日志，不影响主流程"""
+    if not RESULT_CACHE_ENABLE or key is None:
+        return
+    path = _cache_dir() / namespace / key[:2] / f"{key}.json"
+    try:
+        if orjson is not None:
+            data = orjson.dumps(value)
+        else:
+            data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"写入缓存失败: {e}")
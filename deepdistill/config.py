@@ -57,10 +57,16 @@ class Config:
     ASR_MODEL: str = _yaml.get("asr", {}).get("model", "base")
     ASR_LANGUAGE: str | None = _yaml.get("asr", {}).get("language", None)
     ASR_DEVICE: str = _yaml.get("asr", {}).get("device", "auto")
+    # 解码 beam 宽度：1 = 贪心解码（最快）；低信噪比音频可调回 5
+    ASR_BEAM_SIZE: int = int(_yaml.get("asr", {}).get("beam_size", 1))
+    # CTranslate2 计算精度：auto = CUDA 用 int8_float16、CPU 用 int8；也可指定 float16 / int8 / float32 等
+    ASR_COMPUTE_TYPE: str = _yaml.get("asr", {}).get("compute_type", "auto")
 
     # OCR 配置
     OCR_ENGINE: str = _yaml.get("ocr", {}).get("engine", "easyocr")
     OCR_LANGUAGES: list[str] = _yaml.get("ocr", {}).get("languages", ["ch_sim", "en"])
+    # PaddleOCR 方向分类器：对每个文本框额外跑一次旋转分类，仅倒置/旋转拍摄的图片需要开启
+    OCR_USE_ANGLE_CLS: bool = bool(_yaml.get("ocr", {}).get("use_angle_cls", False))
 
     # AI 分析配置
     AI_PROVIDER: str = _yaml.get("ai", {}).get("provider", "ollama")
@@ -72,6 +78,24 @@ class Config:
 
     # 视频分析配置
     VIDEO_ANALYSIS_LEVEL: str = _yaml.get("video_analysis", {}).get("level", "off")
+    # 物体检测时每次送入 YOLOv8 的关键帧数（批量推理）
+    VIDEO_YOLO_BATCH: int = int(_yaml.get("video_analysis", {}).get("yolo_batch", 16))
+    # 逐场景分析（姿态/景别/构图/运动等）的并行线程数
+    VIDEO_WORKERS: int = int(_yaml.get("video_analysis", {}).get("workers", min(4, os.cpu_count() or 1)))
+    # 视频分析解码时是否请求 FFmpeg 硬件解码（OpenCV 不支持时自动回退软件解码）
+    VIDEO_HW_DECODE: bool = bool(_yaml.get("video_analysis", {}).get("hw_decode", True))
+    # 场景关键帧预解码缓存上限（MB），物体/动作/拍摄手法分析共用；0 表示不预解码
+    VIDEO_KEYFRAME_CACHE_MB: int = int(_yaml.get("video_analysis", {}).get("keyframe_cache_mb", 1024))
+    # MediaPipe Pose 模型复杂度：0 = Lite（默认，最快）/ 1 = Full / 2 = Heavy
+    VIDEO_POSE_MODEL_COMPLEXITY: int = int(_yaml.get("video_analysis", {}).get("pose_model_complexity", 0))
+    # MediaPipe 姿态检测的工作进程数（≤1 时在本进程内串行推理）
+    VIDEO_POSE_PROCESSES: int = int(_yaml.get("video_analysis", {}).get("pose_processes", min(4, os.cpu_count() or 1)))
+    # 风格分析/转场检测的常驻工作进程数（多个视频并发分析时各自在独立进程中解码；0 = 在本进程内执行）
+    VIDEO_STAGE_PROCESSES: int = int(_yaml.get("video_analysis", {}).get(
+        "stage_processes", min(4, os.cpu_count() or 1)))
+    # OpenCV DNN 人脸检测模型目录（FACE_DNN_FILES 两个文件齐全时启用，否则回退 Haar 级联）
+    VIDEO_FACE_MODEL_DIR: Path = Path(_yaml.get("video_analysis", {}).get(
+        "face_model_dir", str(MODEL_CACHE_DIR / "face_detector"))).expanduser()
 
     # 输出配置
     OUTPUT_FORMAT: str = _yaml.get("output", {}).get("format", "markdown")
@@ -121,8 +145,15 @@ class Config:
     def to_dict(cls) -> dict:
         """导出当前配置为字典（脱敏）"""
         return {
-            "asr": {"model": cls.ASR_MODEL, "language": cls.ASR_LANGUAGE, "device": cls.get_device()},
-            "ocr": {"engine": cls.OCR_ENGINE, "languages": cls.OCR_LANGUAGES},
+            "asr": {
+                "model": cls.ASR_MODEL, "language": cls.ASR_LANGUAGE,
+                "device": cls.get_device(), "beam_size": cls.ASR_BEAM_SIZE,
+                "compute_type": cls.ASR_COMPUTE_TYPE,
+            },
+            "ocr": {
+                "engine": cls.OCR_ENGINE, "languages": cls.OCR_LANGUAGES,
+                "use_angle_cls": cls.OCR_USE_ANGLE_CLS,
+            },
             "ai": {
                 "provider": cls.AI_PROVIDER,
                 "model": cls.AI_MODEL,
@@ -130,7 +161,13 @@ class Config:
                 "has_api_key": bool(cls.DEEPSEEK_API_KEY or cls.QWEN_API_KEY),
                 "prompt_template": cls.AI_PROMPT_TEMPLATE,
             },
-            "video_analysis": {"level": cls.VIDEO_ANALYSIS_LEVEL},
+            "video_analysis": {
+                "level": cls.VIDEO_ANALYSIS_LEVEL, "yolo_batch": cls.VIDEO_YOLO_BATCH,
+                "workers": cls.VIDEO_WORKERS, "pose_processes": cls.VIDEO_POSE_PROCESSES,
+                "pose_model_complexity": cls.VIDEO_POSE_MODEL_COMPLEXITY, "stage_processes": cls.VIDEO_STAGE_PROCESSES,
+                "hw_decode": cls.VIDEO_HW_DECODE, "keyframe_cache_mb": cls.VIDEO_KEYFRAME_CACHE_MB,
+                "face_model_dir": str(cls.VIDEO_FACE_MODEL_DIR),
+            },
             "output": {"format": cls.OUTPUT_FORMAT},
             "export": {
                 "google_docs": {
@@ -0,0 +1,138 @@
+"""
+上传缓冲区池
+导出 .docx/.xlsx 时复用预分配的 bytearray 内存块，避免批量导出时每份文件都重新分配缓冲区。
+按 64 KB / 1 MB / 16 MB 三档分级缓存，每档最多保留固定数量，超出或超大的缓冲区直接交给 GC。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import queue
+
+logger = logging.getLogger("deepdistill.export.bufpool")
+
+# 分级大小（字节），从小到大
+SIZE_CLASSES = (64 * 1024, 1024 * 1024, 16 * 1024 * 1024)
+# 每个分级最多缓存的缓冲区数量（与上传线程数同量级即可）
+MAX_PER_CLASS = 4
+
+_pools: dict[int, queue.LifoQueue] = {size: queue.LifoQueue(maxsize=MAX_PER_CLASS) for size in SIZE_CLASSES}
+
+
+class PooledBuffer(io.BufferedIOBase):
+    """
+    基于 bytearray 内存块的可读写、可 seek 文件对象。
+    写入超出容量时自动扩容；用完调用 release() 归还到池中。
+    满足 zipfile（openpyxl / python-docx 保存）和 MediaIoBaseUpload（分块上传）的接口要求。
+    """
+
+    def __init__(self, slab: bytearray, size_class: int | None):
+        super().__init__()
+        self._slab = slab
+        self._size_class = size_class
+        self._pos = 0
+        self._len = 0
+        self._released = False
+
+    # ── 文件对象接口 ──
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._len + offset
+        else:
+            raise ValueError(f"无效的 whence: {whence}")
+        if pos < 0:
+            raise ValueError(f"无效的偏移: {pos}")
+        self._pos = pos
+        return pos
+
+    def write(self, data) -> int:
+        view = memoryview(data).cast("B")
+        n = len(view)
+        end = self._pos + n
+        if end > len(self._slab):
+            # 容量不足：按 2 倍扩容（扩容后不再归还池中）
+            self._slab.extend(bytes(max(end, 2 * len(self._slab)) - len(self._slab)))
+        if self._pos > self._len:
+            self._slab[self._len:self._pos] = bytes(self._pos - self._len)
+        self._slab[self._pos:end] = view
+        self._pos = end
+        self._len = max(self._len, end)
+        return n
+
+    def read(self, size: int | None = -1) -> bytes:
+        if size is None or size < 0:
+            end = self._len
+        else:
+            end = min(self._len, self._pos + size)
+        if self._pos >= end:
+            return b""
+        data = bytes(self._slab[self._pos:end])
+        self._pos = end
+        return data
+
+    read1 = read
+
+    def truncate(self, size: int | None = None) -> int:
+        self._len = self._pos if size is None else min(size, self._len)
+        return self._len
+
+    def getvalue(self) -> bytes:
+        return bytes(self._slab[:self._len])
+
+    def digest(self) -> str:
+        """已写入内容的 sha1 十六进制摘要（直接哈希内存块，不复制数据）"""
+        return hashlib.sha1(memoryview(self._slab)[:self._len]).hexdigest()
+
+    # ── 池管理 ──
+
+    def release(self):
+        """归还内存块（重复调用无副作用）；扩容过或不属于任何分级的内存块直接丢弃"""
+        if self._released:
+            return
+        self._released = True
+        slab, self._slab = self._slab, bytearray()
+        if self._size_class is None or len(slab) != self._size_class:
+            return
+        try:
+            _pools[self._size_class].put_nowait(slab)
+        except queue.Full:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+def acquire(min_size: int) -> PooledBuffer:
+    """获取容量 ≥ min_size 的缓冲区；超过最大分级时临时分配，不入池"""
+    for size_class in SIZE_CLASSES:
+        if min_size <= size_class:
+            try:
+                slab = _pools[size_class].get_nowait()
+            except queue.Empty:
+                slab = bytearray(size_class)
+            return PooledBuffer(slab, size_class)
+    logger.debug(f"缓冲区需求 {min_size} 字节超过最大分级，临时分配")
+    return PooledBuffer(bytearray(min_size), None)
@@ -9,28 +9,131 @@ Google Drive 多格式导出器
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import io
 import json
 import logging
+import random
+import re
 import tempfile
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 import markdown
 
+from ..config import cfg
+from . import bufpool
+
 logger = logging.getLogger("deepdistill.export.google_docs")
 
 # Google Drive API 上传重试配置
 GDRIVE_MAX_RETRIES = 3
 GDRIVE_RETRY_DELAY = 2  # 秒，指数退避基数
+GDRIVE_RETRY_MAX_DELAY = 30  # 秒，单次退避上限
+GDRIVE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 分块续传块大小（需为 256 KB 整数倍）
+GDRIVE_MAX_QPS = 8  # 进程内 Drive API 调用速率上限（Drive 单用户限额约 10 QPS）
+
+# 内存缓冲区最小预分配大小（空 xlsx 压缩后约 5 KB；python-docx 默认模板约 36 KB）
+XLSX_MIN_BUFFER_SIZE = 64 * 1024
+DOCX_MIN_BUFFER_SIZE = 64 * 1024
+
+# 后台上传线程数（超过 3 路并发上传会互相争抢带宽）
+GDRIVE_UPLOAD_WORKERS = 3
+
+# 分类文档计数单页上限（Drive API 允许的最大 pageSize）
+GDRIVE_COUNT_PAGE_SIZE = 1000
+
+# Google Drive API HTTP 超时（秒）
+GDRIVE_HTTP_TIMEOUT = 60
 
 # Google API 所需权限范围
 SCOPES = [
     "https://www.googleapis.com/auth/drive.file",  # 仅管理本应用创建的文件
 ]
 
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+_DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+_XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# 上传线程池（模块级共享）：格式化下一份文档时，上一份文档的 Drive 上传在后台进行
+_upload_executor = ThreadPoolExecutor(
+    max_workers=GDRIVE_UPLOAD_WORKERS, thread_name_prefix="gdrive-upload",
+)
+# 进行中的上传：(category, title, 内容键) -> Future，同目录、同名且内容相同的重复提交复用同一个 Future
+_pending_uploads: dict[tuple[str, str, str], Future] = {}
+_pending_lock = threading.Lock()
+
+
+def _content_key(data, mime_type: str) -> str | None:
+    """
+    上传去重用的内容键：MIME 类型 + 内容 sha1。同名但内容不同的文件（不同任务恰好生成相同短标题）各自上传。
+    无法在不读取的情况下取得内容的文件对象返回 None（不去重）。
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        digest = hashlib.sha1(data).hexdigest()
+    elif isinstance(data, bufpool.PooledBuffer):
+        digest = data.digest()
+    else:
+        return None
+    return f"{mime_type}:{digest}"
+
+
+class _TokenBucket:
+    """简易令牌桶：限制进程内所有线程的 Drive API 调用速率，避免并发上传触发 429"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取一个令牌，不足时阻塞等待补充"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_drive_throttle = _TokenBucket(rate=GDRIVE_MAX_QPS, capacity=GDRIVE_MAX_QPS)
+
+
+def _retry_wait(attempt: int, error: Exception) -> float:
+    """
+    计算第 attempt 次失败后的等待秒数。
+    429/503 响应带 Retry-After 时按服务端要求等待；否则使用 full jitter 指数退避，
+    避免多个上传线程同步重试形成重试风暴。
+    """
+    resp = getattr(error, "resp", None)
+    if resp is not None and getattr(resp, "status", None) in (429, 503):
+        retry_after = resp.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), GDRIVE_RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+    return random.uniform(0, min(GDRIVE_RETRY_MAX_DELAY, GDRIVE_RETRY_DELAY * (2 ** attempt)))
+
+
+def _has_chinese(text: str) -> bool:
+    """检测文本是否包含中文字符"""
+    return bool(_CJK_RE.search(text))
+
 
 class GoogleDocsExporter:
     """Google Docs 导出器：Markdown -> HTML -> Google Doc，支持按分类子文件夹管理"""
@@ -56,7 +159,10 @@ class GoogleDocsExporter:
         self.credentials_path = Path(credentials_path)
         self.token_path = Path(token_path)
         self.folder_name = folder_name
-        self._drive_service = None
+        self._creds = None
+        self._creds_lock = threading.Lock()
+        # httplib2.Http 非线程安全：每个线程持有独立的 service + 长连接，线程内复用 TLS 连接
+        self._local = threading.local()
         self._folder_id: str | None = None
         self._subfolder_cache: dict[str, str] = {}  # category -> folder_id
 
@@ -107,15 +213,29 @@ class GoogleDocsExporter:
 
         return creds
 
-    def _get_drive_service(self):
-        """获取 Google Drive API 服务实例（懒加载 + 缓存）"""
-        if self._drive_service is None:
-            from googleapiclient.discovery import build
+    def _get_credentials(self):
+        """获取 OAuth2 凭据（进程内只认证一次，多线程共享）"""
+        with self._creds_lock:
+            if self._creds is None:
+                self._creds = self._authenticate()
+            return self._creds
 
-            creds = self._authenticate()
-            self._drive_service = build("drive", "v3", credentials=creds)
-            logger.info("Google Drive API 服务已初始化")
-        return self._drive_service
+    def _get_drive_service(self):
+        """获取当前线程的 Google Drive API 服务实例（懒加载 + 线程内缓存）"""
+        service = getattr(self._local, "drive_service", None)
+        if service is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.discovery import build_from_document
+
+            # 共享凭据与已解析的 discovery 文档，每线程一个持久 Http，后续 execute() 复用同一 TLS 连接
+            authed_http = AuthorizedHttp(
+                self._get_credentials(), http=httplib2.Http(timeout=GDRIVE_HTTP_TIMEOUT)
+            )
+            service = build_from_document(_drive_discovery_doc(), http=authed_http)
+            self._local.drive_service = service
+            logger.info(f"Google Drive API 服务已初始化（线程 {threading.current_thread().name}）")
+        return service
 
     def _ensure_folder(self) -> str:
         """确保 Google Drive 中存在目标文件夹，返回文件夹 ID"""
@@ -131,7 +251,7 @@ class GoogleDocsExporter:
             "and trashed = false"
         )
         results = service.files().list(
-            q=query, spaces="drive", fields="files(id, name)", pageSize=1
+            q=query, spaces="drive", fields="files(id)", pageSize=1
         ).execute()
 
         files = results.get("files", [])
@@ -168,7 +288,7 @@ class GoogleDocsExporter:
             "and trashed = false"
         )
         results = service.files().list(
-            q=query, spaces="drive", fields="files(id, name)", pageSize=1
+            q=query, spaces="drive", fields="files(id)", pageSize=1
         ).execute()
 
         files = results.get("files", [])
@@ -225,15 +345,7 @@ class GoogleDocsExporter:
             doc_count = 0
             folder_url = None
             if fid:
-                doc_query = (
-                    f"'{fid}' in parents "
-                    "and trashed = false"
-                )
-                docs = service.files().list(
-                    q=doc_query, spaces="drive",
-                    fields="files(id)", pageSize=200,
-                ).execute().get("files", [])
-                doc_count = len(docs)
+                doc_count = self._count_folder_docs(service, fid)
                 folder_url = f"https://drive.google.com/drive/folders/{fid}"
             result.append({
                 "name": cat_name,
@@ -246,23 +358,29 @@ class GoogleDocsExporter:
         for folder_name, fid in sorted(drive_folders.items()):
             if folder_name in seen:
                 continue
-            doc_query = (
-                f"'{fid}' in parents "
-                "and trashed = false"
-            )
-            docs = service.files().list(
-                q=doc_query, spaces="drive",
-                fields="files(id)", pageSize=200,
-            ).execute().get("files", [])
             result.append({
                 "name": folder_name,
-                "doc_count": len(docs),
+                "doc_count": self._count_folder_docs(service, fid),
                 "folder_url": f"https://drive.google.com/drive/folders/{fid}",
                 "is_custom": True,
             })
 
         return result
 
+    @staticmethod
+    def _count_folder_docs(service, folder_id: str) -> int:
+        """
+        统计文件夹内文档数（只取 id 字段，单页最多 1000 条）。
+        前端只展示数量，超过一页时不再继续翻页，按单页上限计数。
+        """
+        resp = service.files().list(
+            q=f"'{folder_id}' in parents and trashed = false",
+            spaces="drive",
+            fields="files(id)",
+            pageSize=GDRIVE_COUNT_PAGE_SIZE,
+        ).execute()
+        return len(resp.get("files", []))
+
     def _markdown_to_html(self, md_content: str) -> str:
         """将 Markdown 转为带基本样式的 HTML"""
         html_body = markdown.markdown(
@@ -336,23 +454,7 @@ th {{ background: #f5f5f5; font-weight: bold; }}
         )
 
         # 带重试的上传（防止网络抖动/API 限流）
-        last_error = None
-        for attempt in range(GDRIVE_MAX_RETRIES):
-            try:
-                file = service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields="id, webViewLink, name",
-                ).execute()
-                break
-            except Exception as e:
-                last_error = e
-                if attempt < GDRIVE_MAX_RETRIES - 1:
-                    wait = GDRIVE_RETRY_DELAY * (2 ** attempt)
-                    logger.warning(f"Google Drive 上传失败（第 {attempt + 1} 次）: {e}，{wait}s 后重试")
-                    time.sleep(wait)
-                else:
-                    raise RuntimeError(f"Google Drive 上传失败（已重试 {GDRIVE_MAX_RETRIES} 次）: {last_error}")
+        file = self._create_with_retry(service, file_metadata, media)
 
         doc_id = file["id"]
         doc_url = file.get("webViewLink", f"https://docs.google.com/document/d/{doc_id}/edit")
@@ -384,16 +486,10 @@ th {{ background: #f5f5f5; font-weight: bold; }}
         优先级：summary 中文摘要 > key_points 第一条 > 中文 keywords > 文件名
         强制中文输出：如果提取到英文，则从 summary 中截取中文部分。
         """
-        import re
-
         result = task.get("result", {})
         ai = result.get("ai_result") or result.get("ai_analysis") or {}
         filename = task.get("filename", "未知文件")
 
-        def _has_chinese(text: str) -> bool:
-            """检测文本是否包含中文字符"""
-            return bool(re.search(r'[\u4e00-\u9fff]', text))
-
         def _extract_from_summary(summary: str) -> str | None:
             """从 summary 中提取 ≤8 字的中文短标题"""
             if not summary:
@@ -407,7 +503,7 @@ th {{ background: #f5f5f5; font-weight: bold; }}
                 '', summary
             )
             # 跳过开头的英文/数字/空格/标点，找到第一个中文字符
-            cn_start = re.search(r'[\u4e00-\u9fff]', summary)
+            cn_start = _CJK_RE.search(summary)
             if cn_start:
                 summary = summary[cn_start.start():]
             # 跳过开头的虚词（"的/在/了/是/有/和/与"等）
@@ -492,7 +588,7 @@ th {{ background: #f5f5f5; font-weight: bold; }}
             md_lines += ["## 摘要", "", ai_result["summary"], ""]
         # 风格分析结果（intent=style 时 style_analysis 模板产出）
         if ai_result.get("style_tags"):
-            md_lines += ["## 风格标签", "", " ".join(f"`{t}`" for t in ai_result["style_tags"]), ""]
+            md_lines += ["## 风格标签", "", " ".join([f"`{t}`" for t in ai_result["style_tags"]]), ""]
         if ai_result.get("visual_elements"):
             md_lines += ["## 视觉元素", "", ai_result["visual_elements"], ""]
         if ai_result.get("color_palette"):
@@ -502,7 +598,7 @@ th {{ background: #f5f5f5; font-weight: bold; }}
             md_lines += [f"- {p}" for p in ai_result["key_points"]]
             md_lines.append("")
         if ai_result.get("keywords"):
-            md_lines += ["## 关键词", "", " ".join(f"`{kw}`" for kw in ai_result["keywords"]), ""]
+            md_lines += ["## 关键词", "", " ".join([f"`{kw}`" for kw in ai_result["keywords"]]), ""]
 
         # 普通文档中不再包含原始文本（已有独立的 [源文件] 文档）
         raw_text = result.get("extracted_text") or result.get("raw_text", "")
@@ -532,7 +628,7 @@ th {{ background: #f5f5f5; font-weight: bold; }}
         # 关键词标签
         keywords = ai.get("keywords", [])
         if keywords:
-            lines += ["**标签**: " + " ".join(f"`#{kw}`" for kw in keywords), ""]
+            lines += ["**标签**: " + " ".join([f"`#{kw}`" for kw in keywords]), ""]
 
         # 知识要点
         key_points = ai.get("key_points", [])
@@ -695,51 +791,154 @@ th {{ background: #f5f5f5; font-weight: bold; }}
             if category not in self.CATEGORIES:
                 logger.info(f"使用自定义分类目录「{category}」")
 
-        def _export_one(md_content: str, title: str, doc_type: str = "doc") -> dict:
-            """根据 export_format 选择导出方式；doc_type 用于 Word/Excel 样式细分（doc | skill）。"""
+        # 并发上传前先在当前线程建好子目录，避免多个上传线程重复创建同名文件夹
+        self._ensure_subfolder(category)
+
+        def _export_one(md_content: str, title: str, doc_type: str = "doc") -> Future:
+            """根据 export_format 选择导出方式；doc_type 用于 Word/Excel 样式细分（doc | skill）。
+            文件在当前线程生成，上传提交到后台线程池，返回 Future。"""
             if export_format == "word":
-                return self._export_as_word(md_content, title, category=category, doc_type=doc_type)
+                return self._export_as_word(md_content, title, category=category, doc_type=doc_type, wait=False)
             elif export_format == "excel":
-                return self._export_as_excel(task, title, category=category, doc_type=doc_type)
+                return self._export_as_excel(task, title, category=category, doc_type=doc_type, wait=False)
             else:
-                return self.export_markdown(md_content, title, category=category)
+                return self._submit_upload(
+                    category, title, _content_key(md_content, "text/markdown"),
+                    self.export_markdown, md_content, title, category=category,
+                )
 
-        results = []
+        futures = []
 
         if fmt == "both":
             md_doc, title_doc = self._build_doc_markdown(task)
-            results.append(_export_one(md_doc, title_doc, doc_type="doc"))
+            futures.append(_export_one(md_doc, title_doc, doc_type="doc"))
 
             md_skill, title_skill = self._build_skill_markdown(task)
-            results.append(_export_one(md_skill, title_skill, doc_type="skill"))
+            futures.append(_export_one(md_skill, title_skill, doc_type="skill"))
 
         elif fmt == "skill":
             md_content, title = self._build_skill_markdown(task)
-            results.append(_export_one(md_content, title, doc_type="skill"))
+            futures.append(_export_one(md_content, title, doc_type="skill"))
         else:
             md_content, title = self._build_doc_markdown(task)
-            results.append(_export_one(md_content, title, doc_type="doc"))
+            futures.append(_export_one(md_content, title, doc_type="doc"))
 
         # ── 额外导出源文件（完整原始文本，始终用 Google Doc 格式） ──
         raw_text = (result.get("extracted_text") or result.get("raw_text", ""))
+        raw_future = None
         if raw_text:
             md_raw, title_raw = self._build_raw_markdown(task)
-            raw_result = self.export_markdown(md_raw, title_raw, category=category)
+            raw_future = self._submit_upload(
+                category, title_raw, _content_key(md_raw, "text/markdown"),
+                self.export_markdown, md_raw, title_raw, category=category,
+            )
+
+        # 等待全部上传完成（重试在各上传线程内部进行），保持返回顺序不变
+        results = [f.result() for f in futures]
+        if raw_future is not None:
+            raw_result = dict(raw_future.result())
             raw_result["is_raw"] = True  # 标记为源文件
             results.append(raw_result)
             logger.info(f"已导出源文件: {title_raw}")
 
         return results
 
+    # ── 后台上传 ──
+
+    @staticmethod
+    def _create_with_retry(service, file_metadata: dict, media) -> dict:
+        """带限流与重试的 files().create（防止网络抖动/API 限流）"""
+        last_error = None
+        for attempt in range(GDRIVE_MAX_RETRIES):
+            _drive_throttle.acquire()
+            try:
+                return service.files().create(
+                    body=file_metadata,
+                    media_body=media,
+                    fields="id,webViewLink",
+                ).execute()
+            except Exception as e:
+                last_error = e
+                if attempt < GDRIVE_MAX_RETRIES - 1:
+                    wait = _retry_wait(attempt, e)
+                    logger.warning(f"Google Drive 上传失败（第 {attempt + 1} 次）: {e}，{wait:.1f}s 后重试")
+                    time.sleep(wait)
+        raise RuntimeError(f"Google Drive 上传失败（已重试 {GDRIVE_MAX_RETRIES} 次）: {last_error}")
+
+    @staticmethod
+    def _upload_resumable(service, file_metadata: dict, media) -> dict:
+        """
+        以 next_chunk() 驱动的分块续传：失败只重传当前分块，已上传部分不会重发。
+        连续失败 GDRIVE_MAX_RETRIES 次后放弃。
+        """
+        request = service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields="id,webViewLink",
+        )
+        response = None
+        failures = 0
+        while response is None:
+            _drive_throttle.acquire()
+            try:
+                status, response = request.next_chunk()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                if failures >= GDRIVE_MAX_RETRIES:
+                    raise RuntimeError(f"Google Drive 上传失败（已重试 {GDRIVE_MAX_RETRIES} 次）: {e}")
+                wait = _retry_wait(failures - 1, e)
+                logger.warning(f"Google Drive 分块上传失败（第 {failures} 次）: {e}，{wait:.1f}s 后重试")
+                time.sleep(wait)
+                continue
+            if status is not None:
+                logger.debug(f"上传进度 {file_metadata.get('name')}: {int(status.progress() * 100)}%")
+        return response
+
+    @staticmethod
+    def _submit_upload(category: str | None, title: str, content_key: str | None, fn, /, *args, **kwargs) -> Future:
+        """
+        将上传任务提交到模块级线程池；同一目录下同名、内容相同（content_key 一致，见 _content_key）的文件
+        正在上传时直接复用其 Future。content_key 为 None 时不去重。
+        """
+        if content_key is None:
+            return _upload_executor.submit(fn, *args, **kwargs)
+        key = (category or "其他", title, content_key)
+        with _pending_lock:
+            pending = _pending_uploads.get(key)
+            if pending is not None and not pending.done():
+                logger.info(f"「{title}」已在上传队列中，复用进行中的任务")
+                return pending
+            future = _upload_executor.submit(fn, *args, **kwargs)
+            _pending_uploads[key] = future
+
+        def _release(f: Future):
+            with _pending_lock:
+                if _pending_uploads.get(key) is f:
+                    del _pending_uploads[key]
+
+        future.add_done_callback(_release)
+        return future
+
+    def async_upload_binary_to_drive(
+        self, data: io.BufferedIOBase | bytes, title: str, mime_type: str, category: str | None = None,
+    ) -> Future:
+        """_upload_binary_to_drive 的异步版本：立即返回 Future，上传与重试在后台线程完成"""
+        return self._submit_upload(
+            category, title, _content_key(data, mime_type), self._upload_binary_to_drive,
+            data, title=title, mime_type=mime_type, category=category,
+        )
+
     # ── Word (.docx) 导出 ──
 
     def _export_as_word(
         self, md_content: str, title: str, category: str | None = None,
-        doc_type: str = "doc",
-    ) -> dict:
+        doc_type: str = "doc", wait: bool = True,
+    ) -> dict | Future:
         """
         将 Markdown 内容生成 .docx 文件并上传到 Google Drive。
         doc_type 为 skill 时使用 Skill 文档样式（标题更醒目、强调层级）。
+        wait=False 时上传提交到后台线程池，返回 Future。
         """
         from docx import Document
         from docx.shared import Pt, Inches, RGBColor
@@ -788,31 +987,30 @@ th {{ background: #f5f5f5; font-weight: bold; }}
                 doc.add_paragraph(stripped)
             # 空行跳过
 
-        # 保存到内存缓冲区
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
+        # 保存到池化缓冲区
+        buffer = bufpool.acquire(DOCX_MIN_BUFFER_SIZE)
+        try:
+            doc.save(buffer)
+        except Exception:
+            buffer.release()
+            raise
 
         # 上传到 Google Drive
-        return self._upload_binary_to_drive(
-            buffer.read(),
-            title=f"{title}.docx",
-            mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            category=category,
-        )
+        return self._upload_pooled(buffer, f"{title}.docx", _DOCX_MIME, category, wait)
 
     # ── Excel (.xlsx) 导出 ──
 
     def _export_as_excel(
         self, task: dict, title: str, category: str | None = None,
-        doc_type: str = "doc",
-    ) -> dict:
+        doc_type: str = "doc", wait: bool = True,
+    ) -> dict | Future:
         """
         将任务结构化数据生成 .xlsx 文件并上传到 Google Drive。
         doc_type 为 skill 时使用 Skill 样式（蓝绿系表头、规则/步骤独立 Sheet）。
+        wait=False 时上传提交到后台线程池，返回 Future。
         """
         from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+        from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
 
         result = task.get("result", {})
         ai = result.get("ai_result") or result.get("ai_analysis") or {}
@@ -821,164 +1019,159 @@ th {{ background: #f5f5f5; font-weight: bold; }}
 
         wb = Workbook()
 
-        # ── Sheet 1: 摘要 ──
-        ws_summary = wb.active
-        ws_summary.title = "摘要"
-
         # 样式定义：普通文档蓝表头，Skill 文档绿表头
-        header_font = Font(bold=True, size=12, color="FFFFFF")
-        header_fill = PatternFill(
-            start_color="34A853" if is_skill else "4285F4",
-            end_color="34A853" if is_skill else "4285F4",
-            fill_type="solid",
-        )
+        # 以 NamedStyle 注册一次，单元格按名称引用，避免逐格构造 Border/Alignment 触发样式表去重
         thin_border = Border(
             left=Side(style="thin"),
             right=Side(style="thin"),
             top=Side(style="thin"),
             bottom=Side(style="thin"),
         )
-
-        # 标题行
-        ws_summary.append(["字段", "内容"])
-        for cell in ws_summary[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.border = thin_border
-            cell.alignment = Alignment(horizontal="center")
-
-        # 数据行
-        rows = [
-            ("文件名", filename),
-            ("文件类型", result.get("source_type", "未知")),
-            ("提取文本长度", str(result.get("extracted_text_length", 0)) + " 字符"),
-            ("摘要", ai.get("summary", "")),
+        header_color = "34A853" if is_skill else "4285F4"
+        named_styles = [
+            NamedStyle(
+                name="dd_header",
+                font=Font(bold=True, size=12, color="FFFFFF"),
+                fill=PatternFill(start_color=header_color, end_color=header_color, fill_type="solid"),
+                border=thin_border,
+            ),
+            NamedStyle(
+                name="dd_header_center",
+                font=Font(bold=True, size=12, color="FFFFFF"),
+                fill=PatternFill(start_color=header_color, end_color=header_color, fill_type="solid"),
+                border=thin_border,
+                alignment=Alignment(horizontal="center"),
+            ),
+            NamedStyle(
+                name="dd_data",
+                border=thin_border,
+                alignment=Alignment(wrap_text=True, vertical="top"),
+            ),
+            NamedStyle(name="dd_cell", border=thin_border),
         ]
-        for field, value in rows:
-            ws_summary.append([field, value])
-            for cell in ws_summary[ws_summary.max_row]:
-                cell.border = thin_border
-                cell.alignment = Alignment(wrap_text=True, vertical="top")
+        for ns in named_styles:
+            wb.add_named_style(ns)
+
+        def _fill_sheet(
+            ws, headers: list[str], rows: list, widths: dict[str, int],
+            header_style: str = "dd_header", row_style: str = "dd_data",
+        ):
+            """写入表头 + 数据行，按名称套用已注册样式并设置列宽"""
+            ws.append(headers)
+            for cell in ws[1]:
+                cell.style = header_style
+            for row in rows:
+                ws.append(row)
+            for row_cells in ws.iter_rows(min_row=2, max_row=ws.max_row):
+                for cell in row_cells:
+                    cell.style = row_style
+            for col, width in widths.items():
+                ws.column_dimensions[col].width = width
 
-        # 列宽
-        ws_summary.column_dimensions["A"].width = 18
-        ws_summary.column_dimensions["B"].width = 80
+        # ── Sheet 1: 摘要 ──
+        ws_summary = wb.active
+        ws_summary.title = "摘要"
+        _fill_sheet(
+            ws_summary,
+            ["字段", "内容"],
+            [
+                ("文件名", filename),
+                ("文件类型", result.get("source_type", "未知")),
+                ("提取文本长度", str(result.get("extracted_text_length", 0)) + " 字符"),
+                ("摘要", ai.get("summary", "")),
+            ],
+            {"A": 18, "B": 80},
+            header_style="dd_header_center",
+        )
 
         # ── Sheet 2: 核心观点 ──
         key_points = ai.get("key_points", [])
         if key_points:
-            ws_points = wb.create_sheet("核心观点")
-            ws_points.append(["序号", "观点"])
-            for cell in ws_points[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = thin_border
-            for i, point in enumerate(key_points, 1):
-                ws_points.append([i, point])
-                for cell in ws_points[ws_points.max_row]:
-                    cell.border = thin_border
-                    cell.alignment = Alignment(wrap_text=True, vertical="top")
-            ws_points.column_dimensions["A"].width = 8
-            ws_points.column_dimensions["B"].width = 80
+            _fill_sheet(
+                wb.create_sheet("核心观点"),
+                ["序号", "观点"],
+                list(enumerate(key_points, 1)),
+                {"A": 8, "B": 80},
+            )
 
         # ── Sheet 3: 关键词 ──
         keywords = ai.get("keywords", [])
         if keywords:
-            ws_kw = wb.create_sheet("关键词")
-            ws_kw.append(["序号", "关键词"])
-            for cell in ws_kw[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = thin_border
-            for i, kw in enumerate(keywords, 1):
-                ws_kw.append([i, kw])
-                for cell in ws_kw[ws_kw.max_row]:
-                    cell.border = thin_border
-            ws_kw.column_dimensions["A"].width = 8
-            ws_kw.column_dimensions["B"].width = 30
+            _fill_sheet(
+                wb.create_sheet("关键词"),
+                ["序号", "关键词"],
+                list(enumerate(keywords, 1)),
+                {"A": 8, "B": 30},
+                row_style="dd_cell",
+            )
 
         # ── Sheet 4: 内容结构（如有） ──
         structure = ai.get("structure", {})
         sections = structure.get("sections", [])
         if sections:
-            ws_struct = wb.create_sheet("内容结构")
-            ws_struct.append(["章节", "内容"])
-            for cell in ws_struct[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = thin_border
-            for section in sections:
-                heading = section.get("heading", "")
-                content = section.get("content", "")
-                ws_struct.append([heading, content])
-                for cell in ws_struct[ws_struct.max_row]:
-                    cell.border = thin_border
-                    cell.alignment = Alignment(wrap_text=True, vertical="top")
-            ws_struct.column_dimensions["A"].width = 25
-            ws_struct.column_dimensions["B"].width = 80
+            _fill_sheet(
+                wb.create_sheet("内容结构"),
+                ["章节", "内容"],
+                [(s.get("heading", ""), s.get("content", "")) for s in sections],
+                {"A": 25, "B": 80},
+            )
 
         # ── Skill 文档专属 Sheet：规则、实践步骤 ──
         if is_skill:
             rules = ai.get("rules", [])
             if rules:
-                ws_rules = wb.create_sheet("规则")
-                ws_rules.append(["序号", "规则"])
-                for cell in ws_rules[1]:
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.border = thin_border
-                for i, r in enumerate(rules, 1):
-                    ws_rules.append([i, r])
-                    for cell in ws_rules[ws_rules.max_row]:
-                        cell.border = thin_border
-                        cell.alignment = Alignment(wrap_text=True, vertical="top")
-                ws_rules.column_dimensions["A"].width = 8
-                ws_rules.column_dimensions["B"].width = 80
+                _fill_sheet(
+                    wb.create_sheet("规则"),
+                    ["序号", "规则"],
+                    list(enumerate(rules, 1)),
+                    {"A": 8, "B": 80},
+                )
             steps = ai.get("steps", [])
             if steps:
-                ws_steps = wb.create_sheet("实践步骤")
-                ws_steps.append(["序号", "标题", "要点"])
-                for cell in ws_steps[1]:
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.border = thin_border
-                for s in steps:
-                    row = [
-                        s.get("step_number", ""),
-                        s.get("title", ""),
-                        s.get("summary", ""),
-                    ]
-                    ws_steps.append(row)
-                    for cell in ws_steps[ws_steps.max_row]:
-                        cell.border = thin_border
-                        cell.alignment = Alignment(wrap_text=True, vertical="top")
-                ws_steps.column_dimensions["A"].width = 8
-                ws_steps.column_dimensions["B"].width = 25
-                ws_steps.column_dimensions["C"].width = 60
-
-        # 保存到内存缓冲区
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+                _fill_sheet(
+                    wb.create_sheet("实践步骤"),
+                    ["序号", "标题", "要点"],
+                    [(s.get("step_number", ""), s.get("title", ""), s.get("summary", "")) for s in steps],
+                    {"A": 8, "B": 25, "C": 60},
+                )
+
+        # 保存到池化缓冲区：按单元格数预估大小选取分级，避免 save 过程中反复扩容
+        est_size = max(XLSX_MIN_BUFFER_SIZE, sum(ws.max_row * ws.max_column for ws in wb.worksheets) * 64)
+        buffer = bufpool.acquire(est_size)
+        try:
+            wb.save(buffer)
+        except Exception:
+            buffer.release()
+            raise
 
         # 上传到 Google Drive
-        return self._upload_binary_to_drive(
-            buffer.read(),
-            title=f"{title}.xlsx",
-            mime_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            category=category,
-        )
+        return self._upload_pooled(buffer, f"{title}.xlsx", _XLSX_MIME, category, wait)
+
+    def _upload_pooled(
+        self, buffer: bufpool.PooledBuffer, title: str, mime_type: str,
+        category: str | None, wait: bool,
+    ) -> dict | Future:
+        """上传池化缓冲区，上传结束（同步返回或 Future 完成）后归还缓冲区"""
+        if wait:
+            try:
+                return self._upload_binary_to_drive(buffer, title=title, mime_type=mime_type, category=category)
+            finally:
+                buffer.release()
+        future = self.async_upload_binary_to_drive(buffer, title=title, mime_type=mime_type, category=category)
+        future.add_done_callback(lambda _f: buffer.release())
+        return future
 
     # ── 通用二进制文件上传到 Google Drive ──
 
     def _upload_binary_to_drive(
-        self, data: bytes, title: str, mime_type: str, category: str | None = None,
+        self, data: io.BufferedIOBase | bytes, title: str, mime_type: str, category: str | None = None,
     ) -> dict:
         """
         将二进制文件上传到 Google Drive（不转换格式）。
+        直接从缓冲区分块续传，不再 .read() 出整份副本；每个分块独立重试。
 
         Args:
-            data: 文件二进制内容
+            data: 文件内容缓冲区（BytesIO / PooledBuffer，兼容 bytes）
             title: 文件名（含扩展名）
             mime_type: MIME 类型
             category: 分类子文件夹名称
@@ -986,7 +1179,7 @@ th {{ background: #f5f5f5; font-weight: bold; }}
         Returns:
             {"doc_id": str, "doc_url": str, "title": str, "category": str | None}
         """
-        from googleapiclient.http import MediaInMemoryUpload
+        from googleapiclient.http import MediaIoBaseUpload
 
         service = self._get_drive_service()
 
@@ -1002,26 +1195,14 @@ th {{ background: #f5f5f5; font-weight: bold; }}
             "name": title,
             "parents": [folder_id],
         }
-        media = MediaInMemoryUpload(data, mimetype=mime_type, resumable=True)
+        buffer = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+        buffer.seek(0)
+        media = MediaIoBaseUpload(
+            buffer, mimetype=mime_type, chunksize=GDRIVE_UPLOAD_CHUNK_SIZE, resumable=True,
+        )
 
-        # 带重试的上传
-        last_error = None
-        for attempt in range(GDRIVE_MAX_RETRIES):
-            try:
-                file = service.files().create(
-                    body=file_metadata,
-                    media_body=media,
-                    fields="id, webViewLink, name",
-                ).execute()
-                break
-            except Exception as e:
-                last_error = e
-                if attempt < GDRIVE_MAX_RETRIES - 1:
-                    wait = GDRIVE_RETRY_DELAY * (2 ** attempt)
-                    logger.warning(f"Google Drive 上传失败（第 {attempt + 1} 次）: {e}，{wait}s 后重试")
-                    time.sleep(wait)
-                else:
-                    raise RuntimeError(f"Google Drive 上传失败（已重试 {GDRIVE_MAX_RETRIES} 次）: {last_error}")
+        # 分块续传（每块带限流与重试）
+        file = self._upload_resumable(service, file_metadata, media)
 
         doc_id = file["id"]
         doc_url = file.get("webViewLink", f"https://drive.google.com/file/d/{doc_id}/view")
@@ -1037,10 +1218,17 @@ th {{ background: #f5f5f5; font-weight: bold; }}
         }
 
 
-def get_exporter() -> GoogleDocsExporter:
-    """获取全局 Google Docs 导出器实例"""
-    from ..config import cfg
+@functools.lru_cache(maxsize=1)
+def _drive_discovery_doc() -> dict:
+    """Drive v3 discovery 文档（随 google-api-python-client 打包），进程内只解析一次"""
+    from googleapiclient.discovery_cache import get_static_doc
 
+    return json.loads(get_static_doc("drive", "v3"))
+
+
+@functools.lru_cache(maxsize=1)
+def get_exporter() -> GoogleDocsExporter:
+    """获取全局 Google Docs 导出器实例（进程内单例，凭据与各线程的 Drive 服务随之复用）"""
     return GoogleDocsExporter(
         credentials_path=cfg.GOOGLE_DOCS_CREDENTIALS_PATH,
         token_path=cfg.GOOGLE_DOCS_TOKEN_PATH,
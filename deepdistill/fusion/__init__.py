@@ -6,10 +6,26 @@ Layer 5: 融合输出层 — 去重/合并/补全 + 格式化输出
 from __future__ import annotations
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from .formatters.json_fmt import format_json
+from .formatters.markdown import format_markdown
+from .formatters.skill_fmt import format_skill
+
 logger = logging.getLogger("deepdistill.fusion")
 
+# 批量输出时低于该数量直接串行处理（进程池启动与结果传输开销大于并行收益）
+BATCH_MIN_PARALLEL = 8
+
+# 输出格式 -> 格式化函数
+FORMATTERS = {
+    "markdown": format_markdown,
+    "json": format_json,
+    "skill": format_skill,
+}
+
 
 def generate_output(result, output_dir: Path, output_format: str = "markdown") -> str:
     """
@@ -26,14 +42,56 @@ def generate_output(result, output_dir: Path, output_format: str = "markdown") -
         )
 
     # Step 2: 格式化输出
-    if output_format == "markdown":
-        from .formatters.markdown import format_markdown
-        return format_markdown(result, output_dir)
-    elif output_format == "json":
-        from .formatters.json_fmt import format_json
-        return format_json(result, output_dir)
-    elif output_format == "skill":
-        from .formatters.skill_fmt import format_skill
-        return format_skill(result, output_dir)
-    else:
+    formatter = FORMATTERS.get(output_format)
+    if formatter is None:
+        raise ValueError(f"不支持的输出格式: {output_format}")
+    return formatter(result, output_dir)
+
+
+def _generate_output_worker(result, output_dir: Path, output_format: str) -> tuple[str, dict | None]:
+    """子进程入口：返回输出路径和融合后的 ai_result（子进程内的修改不会回传给父进程）"""
+    output_path = generate_output(result, output_dir, output_format)
+    return output_path, result.ai_result
+
+
+def generate_outputs_batch(
+    results: list,
+    output_dir: Path,
+    output_format: str = "markdown",
+    max_workers: int | None = None,
+    return_exceptions: bool = False,
+) -> list:
+    """
+    批量生成输出文件：融合与格式化均为纯 CPU 计算且互不共享状态，按结果分发到多个进程并行。
+    返回与 results 顺序一致的输出文件路径列表；融合后的 ai_result 会写回各个 result。
+    数量较少时串行处理。
+    return_exceptions=True 时单个结果失败不影响其他结果，对应位置返回异常实例。
+    """
+    if output_format not in FORMATTERS:
         raise ValueError(f"不支持的输出格式: {output_format}")
+
+    workers = min(max_workers or os.cpu_count() or 1, len(results))
+    if workers <= 1 or len(results) < BATCH_MIN_PARALLEL:
+        output_paths = []
+        for r in results:
+            try:
+                output_paths.append(generate_output(r, output_dir, output_format))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                output_paths.append(e)
+        return output_paths
+
+    logger.info(f"批量生成 {len(results)} 份 {output_format} 输出（{workers} 个进程）")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_generate_output_worker, r, output_dir, output_format) for r in results]
+        output_paths = []
+        for result, future in zip(results, futures):
+            try:
+                output_path, result.ai_result = future.result()
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                output_path = e
+            output_paths.append(output_path)
+    return output_paths
@@ -9,9 +9,21 @@ import json
 import logging
 from pathlib import Path
 
+try:
+    import orjson  # 可选：Rust 实现的快速 JSON，直接输出 UTF-8 bytes
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("deepdistill.formatter.json")
 
 
+def _json_default(obj):
+    """NumPy 标量/数组（视频分析结果中的 np.float64、np.int64 等）按对应的 Python 数值/列表输出"""
+    if type(obj).__module__ == "numpy" and hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
 def format_json(result, output_dir: Path) -> str:
     """将 ProcessingResult 格式化为 JSON 文件"""
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -36,10 +48,15 @@ def format_json(result, output_dir: Path) -> str:
         },
     }
 
-    output_path.write_text(
-        json.dumps(data, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    # 两条路径输出的数据相同，但文本不逐字节一致：浮点数指数写法不同（orjson 写 1e20 / 1e-7，json 写 1e+20 / 1e-07）
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        output_path.write_bytes(orjson.dumps(data, default=_json_default, option=option))
+    else:
+        output_path.write_text(
+            json.dumps(data, ensure_ascii=False, indent=2, default=_json_default),
+            encoding="utf-8",
+        )
 
     logger.info(f"JSON 输出: {output_path}")
     return str(output_path)
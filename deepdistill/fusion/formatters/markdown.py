@@ -19,74 +19,55 @@ def format_markdown(result, output_dir: Path) -> str:
     stem = Path(result.filename).stem
     output_path = output_dir / f"{stem}_distilled.md"
 
-    lines = []
-
-    # 标题
-    lines.append(f"# {stem}")
-    lines.append("")
-    lines.append(f"> 来源: `{result.filename}` | 类型: {result.source_type} | 处理耗时: {result.processing_time_sec}s")
-    lines.append("")
+    # 每个章节拼成一个完整字符串追加，最后一次性 join
+    parts = [
+        f"# {stem}\n\n"
+        f"> 来源: `{result.filename}` | 类型: {result.source_type} | 处理耗时: {result.processing_time_sec}s\n\n"
+    ]
 
     # AI 提炼结果
     ai = result.ai_result
     if ai:
         # 摘要
         if ai.get("summary"):
-            lines.append("## 摘要")
-            lines.append("")
-            lines.append(ai["summary"])
-            lines.append("")
+            parts.append(f"## 摘要\n\n{ai['summary']}\n\n")
 
         # 核心观点
         if ai.get("key_points"):
-            lines.append("## 核心观点")
-            lines.append("")
-            for point in ai["key_points"]:
-                lines.append(f"- {point}")
-            lines.append("")
+            points = "".join([f"- {point}\n" for point in ai["key_points"]])
+            parts.append(f"## 核心观点\n\n{points}\n")
 
         # 关键词
         if ai.get("keywords"):
-            lines.append("## 关键词")
-            lines.append("")
             tags = " ".join([f"`{kw}`" for kw in ai["keywords"]])
-            lines.append(tags)
-            lines.append("")
+            parts.append(f"## 关键词\n\n{tags}\n\n")
 
         # 内容结构
         structure = ai.get("structure")
         if structure:
-            lines.append("## 内容结构")
-            lines.append("")
-            if structure.get("type"):
-                lines.append(f"**类型**: {structure['type']}")
-                lines.append("")
-            for section in structure.get("sections", []):
-                lines.append(f"### {section.get('heading', '未命名')}")
-                lines.append("")
-                lines.append(section.get("content", ""))
-                lines.append("")
+            structure_type = f"**类型**: {structure['type']}\n\n" if structure.get("type") else ""
+            sections = "".join([
+                f"### {section.get('heading', '未命名')}\n\n{section.get('content', '')}\n\n"
+                for section in structure.get("sections", [])
+            ])
+            parts.append(f"## 内容结构\n\n{structure_type}{sections}")
 
     # 视频分析结果
     if result.video_analysis and result.source_type == "video":
         va = result.video_analysis
-        lines.append("## 视频分析")
-        lines.append("")
+        parts.append("## 视频分析\n\n")
 
         scenes = va.get("scenes", [])
         if scenes:
-            lines.append(f"**场景数**: {len(scenes)}")
-            lines.append("")
+            parts.append(f"**场景数**: {len(scenes)}\n\n")
 
         style = va.get("style", {})
         if style and style.get("summary"):
-            lines.append(f"**视觉风格**: {style['summary']}")
-            lines.append("")
+            parts.append(f"**视觉风格**: {style['summary']}\n\n")
 
         cinema = va.get("cinematography", {})
         if cinema and cinema.get("summary"):
-            lines.append(f"**拍摄手法**: {cinema['summary']}")
-            lines.append("")
+            parts.append(f"**拍摄手法**: {cinema['summary']}\n\n")
 
         transitions = va.get("transitions", [])
         if transitions:
@@ -95,57 +76,43 @@ def format_markdown(result, output_dir: Path) -> str:
                 tt = t.get("transition_type", "未知")
                 trans_types[tt] = trans_types.get(tt, 0) + 1
             trans_desc = "、".join(f"{t}({c}次)" for t, c in trans_types.items())
-            lines.append(f"**转场**: {trans_desc}")
-            lines.append("")
+            parts.append(f"**转场**: {trans_desc}\n\n")
 
     # 视觉素材 prompt
     if hasattr(result, 'visual_assets') and result.visual_assets:
         prompts = result.visual_assets.get("prompts", [])
         images = result.visual_assets.get("generated_images", [])
         if prompts:
-            lines.append("## 视觉素材")
-            lines.append("")
             if images:
-                for img in images:
-                    lines.append(f"![visual]({img})")
-                    lines.append("")
+                body = "".join([f"![visual]({img})\n\n" for img in images])
             else:
-                lines.append("*以下为 AI 生成的图片描述 prompt，可用于 Stable Diffusion / DALL-E 等工具生成配图：*")
-                lines.append("")
-                for p in prompts:
-                    lines.append(f"**{p['title']}**")
-                    lines.append(f"> {p['prompt']}")
-                    lines.append("")
+                body = (
+                    "*以下为 AI 生成的图片描述 prompt，可用于 Stable Diffusion / DALL-E 等工具生成配图：*\n\n"
+                    + "".join([f"**{p['title']}**\n> {p['prompt']}\n\n" for p in prompts])
+                )
+            parts.append(f"## 视觉素材\n\n{body}")
 
     # 原始文本（折叠）
     if result.extracted_text:
-        lines.append("---")
-        lines.append("")
-        lines.append("<details>")
-        lines.append("<summary>📝 原始提取文本</summary>")
-        lines.append("")
-        # 限制长度
+        # 限制长度（按字符截断）；正文单独作为一段，不再拼进 f-string 产生额外副本
         text = result.extracted_text
+        parts.append("---\n\n<details>\n<summary>📝 原始提取文本</summary>\n\n")
         if len(text) > 5000:
-            text = text[:5000] + f"\n\n... (共 {len(result.extracted_text)} 字符，已截断)"
-        lines.append(text)
-        lines.append("")
-        lines.append("</details>")
-        lines.append("")
+            parts.append(text[:5000])
+            parts.append(f"\n\n... (共 {len(text)} 字符，已截断)")
+        else:
+            parts.append(text)
+        parts.append("\n\n</details>\n\n")
 
     # 错误信息
     if result.errors:
-        lines.append("---")
-        lines.append("")
-        lines.append("## ⚠️ 处理警告")
-        lines.append("")
-        for err in result.errors:
-            lines.append(f"- {err}")
-        lines.append("")
-
-    # 写入文件
-    content = "\n".join(lines)
-    output_path.write_text(content, encoding="utf-8")
+        errors = "".join([f"- {err}\n" for err in result.errors])
+        parts.append(f"---\n\n## ⚠️ 处理警告\n\n{errors}\n")
+
+    # 写入文件（每个章节都以换行结尾，去掉最末一个换行与旧的逐行 join 输出保持一致）
+    # 按章节编码后直接拼接 bytes 写入，不再构造整份文本的中间 str
+    parts[-1] = parts[-1][:-1]
+    output_path.write_bytes(b"".join([part.encode("utf-8") for part in parts]))
 
     logger.info(f"Markdown 输出: {output_path}")
     return str(output_path)
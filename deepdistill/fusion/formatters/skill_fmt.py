@@ -180,9 +180,8 @@ def format_skill(result, output_dir: Path) -> str:
     lines.append(f"- **生成时间**: {now}")
     lines.append("")
 
-    # 写入文件
-    content = "\n".join(lines)
-    output_path.write_text(content, encoding="utf-8")
+    # 写入文件（一次性编码为 UTF-8 后直接写 bytes，跳过文本层编码）
+    output_path.write_bytes("\n".join(lines).encode("utf-8"))
 
     logger.info(f"Skill 文档输出: {output_path}")
     return str(output_path)
@@ -5,12 +5,32 @@
 
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
 import logging
 import re
+import threading
+from collections import OrderedDict
+from math import fsum
+from operator import itemgetter
 from typing import Optional
 
+try:
+    import orjson  # 可选：快速 JSON，用于计算缓存键
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("deepdistill.fusion.processor")
 
+# 融合结果缓存：输入内容哈希 -> 融合结果的深拷贝（LRU，进程内共享）
+_FUSION_CACHE_SIZE = 128
+_fusion_cache: OrderedDict[bytes, dict] = OrderedDict()
+_fusion_cache_lock = threading.Lock()
+
+# 预编译正则：句子切分
+_SENT_SPLIT = re.compile(r'[。！？\n]')
+
 
 def process_fusion(ai_result: dict, extracted_text: str, video_analysis: dict | None = None) -> dict:
     """
@@ -33,13 +53,37 @@ def process_fusion(ai_result: dict, extracted_text: str, video_analysis: dict |
     if not ai_result:
         return _create_empty_result()
 
-    result = dict(ai_result)
+    # 相同输入（如重复导入的同一文件）直接复用上次的融合结果
+    key = _fusion_cache_key(ai_result, extracted_text, video_analysis)
+    if key is not None:
+        with _fusion_cache_lock:
+            cached = _fusion_cache.get(key)
+            if cached is not None:
+                _fusion_cache.move_to_end(key)
+        if cached is not None:
+            logger.debug("融合结果命中缓存")
+            # 返回深拷贝：调用方修改不影响缓存，且与未命中时的返回值结构完全一致（元组、非字符串键原样保留）
+            return copy.deepcopy(cached)
+
+    result = _run_fusion(ai_result, extracted_text, video_analysis)
+
+    if key is not None:
+        cached = copy.deepcopy(result)
+        with _fusion_cache_lock:
+            _fusion_cache[key] = cached
+            if len(_fusion_cache) > _FUSION_CACHE_SIZE:
+                _fusion_cache.popitem(last=False)
+
+    return result
+
 
-    # Step 1: 去重
-    result = _deduplicate(result)
+def _run_fusion(ai_result: dict, extracted_text: str, video_analysis: dict | None) -> dict:
+    """依次执行去重合并 / 补全 / 增强 / 质量检查"""
+    result = dict(ai_result)
 
-    # Step 2: 合并相似要点
-    result = _merge_similar_points(result)
+    # Step 1-2: 去重 + 合并相似要点（单次遍历，strip/去空/编码只做一次）
+    result["keywords"] = _normalize_keywords(result.get("keywords") or [])
+    result["key_points"] = _normalize_points(result.get("key_points") or [])
 
     # Step 3: 补全缺失字段
     result = _complete_missing_fields(result, extracted_text)
@@ -48,80 +92,83 @@ def process_fusion(ai_result: dict, extracted_text: str, video_analysis: dict |
     if video_analysis:
         result = _enhance_with_video(result, video_analysis)
 
-    # Step 5: 质量检查
+    # Step 5: 质量检查（要点/关键词非空已由上面的步骤保证，这里只清理章节）
     result = _quality_check(result)
 
     return result
 
 
-def _deduplicate(result: dict) -> dict:
-    """去除重复的关键词和要点"""
-    # 关键词去重（忽略大小写和空格）
-    keywords = result.get("keywords", [])
-    if keywords:
-        seen = set()
-        unique_keywords = []
-        for kw in keywords:
-            normalized = kw.strip().lower()
-            if normalized and normalized not in seen:
-                seen.add(normalized)
-                unique_keywords.append(kw.strip())
-        result["keywords"] = unique_keywords
-
-    # 要点去重（基于文本相似度）
-    key_points = result.get("key_points", [])
-    if key_points:
-        unique_points = []
-        for point in key_points:
-            point = point.strip()
-            if not point:
-                continue
-            is_dup = False
-            for existing in unique_points:
-                if _text_similarity(point, existing) > 0.7:
-                    is_dup = True
-                    break
-            if not is_dup:
-                unique_points.append(point)
-        result["key_points"] = unique_points
+def _dumps(obj, sort_keys: bool = False) -> bytes:
+    """序列化为 JSON bytes（优先 orjson）"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys).encode("utf-8")
 
-    return result
 
+def _fusion_cache_key(ai_result: dict, extracted_text: str, video_analysis: dict | None) -> bytes | None:
+    """融合输入的内容哈希；输入含无法序列化的对象时返回 None（不缓存）"""
+    try:
+        payload = _dumps([ai_result, extracted_text, video_analysis], sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(payload, digest_size=16).digest()
 
-def _merge_similar_points(result: dict) -> dict:
-    """合并相似的要点（相似度 0.5-0.7 之间的合并为一条）"""
-    key_points = result.get("key_points", [])
-    if len(key_points) < 2:
-        return result
 
+def _normalize_keywords(keywords: list[str]) -> list[str]:
+    """关键词去重（忽略大小写和空格），同时去除空白关键词"""
+    seen = set()
+    unique_keywords = []
+    for kw in keywords:
+        kw = kw.strip()
+        normalized = kw.lower()
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            unique_keywords.append(kw)
+    return unique_keywords
+
+
+def _normalize_points(key_points: list[str]) -> list[str]:
+    """
+    要点规范化：strip + 去空 → 去重（相似度 > 0.7）→ 合并（相似度 0.4-0.7 的合并为一条，保留最长的）。
+    每条要点的 2-gram 编码集合只计算一次，去重与合并共用。
+    """
+    points = [p for p in (p.strip() for p in key_points) if p]
+    if not points:
+        return []
+
+    sigs = [_ngram_codes(p) for p in points]
+    sizes = [len(sig) for sig in sigs]
+
+    # 去重：与已保留的要点相似度 > 0.7 则丢弃
+    kept: list[int] = []
+    for i in range(len(points)):
+        if not any(
+            _size_ratio_ok(sizes[i], sizes[k], 0.7) and _jaccard(sigs[i], sigs[k]) > 0.7
+            for k in kept
+        ):
+            kept.append(i)
+
+    if len(kept) < 2:
+        return [points[i] for i in kept]
+
+    # 合并：按保留顺序，把后续相似度 0.4-0.7 的要点并入当前要点
     merged = []
     used = set()
-
-    for i, point_a in enumerate(key_points):
+    for pos, i in enumerate(kept):
         if i in used:
             continue
-
-        # 查找可合并的要点
-        merge_group = [point_a]
-        for j, point_b in enumerate(key_points):
-            if j <= i or j in used:
+        merge_group = [points[i]]
+        for j in kept[pos + 1:]:
+            if j in used or not _size_ratio_ok(sizes[i], sizes[j], 0.4):
                 continue
-            sim = _text_similarity(point_a, point_b)
-            if 0.4 < sim < 0.7:
-                merge_group.append(point_b)
+            if 0.4 < _jaccard(sigs[i], sigs[j]) < 0.7:
+                merge_group.append(points[j])
                 used.add(j)
-
-        if len(merge_group) > 1:
-            # 合并：取最长的作为主体
-            merged_point = max(merge_group, key=len)
-            merged.append(merged_point)
-        else:
-            merged.append(point_a)
-
         used.add(i)
+        merged.append(max(merge_group, key=len))
 
-    result["key_points"] = merged
-    return result
+    return merged
 
 
 def _complete_missing_fields(result: dict, extracted_text: str) -> dict:
@@ -134,7 +181,7 @@ def _complete_missing_fields(result: dict, extracted_text: str) -> dict:
     # 确保 key_points 存在且非空
     if not result.get("key_points"):
         # 从文本中提取句子作为要点
-        sentences = re.split(r'[。！？\n]', extracted_text)
+        sentences = _SENT_SPLIT.split(extracted_text)
         result["key_points"] = [s.strip() for s in sentences if len(s.strip()) > 10][:5]
 
     # 确保 keywords 存在且非空
@@ -161,15 +208,18 @@ def _complete_missing_fields(result: dict, extracted_text: str) -> dict:
     return result
 
 
+_get_duration = itemgetter("duration")
+
+
 def _enhance_with_video(result: dict, video_analysis: dict) -> dict:
     """结合视频分析结果丰富内容"""
+    # 新增章节先收集，最后一次性追加到 structure.sections
+    new_sections = []
+
     # 添加视频风格信息到结构中
     style = video_analysis.get("style", {})
     if style and style.get("summary"):
-        if "structure" not in result:
-            result["structure"] = {"type": "视频", "sections": []}
-
-        result["structure"].setdefault("sections", []).append({
+        new_sections.append({
             "heading": "视觉风格",
             "content": style["summary"],
         })
@@ -178,8 +228,9 @@ def _enhance_with_video(result: dict, video_analysis: dict) -> dict:
     scenes = video_analysis.get("scenes", [])
     if scenes:
         scene_count = len(scenes)
-        total_duration = sum(s.get("duration", 0) for s in scenes)
-        result["structure"].setdefault("sections", []).append({
+        # 场景检测器输出的场景都带 duration，这里仍过滤掉缺字段的场景以防外部传入
+        total_duration = fsum(map(_get_duration, (s for s in scenes if "duration" in s)))
+        new_sections.append({
             "heading": "视频结构",
             "content": f"共 {scene_count} 个场景，总时长 {round(total_duration, 1)} 秒",
         })
@@ -191,29 +242,27 @@ def _enhance_with_video(result: dict, video_analysis: dict) -> dict:
         for obj_result in objects:
             for obj in obj_result.get("objects", []):
                 label = obj.get("label", "")
-                if label and label.lower() not in existing_keywords:
+                if label.strip() and label.lower() not in existing_keywords:
                     result.setdefault("keywords", []).append(label)
                     existing_keywords.add(label.lower())
 
     # 拍摄手法信息
     cinematography = video_analysis.get("cinematography", {})
     if cinematography and cinematography.get("summary"):
-        result["structure"].setdefault("sections", []).append({
+        new_sections.append({
             "heading": "拍摄手法",
             "content": cinematography["summary"],
         })
 
+    if new_sections:
+        structure = result.setdefault("structure", {"type": "视频", "sections": []})
+        structure.setdefault("sections", []).extend(new_sections)
+
     return result
 
 
 def _quality_check(result: dict) -> dict:
     """质量检查：确保输出格式规范"""
-    # 清理空白要点
-    result["key_points"] = [p for p in result.get("key_points", []) if p.strip()]
-
-    # 清理空白关键词
-    result["keywords"] = [kw for kw in result.get("keywords", []) if kw.strip()]
-
     # 确保 sections 中的 heading 和 content 都非空
     if result.get("structure", {}).get("sections"):
         result["structure"]["sections"] = [
@@ -232,24 +281,54 @@ def _text_similarity(text_a: str, text_b: str) -> float:
     if not text_a or not text_b:
         return 0.0
 
-    # 使用 2-gram 字符集合
-    set_a = set(_ngrams(text_a.lower(), 2))
-    set_b = set(_ngrams(text_b.lower(), 2))
+    return _jaccard(_ngram_codes(text_a), _ngram_codes(text_b))
+
+
+def _size_ratio_ok(size_a: int, size_b: int, threshold: float) -> bool:
+    """
+    集合大小预筛：Jaccard ≤ min(|A|,|B|) / max(|A|,|B|)，
+    大小比不超过阈值的两条要点不可能超过该相似度，可跳过集合运算。
+    """
+    if size_a > size_b:
+        size_a, size_b = size_b, size_a
+    return size_a > threshold * size_b
+
 
+def _jaccard(set_a: frozenset[int], set_b: frozenset[int]) -> float:
+    """两个 2-gram 编码集合的 Jaccard 系数"""
     if not set_a or not set_b:
         return 0.0
 
     intersection = len(set_a & set_b)
-    union = len(set_a | set_b)
+    union = len(set_a) + len(set_b) - intersection
 
     return intersection / union if union > 0 else 0.0
 
 
-def _ngrams(text: str, n: int = 2) -> list[str]:
-    """生成 n-gram 列表"""
-    # 去除标点和空格
-    clean = re.sub(r'[^\w]', '', text)
-    return [clean[i:i + n] for i in range(len(clean) - n + 1)]
+class _DropNonWordTable(dict):
+    """
+    str.translate 用的删除表：非单词字符（与正则 \\w 相同判定）映射为 None。
+    按需填充并缓存，实际遇到的字符集很小。
+    """
+
+    def __missing__(self, codepoint: int):
+        ch = chr(codepoint)
+        value = codepoint if (ch.isalnum() or ch == "_") else None
+        self[codepoint] = value
+        return value
+
+
+_DROP_NONWORD = _DropNonWordTable()
+
+
+def _ngram_codes(text: str) -> frozenset[int]:
+    """
+    生成字符级 2-gram 的整数编码集合。
+    去标点用 str.translate（C 层完成），每个 2-gram 编码为 (ord(a) << 21) | ord(b)：
+    码点不超过 21 位，编码无碰撞，且不为每个 2-gram 分配字符串对象。
+    """
+    clean = text.lower().translate(_DROP_NONWORD)
+    return frozenset([(ord(a) << 21) | ord(b) for a, b in zip(clean, clean[1:])])
 
 
 def _create_empty_result() -> dict:
@@ -17,13 +17,60 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import base64
+import functools
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional
 
 logger = logging.getLogger("deepdistill.fusion.visual")
 
+# 生成后端熔断：连续失败达到阈值后熔断一段时间，期间直接跳过该后端（不发起任何网络请求）
+_BREAKER_FAIL_THRESHOLD = 3
+_BREAKER_COOLDOWN = 30  # 秒
+_BREAKERS = {
+    name: {"state": "closed", "opened_at": 0.0, "fail_count": 0, "ok_at": 0.0}
+    for name in ("sd", "dalle")
+}
+# 后端最近一次调用成功后，该时长内视为可用，不再重复探测
+_PROBE_OK_TTL = 60  # 秒
+
+# SD WebUI 地址（默认端口 7860）
+_SD_BASE_URL = "http://host.docker.internal:7860"
+_breaker_lock = threading.Lock()
+
+# SD WebUI 并发提交的 txt2img 请求数上限
+_SD_MAX_CONCURRENCY = 4
+
+# DALL-E 并发请求数上限（dall-e-3 约 4 并发；gpt-image-1 可调到 16）
+_DALLE_MAX_CONCURRENCY = 4
+
+# 复用连接的 HTTP 客户端：上限与 keep-alive 数
+_HTTP_MAX_CONNECTIONS = 256
+_HTTP_MAX_KEEPALIVE = 32
+
+
+@functools.lru_cache(maxsize=1)
+def _http_client():
+    """进程内共享的 httpx.Client（连接池复用 TCP/TLS 连接），首次使用时创建，退出时关闭"""
+    import httpx
+
+    client = httpx.Client(
+        timeout=httpx.Timeout(10.0, read=120.0),
+        limits=httpx.Limits(
+            max_connections=_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=_HTTP_MAX_KEEPALIVE,
+        ),
+    )
+    atexit.register(client.close)
+    return client
+
 
 def generate_visual_assets(
     ai_result: dict,
@@ -100,6 +147,10 @@ def _extract_style_info(video_analysis: dict | None) -> dict:
     }
 
 
+# 所有 prompt 末尾的通用质量标签
+_PROMPT_QUALITY_SUFFIX = ". high quality, detailed, professional, clean composition"
+
+
 def _generate_prompts(ai_result: dict, style_info: dict, max_images: int) -> list[dict]:
     """从分析结果生成图片描述 prompt"""
     prompts = []
@@ -109,15 +160,16 @@ def _generate_prompts(ai_result: dict, style_info: dict, max_images: int) -> lis
     key_points = ai_result.get("key_points", [])
     sections = ai_result.get("structure", {}).get("sections", [])
 
-    # 风格标签
+    # 风格标签（同一批 prompt 共用，只拼接一次）
     style_tags = style_info.get("tags", [])
+    style_tags_str = ", ".join(style_tags)
     style_desc = style_info.get("description", "")
 
     # Prompt 1: 基于核心摘要的封面图
     if summary:
         prompt_text = _build_image_prompt(
             subject=summary[:100],
-            style_tags=style_tags,
+            style_tags_str=style_tags_str,
             style_desc=style_desc,
             purpose="封面图/缩略图",
         )
@@ -132,7 +184,7 @@ def _generate_prompts(ai_result: dict, style_info: dict, max_images: int) -> lis
     for i, point in enumerate(key_points[:max_images - 1]):
         prompt_text = _build_image_prompt(
             subject=point,
-            style_tags=style_tags,
+            style_tags_str=style_tags_str,
             style_desc=style_desc,
             purpose=f"要点配图 #{i + 1}",
         )
@@ -148,96 +200,178 @@ def _generate_prompts(ai_result: dict, style_info: dict, max_images: int) -> lis
 
 def _build_image_prompt(
     subject: str,
-    style_tags: list[str],
+    style_tags_str: str,
     style_desc: str,
     purpose: str,
 ) -> str:
-    """构建适配 Stable Diffusion / DALL-E 的图片生成 prompt"""
-    parts = []
-
-    # 主题
-    parts.append(f"A professional illustration about: {subject}")
-
-    # 用途
-    parts.append(f"Purpose: {purpose}")
+    """构建适配 Stable Diffusion / DALL-E 的图片生成 prompt（style_tags_str 为已用逗号拼接的风格标签）"""
+    # 主题 + 用途
+    prompt = f"A professional illustration about: {subject}. Purpose: {purpose}"
 
     # 风格
     if style_desc:
-        parts.append(f"Visual style: {style_desc}")
-
-    if style_tags:
-        parts.append(f"Style attributes: {', '.join(style_tags)}")
+        prompt += f". Visual style: {style_desc}"
+    if style_tags_str:
+        prompt += f". Style attributes: {style_tags_str}"
 
     # 通用质量标签
-    parts.append("high quality, detailed, professional, clean composition")
-
-    return ". ".join(parts)
+    return prompt + _PROMPT_QUALITY_SUFFIX
 
 
 def _try_generate_images(prompts: list[dict], output_dir: Path) -> list[str]:
     """
     尝试调用可用的图片生成后端。
     优先级：Stable Diffusion WebUI > DALL-E API > 跳过
+    先做可用性探测（结果经熔断器缓存），只在可用的后端上生成；SD 生成失败时再回退 DALL-E。
     """
     # 尝试 Stable Diffusion WebUI（本地）
-    images = _try_sd_webui(prompts, output_dir)
-    if images:
-        return images
+    if _probe_sd_available():
+        images = _try_sd_webui(prompts, output_dir, probed=True)
+        if images:
+            return images
 
     # 尝试 DALL-E API
-    images = _try_dalle(prompts, output_dir)
-    if images:
-        return images
+    if _probe_dalle_available():
+        images = _try_dalle(prompts, output_dir)
+        if images:
+            return images
 
     # 无可用后端，仅输出 prompt
     logger.info("无可用图片生成后端，仅输出 prompt 描述")
     return []
 
 
-def _try_sd_webui(prompts: list[dict], output_dir: Path) -> list[str]:
-    """尝试调用本地 Stable Diffusion WebUI API"""
+def _probe_sd_available() -> bool:
+    """SD WebUI 是否可用：熔断中直接返回 False，最近成功过直接返回 True，否则请求 options 接口探测"""
+    if not _breaker_allow("sd"):
+        logger.debug("SD WebUI 已熔断，跳过")
+        return False
+    if _breaker_recent_ok("sd"):
+        return True
+
     try:
-        import httpx
+        response = _http_client().get(f"{_SD_BASE_URL}/sdapi/v1/options", timeout=3)
+    except Exception as e:
+        logger.debug(f"SD WebUI 不可用: {e}")
+        _breaker_record("sd", ok=False)
+        return False
+    ok = response.status_code == 200
+    _breaker_record("sd", ok=ok)
+    return ok
+
 
-        # 检查 SD WebUI 是否可用（默认端口 7860）
-        response = httpx.get("http://host.docker.internal:7860/sdapi/v1/options", timeout=3)
-        if response.status_code != 200:
+def _probe_dalle_available() -> bool:
+    """DALL-E 是否可用：需要 OPENAI_API_KEY 且未熔断（不发起网络请求，不占用半开状态的试探名额）"""
+    import os
+    return bool(os.getenv("OPENAI_API_KEY", "")) and not _breaker_blocked("dalle")
+
+
+def _breaker_allow(name: str, cooldown: float = _BREAKER_COOLDOWN) -> bool:
+    """
+    熔断器是否放行本次请求。
+    熔断冷却期过后转为半开（half_open），只放行一次试探请求，其余调用方继续被拒绝，
+    直到 _breaker_record 记录试探结果（成功复位，失败重新熔断）；试探超过冷却期仍无结果时再放行一次。
+    """
+    with _breaker_lock:
+        breaker = _BREAKERS[name]
+        if breaker["state"] == "closed":
+            return True
+        if time.monotonic() - breaker["opened_at"] < cooldown:
+            return False
+        breaker["state"] = "half_open"
+        breaker["opened_at"] = time.monotonic()
+        return True
+
+
+def _breaker_blocked(name: str, cooldown: float = _BREAKER_COOLDOWN) -> bool:
+    """熔断器当前是否拒绝请求（只读：熔断冷却中或半开试探进行中），不放行试探请求"""
+    with _breaker_lock:
+        breaker = _BREAKERS[name]
+        return breaker["state"] != "closed" and time.monotonic() - breaker["opened_at"] < cooldown
+
+
+def _breaker_record(name: str, ok: bool):
+    """记录一次后端调用结果：成功则复位，失败累计到阈值后熔断"""
+    with _breaker_lock:
+        breaker = _BREAKERS[name]
+        if ok:
+            breaker.update(state="closed", opened_at=0.0, fail_count=0, ok_at=time.monotonic())
+            return
+        breaker["ok_at"] = 0.0
+        breaker["fail_count"] += 1
+        if breaker["fail_count"] >= _BREAKER_FAIL_THRESHOLD:
+            if breaker["state"] != "open":
+                logger.info(f"图片生成后端 {name} 连续失败 {breaker['fail_count']} 次，熔断 {_BREAKER_COOLDOWN} 秒")
+            breaker["state"] = "open"
+            breaker["opened_at"] = time.monotonic()
+
+
+def _breaker_recent_ok(name: str) -> bool:
+    """后端是否在 _PROBE_OK_TTL 内调用成功过"""
+    with _breaker_lock:
+        ok_at = _BREAKERS[name]["ok_at"]
+    return ok_at > 0 and time.monotonic() - ok_at < _PROBE_OK_TTL
+
+
+def _try_sd_webui(prompts: list[dict], output_dir: Path, probed: bool = False) -> list[str]:
+    """尝试调用本地 Stable Diffusion WebUI API（probed=True 表示调用方已确认可用）"""
+    if not probed and not _probe_sd_available():
+        return []
+
+    try:
+        http = _http_client()
+
+        if not prompts:
             return []
 
-        images = []
-        for i, prompt_info in enumerate(prompts):
-            payload = {
-                "prompt": prompt_info["prompt"],
-                "negative_prompt": prompt_info.get("negative_prompt", ""),
-                "steps": 20,
-                "width": 768,
-                "height": 512,
-                "cfg_scale": 7,
-                "sampler_name": "DPM++ 2M Karras",
+        # 各 prompt 并发提交（共享连接池），按完成顺序落盘，最终按 prompt 顺序返回
+        per_prompt: list[list[str]] = [[] for _ in prompts]
+        workers = min(len(prompts), _SD_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sd-txt2img") as executor:
+            futures = {
+                executor.submit(_sd_txt2img, http, i, prompt_info, output_dir): i
+                for i, prompt_info in enumerate(prompts)
             }
+            for future in as_completed(futures):
+                per_prompt[futures[future]] = future.result()
 
-            resp = httpx.post(
-                "http://host.docker.internal:7860/sdapi/v1/txt2img",
-                json=payload,
-                timeout=120,
-            )
-
-            if resp.status_code == 200:
-                import base64
-                data = resp.json()
-                for j, img_b64 in enumerate(data.get("images", [])):
-                    img_path = output_dir / f"visual_{i + 1}_{j + 1}.png"
-                    img_path.write_bytes(base64.b64decode(img_b64))
-                    images.append(str(img_path))
-                    logger.info(f"SD WebUI 生成图片: {img_path}")
-
-        return images
+        return [path for paths in per_prompt for path in paths]
 
     except Exception as e:
         logger.debug(f"SD WebUI 不可用: {e}")
+        _breaker_record("sd", ok=False)
         return []
 
 
+def _sd_txt2img(http, index: int, prompt_info: dict, output_dir: Path) -> list[str]:
+    """提交单条 txt2img 请求并写出返回的图片，文件名按 prompt 序号编号"""
+    payload = {
+        "prompt": prompt_info["prompt"],
+        "negative_prompt": prompt_info.get("negative_prompt", ""),
+        "steps": 20,
+        "width": 768,
+        "height": 512,
+        "cfg_scale": 7,
+        "sampler_name": "DPM++ 2M Karras",
+    }
+
+    resp = http.post(
+        f"{_SD_BASE_URL}/sdapi/v1/txt2img",
+        json=payload,
+        timeout=120,
+    )
+
+    images = []
+    if resp.status_code == 200:
+        data = resp.json()
+        for j, img_b64 in enumerate(data.get("images", [])):
+            img_path = output_dir / f"visual_{index + 1}_{j + 1}.png"
+            img_path.write_bytes(base64.b64decode(img_b64))
+            images.append(str(img_path))
+            logger.info(f"SD WebUI 生成图片: {img_path}")
+    return images
+
+
 def _try_dalle(prompts: list[dict], output_dir: Path) -> list[str]:
     """尝试调用 OpenAI DALL-E API"""
     try:
@@ -248,32 +382,48 @@ def _try_dalle(prompts: list[dict], output_dir: Path) -> list[str]:
         openai_key = os.getenv("OPENAI_API_KEY", "")
         if not openai_key:
             return []
+        if not _breaker_allow("dalle"):
+            logger.debug("DALL-E 已熔断，跳过")
+            return []
 
-        from openai import OpenAI
-        client = OpenAI(api_key=openai_key)
-
-        images = []
-        for i, prompt_info in enumerate(prompts):
-            response = client.images.generate(
-                model="dall-e-3",
-                prompt=prompt_info["prompt"],
-                size="1024x1024",
-                quality="standard",
-                n=1,
-            )
-
-            if response.data:
-                import httpx
-                img_url = response.data[0].url
-                img_resp = httpx.get(img_url, timeout=30)
-                if img_resp.status_code == 200:
-                    img_path = output_dir / f"visual_{i + 1}.png"
-                    img_path.write_bytes(img_resp.content)
-                    images.append(str(img_path))
-                    logger.info(f"DALL-E 生成图片: {img_path}")
-
+        images = asyncio.run(_try_dalle_async(prompts, output_dir, openai_key))
+        _breaker_record("dalle", ok=True)
         return images
 
     except Exception as e:
         logger.debug(f"DALL-E 不可用: {e}")
+        _breaker_record("dalle", ok=False)
         return []
+
+
+async def _try_dalle_async(prompts: list[dict], output_dir: Path, openai_key: str) -> list[str]:
+    """并发调用 DALL-E 生成并下载图片（信号量限制并发数），按 prompt 顺序返回图片路径"""
+    import httpx
+    from openai import AsyncOpenAI
+
+    semaphore = asyncio.Semaphore(_DALLE_MAX_CONCURRENCY)
+
+    async with AsyncOpenAI(api_key=openai_key) as client, httpx.AsyncClient(timeout=30) as http:
+
+        async def _gen_and_fetch(i: int, prompt_info: dict) -> str | None:
+            async with semaphore:
+                response = await client.images.generate(
+                    model="dall-e-3",
+                    prompt=prompt_info["prompt"],
+                    size="1024x1024",
+                    quality="standard",
+                    n=1,
+                )
+                if not response.data:
+                    return None
+                img_resp = await http.get(response.data[0].url)
+            if img_resp.status_code != 200:
+                return None
+            img_path = output_dir / f"visual_{i + 1}.png"
+            img_path.write_bytes(img_resp.content)
+            logger.info(f"DALL-E 生成图片: {img_path}")
+            return str(img_path)
+
+        paths = await asyncio.gather(*(_gen_and_fetch(i, p) for i, p in enumerate(prompts)))
+
+    return [path for path in paths if path]
@@ -0,0 +1,75 @@
+"""
+yt-dlp 常驻工作进程
+只导入一次 yt_dlp（省去每个 URL 约 1s 的解释器启动 + 提取器导入），从 stdin 逐行读取 JSON 请求，
+向 stdout 逐行写 JSON 响应。由 video_downloader 以独立脚本方式启动，不依赖 deepdistill 包。
+
+请求：{"url": ..., "opts": {YoutubeDL 参数}, "download": bool}
+响应：
+  {"event": "ready"}                                  启动完成
+  {"event": "info", "info": {...}}                    开始下载前的元信息（仅 download=true）
+  {"event": "done", "ok": true, "info": {...}, "filepath": ...}
+  {"event": "done", "ok": false, "error": "...", "info_seen": bool}
+"""
+
+import json
+import sys
+
+
+def main():
+    # 响应通道独占真实 stdout；yt-dlp 自身的任何输出都转到 stderr
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    def send(msg: dict):
+        out.write(json.dumps(msg, ensure_ascii=False) + "\n")
+        out.flush()
+
+    try:
+        import yt_dlp
+        from yt_dlp.postprocessor import PostProcessor
+    except ImportError as e:
+        send({"event": "error", "error": str(e)})
+        return
+
+    class _InfoReporter(PostProcessor):
+        """before_dl 阶段回报元信息（对应 CLI 的 --print before_dl）"""
+
+        def __init__(self, downloader=None):
+            super().__init__(downloader)
+            self.seen = False
+
+        def run(self, info):
+            if not self.seen:
+                self.seen = True
+                send({"event": "info", "info": {k: info.get(k) for k in ("title", "duration", "id", "extractor")}})
+            return [], info
+
+    send({"event": "ready"})
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        req = json.loads(line)
+        download = req.get("download", True)
+        opts = {**req.get("opts", {}), "quiet": True, "no_warnings": True, "noprogress": True}
+        reporter = _InfoReporter()
+        try:
+            if isinstance(opts.get("max_filesize"), str):
+                opts["max_filesize"] = yt_dlp.utils.parse_bytes(opts["max_filesize"])
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                if download:
+                    ydl.add_post_processor(reporter, when="before_dl")
+                info = ydl.extract_info(req["url"], download=download)
+                filepath = None
+                if download:
+                    downloads = info.get("requested_downloads") or [{}]
+                    filepath = downloads[-1].get("filepath") or ydl.prepare_filename(info)
+                    info = {k: info.get(k) for k in ("title", "duration", "id", "extractor")}
+                else:
+                    info = ydl.sanitize_info(info)
+            send({"event": "done", "ok": True, "info": info, "filepath": filepath})
+        except Exception as e:  # yt-dlp 的 DownloadError 等均按失败回报，进程继续服务
+            send({"event": "done", "ok": False, "error": str(e), "info_seen": reporter.seen})
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,9 @@ _TYPE_MAP: dict[str, str] = {
     ".html": "webpage", ".htm": "webpage",
 }
 
+# 排序后的扩展名列表（导入时计算一次）
+_SUPPORTED_EXTENSIONS: tuple[str, ...] = tuple(sorted(_TYPE_MAP))
+
 
 def identify_file_type(file_path: Path) -> str | None:
     """
@@ -40,4 +43,4 @@ def identify_file_type(file_path: Path) -> str | None:
 
 def get_supported_extensions() -> list[str]:
     """返回所有支持的文件扩展名"""
-    return sorted(_TYPE_MAP.keys())
+    return list(_SUPPORTED_EXTENSIONS)
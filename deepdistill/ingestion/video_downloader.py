@@ -13,99 +13,247 @@ Cookie 支持：
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import csv
+import functools
 import json
 import logging
 import os
 import re
+import shutil
 import socket
 import subprocess
+import sys
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from http.cookiejar import DefaultCookiePolicy
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 from urllib.parse import urlparse
 
-import requests as http_requests
+if TYPE_CHECKING:
+    import requests as http_requests
+
+try:
+    import orjson  # 可选：快速解析 yt-dlp --dump-json 输出
+except ImportError:
+    orjson = None
+
+from .router import identify_file_type
 
 logger = logging.getLogger("deepdistill.ingestion.video_downloader")
 
 # yt-dlp 超时配置（秒）
 PROBE_TIMEOUT = int(os.getenv("DEEPDISTILL_VIDEO_PROBE_TIMEOUT", "60"))
+# probe_video_batch 同时探测的 URL 数上限（每个探测可能占用一个 yt-dlp 子进程）
+PROBE_BATCH_CONCURRENCY = 8
 DOWNLOAD_TIMEOUT = int(os.getenv("DEEPDISTILL_VIDEO_DOWNLOAD_TIMEOUT", "600"))
+# 同时进行的视频下载数上限（download_video_async / probe_and_download_async 共用，避免占满带宽）
+VIDEO_CONCURRENCY = max(1, int(os.getenv("DEEPDISTILL_VIDEO_CONCURRENCY", "4")))
+_download_slots = threading.BoundedSemaphore(VIDEO_CONCURRENCY)
 MAX_VIDEO_SIZE = os.getenv("DEEPDISTILL_MAX_VIDEO_SIZE", "500M")
 
+# 是否对任意域名都用 yt-dlp 探测（默认只探测已知视频平台和直链视频文件）
+PROBE_ANY_HOST = os.getenv("DEEPDISTILL_VIDEO_PROBE_ANY_HOST", "0") == "1"
+
+# yt-dlp 输出文件名缺失时，按扩展名在下载目录中兜底查找（不含点）
+_MEDIA_EXTS = frozenset({"mp4", "webm", "mkv", "flv", "avi", "mov", "m4a", "mp3"})
+
+# 视频探测结果缓存（同一 URL 在 TTL 内重复探测直接返回，不再启动 yt-dlp）
+PROBE_CACHE_ENABLE = os.getenv("DEEPDISTILL_PROBE_CACHE_ENABLE", "1") == "1"
+PROBE_CACHE_TTL = int(os.getenv("DEEPDISTILL_PROBE_TTL", "600"))
+_probe_cache: dict[str, tuple[float, dict]] = {}
+_probe_cache_lock = threading.Lock()
+
+# 下载失败时只需要 stderr 末尾的错误信息（取其中最后 500 字符展示）
+_YTDLP_STDERR_TAIL = 4096
+
+# yt-dlp 可执行文件路径（导入时查找一次；未安装时为 None，直接跳过子进程调用）
+_YTDLP_BIN = shutil.which("yt-dlp")
+
+# yt-dlp 常驻工作进程（只导入一次 yt_dlp，省去每个 URL 的启动开销；不可用时回退到 CLI）
+YTDLP_WORKER_ENABLE = os.getenv("DEEPDISTILL_YTDLP_WORKER", "1") == "1"
+_YTDLP_WORKER_SCRIPT = Path(__file__).with_name("_ytdlp_worker.py")
+_YTDLP_WORKER_START_TIMEOUT = 30
+_YTDLP_WORKER_MAX_IDLE = 2
+_idle_workers: list[subprocess.Popen] = []
+_worker_lock = threading.Lock()
+_worker_unavailable = False
+
 # Cookie 文件目录（Netscape 格式）
 COOKIE_DIR = Path(os.getenv("DEEPDISTILL_COOKIE_DIR", "config/cookies"))
 
-# 需要 Cookie 的关键词
+# 需要 Cookie 的关键词（忽略大小写的预编译正则，一次扫描匹配任一关键词）
 _COOKIE_REQUIRED_KEYWORDS = ["cookie", "login", "sign in", "logged in"]
+_RE_COOKIE_REQUIRED = re.compile("|".join(map(re.escape, _COOKIE_REQUIRED_KEYWORDS)), re.IGNORECASE)
 
 # 抖音域名标识
 _DOUYIN_HOSTS = {"douyin.com", "iesdouyin.com"}
 
+# 域名关键词 -> 平台名称（按顺序匹配）
+_PLATFORM_HINTS: tuple[tuple[str, str], ...] = (
+    ("douyin", "抖音"), ("tiktok", "TikTok"), ("bilibili", "B站"), ("b23.tv", "B站"),
+    ("youtube", "YouTube"), ("youtu.be", "YouTube"), ("xiaohongshu", "小红书"),
+    ("xhslink", "小红书"), ("kuaishou", "快手"), ("weibo", "微博"),
+    ("twitter", "Twitter/X"), ("x.com", "Twitter/X"), ("instagram", "Instagram"),
+    ("vimeo", "Vimeo"), ("dailymotion", "Dailymotion"), ("facebook", "Facebook"),
+    ("twitch", "Twitch"),
+)
+
+# 预编译正则：抖音视频 ID 提取与分享页 _ROUTER_DATA 赋值位置定位
+_RE_VID_PATH = re.compile(r"/video/(\d+)")
+_RE_AWEME = re.compile(r"aweme_id=(\d+)")
+_RE_SHORT = re.compile(r"/(\d{15,})/?")
+_RE_ROUTER = re.compile(r"window\._ROUTER_DATA\s*=\s*(?={)")
+
+# 从指定位置解析一个完整 JSON 值（只读取到该值结束，不需要先截取文本）
+_JSON_DECODER = json.JSONDecoder()
+
+# 视频文件下载的读写缓冲区大小
+_DOWNLOAD_COPY_BUFFER = 8 * 1024 * 1024
+
+# CDN 并行 DNS 预检线程数与下载竞速并发数
+_CDN_DNS_WORKERS = 8
+_CDN_RACE_WIDTH = 3
+
+# CDN 域名解析结果缓存：域名 -> (是否可解析, 解析时间)
+_DNS_CACHE_TTL = 60  # 秒
+_dns_cache: dict[str, tuple[bool, float]] = {}
+_dns_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _req_session() -> http_requests.Session:
+    """
+    共享 HTTP 会话（首次使用时创建）：复用连接池（keep-alive），避免每次请求重新建立 TCP/TLS 连接。
+    不保存响应下发的 Cookie，Cookie 仍按请求显式传入，避免不同视频/账号之间串用。
+    requests 在这里才导入：只处理本地文件或非抖音 URL 时不加载 requests/urllib3。
+    """
+    import requests as http_requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = http_requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    # 连接池按 CDN 并发量放大；网关类 5xx 短暂退避重试，重试用尽时返回最后的响应交给调用方按状态码处理
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 # ─── 工具函数 ───
 
+@dataclass(frozen=True)
+class _UrlMeta:
+    """单个 URL 的域名相关信息（每个 URL 只解析一次）"""
+    netloc: str
+    platform: str
+    is_douyin: bool
+    looks_like_video: bool
+    cookie_bucket: tuple[str, ...]
+
+
+@functools.lru_cache(maxsize=1024)
+def _url_meta(url: str) -> _UrlMeta:
+    """解析 URL 并按域名匹配平台、抖音、视频及 Cookie 分组，结果按 URL 缓存"""
+    parsed = urlparse(url)
+    netloc = parsed.netloc
+    host = netloc.lower()
+    platform = next((name for keyword, name in _PLATFORM_HINTS if keyword in host), None)
+    # 已知视频平台域名，或路径是视频文件扩展名
+    looks_like_video = parsed.scheme in ("http", "https") and (
+        platform is not None or identify_file_type(Path(parsed.path)) == "video"
+    )
+    return _UrlMeta(
+        netloc=netloc,
+        platform=platform or netloc,
+        is_douyin=any(d in host for d in _DOUYIN_HOSTS),
+        looks_like_video=looks_like_video,
+        cookie_bucket=_cookie_bucket(host),
+    )
+
+
 def _get_platform_hint(url: str) -> str:
     """从 URL 推断平台名称（仅用于日志和显示）"""
-    host = urlparse(url).netloc.lower()
-    hints = {
-        "douyin": "抖音", "tiktok": "TikTok", "bilibili": "B站", "b23.tv": "B站",
-        "youtube": "YouTube", "youtu.be": "YouTube", "xiaohongshu": "小红书",
-        "xhslink": "小红书", "kuaishou": "快手", "weibo": "微博",
-        "twitter": "Twitter/X", "x.com": "Twitter/X", "instagram": "Instagram",
-        "vimeo": "Vimeo", "dailymotion": "Dailymotion", "facebook": "Facebook",
-        "twitch": "Twitch",
-    }
-    for keyword, name in hints.items():
-        if keyword in host:
-            return name
-    return urlparse(url).netloc
+    return _url_meta(url).platform
+
+
+def _looks_like_video_url(url: str) -> bool:
+    """URL 是否可能是视频：http(s) 且为已知视频平台域名，或路径是视频文件扩展名"""
+    return _url_meta(url).looks_like_video
 
 
 def _is_douyin_url(url: str) -> bool:
     """判断是否为抖音 URL（含短链接）"""
-    host = urlparse(url).netloc.lower()
-    return any(d in host for d in _DOUYIN_HOSTS)
+    return _url_meta(url).is_douyin
 
 
 def _find_cookie_file(url: str) -> Path | None:
     """根据 URL 域名查找对应的 Cookie 文件"""
-    if not COOKIE_DIR.exists():
+    try:
+        dir_mtime_ns = COOKIE_DIR.stat().st_mtime_ns
+    except OSError:
         return None
+    # 先把域名归到平台 Cookie 文件名分组，再按 (分组, 目录, 目录 mtime) 缓存查找结果：
+    # 同一平台的不同子域名共用缓存，新增/删除 Cookie 文件后目录 mtime 变化自动重新查找
+    cookie_path = _lookup_cookie(_url_meta(url).cookie_bucket, str(COOKIE_DIR), dir_mtime_ns)
+    return Path(cookie_path) if cookie_path else None
+
+
+# 域名关键词 -> Cookie 文件名（按顺序匹配）
+_COOKIE_DOMAIN_MAP: tuple[tuple[str, str], ...] = (
+    ("douyin", "douyin.txt"), ("tiktok", "tiktok.txt"),
+    ("bilibili", "bilibili.txt"), ("b23.tv", "bilibili.txt"),
+    ("xiaohongshu", "xiaohongshu.txt"), ("xhslink", "xiaohongshu.txt"),
+    ("kuaishou", "kuaishou.txt"), ("weibo", "weibo.txt"),
+    ("instagram", "instagram.txt"), ("facebook", "facebook.txt"),
+)
+
+
+def _cookie_bucket(host: str) -> tuple[str, ...]:
+    """域名对应的候选 Cookie 文件名（按优先级，末尾总是 default.txt）"""
+    names = dict.fromkeys(filename for keyword, filename in _COOKIE_DOMAIN_MAP if keyword in host)
+    return (*names, "default.txt")
+
+
+@functools.lru_cache(maxsize=32)
+def _lookup_cookie(bucket: tuple[str, ...], cookie_dir: str, dir_mtime_ns: int) -> str | None:
+    """在 Cookie 目录中按候选文件名顺序查找第一个存在的文件"""
+    for filename in bucket:
+        cookie_path = os.path.join(cookie_dir, filename)
+        if os.path.exists(cookie_path):
+            return cookie_path
+    return None
 
-    host = urlparse(url).netloc.lower()
-    domain_map = {
-        "douyin": "douyin.txt", "tiktok": "tiktok.txt",
-        "bilibili": "bilibili.txt", "b23.tv": "bilibili.txt",
-        "xiaohongshu": "xiaohongshu.txt", "xhslink": "xiaohongshu.txt",
-        "kuaishou": "kuaishou.txt", "weibo": "weibo.txt",
-        "instagram": "instagram.txt", "facebook": "facebook.txt",
-    }
-    for keyword, filename in domain_map.items():
-        if keyword in host:
-            cookie_path = COOKIE_DIR / filename
-            if cookie_path.exists():
-                return cookie_path
 
-    default_cookie = COOKIE_DIR / "default.txt"
-    return default_cookie if default_cookie.exists() else None
+def _load_cookies_as_dict(cookie_file: Path) -> dict[str, str]:
+    """将 Netscape 格式 Cookie 文件解析为 dict（按文件路径 + mtime 缓存，文件更新后重新解析）"""
+    return dict(_parse_cookie_file(str(cookie_file), cookie_file.stat().st_mtime_ns))
 
 
-def _load_cookies_as_dict(cookie_file: Path) -> dict[str, str]:
-    """将 Netscape 格式 Cookie 文件解析为 dict"""
+@functools.lru_cache(maxsize=16)
+def _parse_cookie_file(cookie_file: str, mtime_ns: int) -> dict[str, str]:
+    # csv 模块的 C 分词器按 Tab 切分（QUOTE_NONE：引号按普通字符处理），空行得到空列表
     cookies = {}
-    with open(cookie_file, encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#"):
-                parts = line.split("\t")
-                if len(parts) >= 7:
-                    cookies[parts[5]] = parts[6]
+    with open(cookie_file, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if len(row) >= 7 and not row[0].lstrip().startswith("#"):
+                cookies[row[5]] = row[6].rstrip()
     return cookies
 
 
 def _is_cookie_error(stderr: str) -> bool:
     """检查 yt-dlp 错误信息是否表示需要 Cookie"""
-    return any(kw in stderr.lower() for kw in _COOKIE_REQUIRED_KEYWORDS)
+    return _RE_COOKIE_REQUIRED.search(stderr) is not None
 
 
 class VideoCookieRequired(RuntimeError):
@@ -123,32 +271,17 @@ class VideoCookieRequired(RuntimeError):
 
 # ─── 抖音辅助函数 ───
 
-def _can_resolve_host(url: str, timeout: float = 3.0) -> bool:
-    """快速检测 URL 中的域名是否可 DNS 解析（避免长时间等待不可达的 CDN）"""
-    try:
-        host = urlparse(url).netloc.split(":")[0]
-        socket.setdefaulttimeout(timeout)
-        socket.getaddrinfo(host, 443)
-        return True
-    except (socket.gaierror, socket.timeout, OSError):
-        return False
-    finally:
-        socket.setdefaulttimeout(None)
-
-
 def _collect_douyin_video_urls(video_obj: dict) -> list[str]:
     """
     从抖音视频对象中收集所有可用的 CDN URL（多来源汇总，去重）。
     来源优先级：play_addr > download_addr > bit_rate
     """
-    urls: list[str] = []
-    seen: set[str] = set()
+    # dict 保持插入顺序，兼作去重集合
+    ordered: dict[str, None] = {}
 
     def _add_urls(url_list: list):
-        for u in url_list:
-            if isinstance(u, str) and u not in seen:
-                seen.add(u)
-                urls.append(u)
+        # 只收集非空字符串 URL
+        ordered.update((u, None) for u in url_list if isinstance(u, str) and u)
 
     # 来源 1: play_addr.url_list（标准播放地址，通常 2-3 个 CDN）
     play_addr = video_obj.get("play_addr", {})
@@ -164,7 +297,71 @@ def _collect_douyin_video_urls(video_obj: dict) -> list[str]:
             pa = br.get("play_addr", {})
             _add_urls(pa.get("url_list", []))
 
-    return urls
+    return list(ordered)
+
+
+def _resolve_hosts(hosts: list[str], timeout: float = 3.0) -> dict[str, bool]:
+    """
+    并行 DNS 解析多个域名，超时未返回的视为不可解析。
+    结果按域名缓存 _DNS_CACHE_TTL 秒，同一进程内重复下载不再重复解析。
+    """
+    now = time.monotonic()
+    with _dns_cache_lock:
+        result = {h: _dns_cache[h][0] for h in hosts if h in _dns_cache and now - _dns_cache[h][1] < _DNS_CACHE_TTL}
+    pending = [h for h in hosts if h not in result]
+    if not pending:
+        return result
+
+    def _resolve(host: str) -> bool:
+        try:
+            socket.getaddrinfo(host, 443)
+            return True
+        except (socket.gaierror, socket.timeout, OSError):
+            return False
+
+    executor = ThreadPoolExecutor(max_workers=min(len(pending), _CDN_DNS_WORKERS),
+                                  thread_name_prefix="cdn-dns")
+    futures = {host: executor.submit(_resolve, host) for host in pending}
+    wait(futures.values(), timeout=timeout)
+    # 不等待卡住的解析线程（getaddrinfo 本身不可中断）；超时时长由 wait 控制，不改全局 socket 超时
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    resolved = {host: f.done() and not f.cancelled() and f.result() for host, f in futures.items()}
+    with _dns_cache_lock:
+        # 只缓存已完成的解析结果，超时的下次重新解析
+        for host, f in futures.items():
+            if f.done() and not f.cancelled():
+                _dns_cache[host] = (resolved[host], now)
+    result.update(resolved)
+    return result
+
+
+def _fetch_cdn(url: str, headers: dict, timeout: int, label: str) -> http_requests.Response | None:
+    """请求单个 CDN URL，200 返回流式 Response，其他情况记录日志并返回 None"""
+    import requests as http_requests
+
+    host = urlparse(url).netloc.split(":")[0]
+    try:
+        resp = _req_session().get(url, headers=headers, stream=True, timeout=timeout)
+        if resp.status_code == 200:
+            logger.info(f"CDN [{label}] 下载成功: {host}")
+            return resp
+        resp.close()  # 未读取的流式响应需关闭，连接才能回到连接池
+        logger.warning(f"CDN [{label}] HTTP {resp.status_code}: {host}")
+    except http_requests.exceptions.ConnectionError as e:
+        logger.warning(f"CDN [{label}] 连接失败: {host} - {e}")
+    except http_requests.exceptions.Timeout:
+        logger.warning(f"CDN [{label}] 超时: {host}")
+    except Exception as e:
+        logger.warning(f"CDN [{label}] 异常: {host} - {e}")
+    return None
+
+
+def _close_response(future):
+    """竞速落败的请求完成后关闭其响应"""
+    resp = future.result()  # _fetch_cdn 内部已捕获异常
+    if resp is not None:
+        resp.close()
 
 
 def _try_download_video(candidate_urls: list[str], headers: dict,
@@ -172,33 +369,56 @@ def _try_download_video(candidate_urls: list[str], headers: dict,
     """
     尝试从候选 URL 列表下载视频，DNS 不可达自动跳过，返回第一个成功的 Response。
     对每个 URL 同时尝试无水印版本（playwm → play）。
+    所有候选域名先并行 DNS 预检；排在最前的几个 CDN 的首选版本并发竞速，
+    取最先返回 200 的；都失败时再按原优先级逐个尝试其余 URL。
     """
+    total = len(candidate_urls)
+    hosts = list(dict.fromkeys(urlparse(u).netloc.split(":")[0] for u in candidate_urls))
+    resolvable = _resolve_hosts(hosts)
+
+    # 按优先级展开：每个 CDN 无水印优先、原始 URL 兜底；同一 CDN 的两个版本域名相同
+    groups: list[tuple[str, list[str]]] = []
     for i, raw_url in enumerate(candidate_urls, 1):
-        # 生成无水印和原始两个版本
+        host = urlparse(raw_url).netloc.split(":")[0]
+        if not resolvable[host]:
+            logger.warning(f"CDN [{i}/{total}] DNS 不可达，跳过: {host}")
+            continue
         nowm_url = raw_url.replace("/playwm/", "/play/")
-        variants = [nowm_url] if nowm_url != raw_url else [raw_url]
-        if nowm_url != raw_url:
-            variants.append(raw_url)  # 无水印优先，原始 URL 兜底
+        variants = [nowm_url, raw_url] if nowm_url != raw_url else [raw_url]
+        groups.append((f"{i}/{total}", variants))
 
-        for url in variants:
-            # DNS 预检：快速跳过不可解析的 CDN 域名
-            host = urlparse(url).netloc.split(":")[0]
-            if not _can_resolve_host(url):
-                logger.warning(f"CDN [{i}/{len(candidate_urls)}] DNS 不可达，跳过: {host}")
-                break  # 同一 CDN 的无水印/原始版本域名一样，跳过整组
+    if not groups:
+        return None
 
-            try:
-                resp = http_requests.get(url, headers=headers, stream=True, timeout=timeout)
-                if resp.status_code == 200:
-                    logger.info(f"CDN [{i}/{len(candidate_urls)}] 下载成功: {host}")
-                    return resp
-                logger.warning(f"CDN [{i}/{len(candidate_urls)}] HTTP {resp.status_code}: {host}")
-            except http_requests.exceptions.ConnectionError as e:
-                logger.warning(f"CDN [{i}/{len(candidate_urls)}] 连接失败: {host} - {e}")
-            except http_requests.exceptions.Timeout:
-                logger.warning(f"CDN [{i}/{len(candidate_urls)}] 超时: {host}")
-            except Exception as e:
-                logger.warning(f"CDN [{i}/{len(candidate_urls)}] 异常: {host} - {e}")
+    # 竞速：前 K 个 CDN 的首选版本并发请求
+    racers = groups[:_CDN_RACE_WIDTH]
+    if len(racers) > 1:
+        executor = ThreadPoolExecutor(max_workers=len(racers), thread_name_prefix="cdn-race")
+        futures = [executor.submit(_fetch_cdn, variants[0], headers, timeout, label)
+                   for label, variants in racers]
+        winner = None
+        for future in as_completed(futures):
+            if future.result() is not None:
+                winner = future.result()
+                break
+        executor.shutdown(wait=False)
+        if winner is not None:
+            # 关闭其余竞速请求的响应（未完成的在完成后关闭）
+            for future in futures:
+                if future.done() and future.result() is winner:
+                    continue
+                future.add_done_callback(_close_response)
+            return winner
+        remaining = [(label, variants[1:]) for label, variants in racers] + groups[len(racers):]
+    else:
+        remaining = groups
+
+    # 兜底：按优先级串行尝试剩余 URL
+    for label, variants in remaining:
+        for url in variants:
+            resp = _fetch_cdn(url, headers, timeout, label)
+            if resp is not None:
+                return resp
 
     return None
 
@@ -209,7 +429,7 @@ def _douyin_resolve_url(url: str) -> str:
     """解析抖音短链接，获取真实 URL 和视频 ID"""
     logger.info(f"解析抖音短链接: {url}")
     try:
-        r = http_requests.head(
+        r = _req_session().head(
             url, allow_redirects=True, timeout=10,
             headers={"User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X)"},
         )
@@ -224,20 +444,78 @@ def _douyin_resolve_url(url: str) -> str:
 def _douyin_extract_video_id(url: str) -> str | None:
     """从抖音 URL 提取视频 ID（aweme_id）"""
     # 从 URL 路径提取: /video/7604065517855163505
-    match = re.search(r"/video/(\d+)", url)
+    match = _RE_VID_PATH.search(url)
     if match:
         return match.group(1)
     # 从 URL 参数提取
-    match = re.search(r"aweme_id=(\d+)", url)
+    match = _RE_AWEME.search(url)
     if match:
         return match.group(1)
     # 从短链接路径提取纯数字
-    match = re.search(r"/(\d{15,})/?", url)
+    match = _RE_SHORT.search(url)
     if match:
         return match.group(1)
     return None
 
 
+def _extract_router_data(html: str) -> dict:
+    """
+    从抖音分享页 HTML 中解析 window._ROUTER_DATA。
+    定位赋值位置后从 `{` 处直接解析，JSON 解析器在对象结束处停止：
+    不依赖 `</script>` 边界，也不会对整个页面做正则回溯。
+    安装了 orjson 时先按 `</script>` 截取整段交给 orjson（更快）；
+    截取结果不是完整 JSON（如字符串里含 `</script>`）时再回退到逐字符解析。
+    """
+    router_match = _RE_ROUTER.search(html)
+    if not router_match:
+        raise RuntimeError(
+            "抖音页面结构变化，无法提取视频数据。\n"
+            "可能原因：Cookie 过期或视频不存在"
+        )
+
+    if orjson is not None:
+        end = html.find("</script>", router_match.end())
+        if end != -1:
+            try:
+                return orjson.loads(html[router_match.end():end].rstrip().rstrip(";"))
+            except orjson.JSONDecodeError:
+                pass
+
+    try:
+        router_data, _end = _JSON_DECODER.raw_decode(html, router_match.end())
+    except json.JSONDecodeError:
+        raise RuntimeError("抖音视频数据 JSON 解析失败")
+    return router_data
+
+
+def _search_video_in_router_data(router_data, max_depth: int = 12) -> tuple[list[str], str, int]:
+    """
+    深度优先搜索第一个含 desc + video 且能收集到播放地址的对象，
+    返回 (候选 URL 列表, 标题, 时长)；深度超过 max_depth 的节点不再展开。
+    用显式栈代替递归；只有 dict/list 会入栈，子节点逆序入栈以保持原先的先序遍历顺序
+    （不改用 BFS：页面中可能有多个含 desc + video 的对象，BFS 会改变命中的是哪一个）。
+    """
+    stack = [(router_data, 0)]
+    while stack:
+        obj, depth = stack.pop()
+        if isinstance(obj, dict):
+            if "desc" in obj and "video" in obj and isinstance(obj["video"], dict):
+                urls = _collect_douyin_video_urls(obj["video"])
+                if urls:
+                    return urls, obj.get("desc", ""), obj["video"].get("duration", 0)
+            children = obj.values()
+        elif isinstance(obj, list):
+            children = obj
+        else:
+            continue
+        if depth < max_depth:
+            stack.extend(
+                (child, depth + 1) for child in reversed(children)
+                if isinstance(child, (dict, list))
+            )
+    return [], "", 0
+
+
 def _douyin_download(url: str, save_dir: Path) -> tuple[Path, dict]:
     """
     抖音专用下载器（绕过 yt-dlp Douyin 提取器 bug #9667）：
@@ -286,25 +564,13 @@ def _douyin_download(url: str, save_dir: Path) -> tuple[Path, dict]:
     }
 
     logger.info(f"请求抖音移动端分享页: {share_url}")
-    resp = http_requests.get(share_url, headers=headers, cookies=cookies, timeout=15)
+    resp = _req_session().get(share_url, headers=headers, cookies=cookies, timeout=15)
 
     if resp.status_code != 200:
         raise RuntimeError(f"抖音分享页请求失败: HTTP {resp.status_code}")
 
     # Step 4: 从 _ROUTER_DATA 提取视频信息
-    router_match = re.search(
-        r"window\._ROUTER_DATA\s*=\s*({.*?})\s*</script>", resp.text, re.DOTALL,
-    )
-    if not router_match:
-        raise RuntimeError(
-            "抖音页面结构变化，无法提取视频数据。\n"
-            "可能原因：Cookie 过期或视频不存在"
-        )
-
-    try:
-        router_data = json.loads(router_match.group(1))
-    except json.JSONDecodeError:
-        raise RuntimeError("抖音视频数据 JSON 解析失败")
+    router_data = _extract_router_data(resp.text)
 
     # 从 _ROUTER_DATA 中定位视频详情
     # 路径: loaderData -> "video_(id)/page" -> videoInfoRes -> item_list[0]
@@ -336,31 +602,9 @@ def _douyin_download(url: str, save_dir: Path) -> tuple[Path, dict]:
     except (KeyError, IndexError, TypeError) as e:
         logger.warning(f"标准路径提取失败: {e}")
 
-    # 兜底：递归搜索（同样收集所有 URL）
+    # 兜底：深度优先搜索整个 _ROUTER_DATA（同样收集所有 URL）
     if not candidate_urls:
-        def _recursive_find(obj, depth=0):
-            if depth > 12:
-                return [], "", 0
-            if isinstance(obj, dict):
-                if "desc" in obj and "video" in obj:
-                    d = obj.get("desc", "")
-                    v = obj["video"]
-                    dur = v.get("duration", 0)
-                    urls = _collect_douyin_video_urls(v)
-                    if urls:
-                        return urls, d, dur
-                for val in obj.values():
-                    r = _recursive_find(val, depth + 1)
-                    if r[0]:
-                        return r
-            elif isinstance(obj, list):
-                for item in obj:
-                    r = _recursive_find(item, depth + 1)
-                    if r[0]:
-                        return r
-            return [], "", 0
-
-        candidate_urls, title, duration = _recursive_find(router_data)
+        candidate_urls, title, duration = _search_video_in_router_data(router_data)
         if isinstance(duration, (int, float)) and duration > 1000:
             duration = int(duration // 1000)
 
@@ -400,11 +644,12 @@ def _douyin_download(url: str, save_dir: Path) -> tuple[Path, dict]:
         )
 
     file_path = save_dir / f"{video_id}.mp4"
-    total = 0
-    with open(file_path, "wb") as f:
-        for chunk in dl_resp.iter_content(chunk_size=1024 * 1024):
-            f.write(chunk)
-            total += len(chunk)
+    # 直接从底层连接流式拷贝（解压交给 urllib3），大块读写减少每 MB 的对象分配和系统调用；
+    # 每块都不小于文件缓冲区，BufferedWriter 会直接落盘，无需再分配同样大小的写缓冲
+    with dl_resp, open(file_path, "wb") as f:
+        dl_resp.raw.decode_content = True
+        shutil.copyfileobj(dl_resp.raw, f, length=_DOWNLOAD_COPY_BUFFER)
+        total = f.tell()
 
     size_mb = total / 1024 / 1024
     logger.info(f"抖音视频下载完成: {file_path.name} ({size_mb:.1f}MB)")
@@ -420,12 +665,169 @@ def _douyin_download(url: str, save_dir: Path) -> tuple[Path, dict]:
 
 # ─── 通用入口 ───
 
+def _run_ytdlp(cmd: list[str], timeout: int, cwd: str | None = None,
+               first_line_only: bool = False, stderr_tail: int | None = None,
+               on_line: Callable[[str], None] | None = None) -> tuple[int, str, str]:
+    """
+    运行 yt-dlp，逐行读取 stdout，不缓存全部输出。
+    返回 (退出码, 最后一个非空行或首个非空行, stderr)。
+    first_line_only=True 时读到首个非空行（--dump-json 的 JSON）即结束进程，视为成功。
+    on_line 指定时每读到一个非空行都会回调（用于边下载边解析 --print 输出）。
+    stderr 写入临时文件，避免管道写满阻塞子进程；stderr_tail 指定时只读回末尾这么多字节。
+    超时则结束进程并抛出 TimeoutExpired。
+    """
+    with tempfile.TemporaryFile() as err_file:
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=err_file, text=True, cwd=cwd,
+        )
+        timed_out = threading.Event()
+
+        def _kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, _kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            line = ""
+            with proc.stdout:
+                for raw in proc.stdout:
+                    if raw.strip():
+                        line = raw.strip()
+                        if on_line is not None:
+                            on_line(line)
+                        if first_line_only:
+                            break
+            if first_line_only and line:
+                proc.terminate()  # 已拿到所需输出，提前结束 yt-dlp
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if first_line_only and line:
+            returncode = 0
+
+        size = err_file.seek(0, os.SEEK_END)
+        err_file.seek(max(0, size - stderr_tail) if stderr_tail else 0)
+        stderr = err_file.read().decode("utf-8", errors="replace")
+    return returncode, line, stderr
+
+
+def _worker_read(proc: subprocess.Popen) -> dict:
+    """读取工作进程的一行响应；进程退出（含超时被杀）时抛出 EOFError"""
+    line = proc.stdout.readline()
+    if not line:
+        raise EOFError("yt-dlp 工作进程已退出")
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def _worker_spawn() -> subprocess.Popen | None:
+    """启动一个工作进程并等待就绪；yt_dlp 不可导入时记为不可用，之后不再尝试"""
+    global _worker_unavailable
+    proc = subprocess.Popen(
+        [sys.executable, str(_YTDLP_WORKER_SCRIPT)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, encoding="utf-8",
+    )
+    timer = threading.Timer(_YTDLP_WORKER_START_TIMEOUT, proc.kill)
+    timer.daemon = True
+    timer.start()
+    try:
+        msg = _worker_read(proc)
+    except (EOFError, json.JSONDecodeError):
+        msg = {"event": "error", "error": "启动失败"}
+    finally:
+        timer.cancel()
+    if msg.get("event") != "ready":
+        logger.info(f"yt-dlp 工作进程不可用，改用命令行: {msg.get('error')}")
+        _worker_unavailable = True
+        proc.kill()
+        proc.wait()
+        return None
+    return proc
+
+
+def _worker_call(url: str, opts: dict, download: bool, timeout: int,
+                 on_info: Callable[[dict], None] | None = None) -> dict | None:
+    """
+    通过常驻工作进程执行一次 yt-dlp 提取/下载，返回 done 响应。
+    工作进程不可用或中途退出时返回 None（调用方回退到 CLI）；超时则结束该进程并抛出 TimeoutExpired。
+    """
+    if not YTDLP_WORKER_ENABLE or _worker_unavailable:
+        return None
+    with _worker_lock:
+        proc = _idle_workers.pop() if _idle_workers else None
+    if proc is None or proc.poll() is not None:
+        try:
+            proc = _worker_spawn()
+        except OSError as e:
+            logger.warning(f"yt-dlp 工作进程启动失败: {e}")
+            return None
+        if proc is None:
+            return None
+
+    timed_out = threading.Event()
+
+    def _kill():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, _kill)
+    timer.daemon = True
+    timer.start()
+    try:
+        proc.stdin.write(json.dumps({"url": url, "opts": opts, "download": download}, ensure_ascii=False) + "\n")
+        proc.stdin.flush()
+        while True:
+            msg = _worker_read(proc)
+            if msg.get("event") == "info":
+                if on_info is not None:
+                    on_info(msg["info"])
+            elif msg.get("event") == "done":
+                break
+    except (EOFError, OSError, json.JSONDecodeError) as e:
+        proc.kill()
+        proc.wait()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(url, timeout)
+        logger.warning(f"yt-dlp 工作进程异常退出，改用命令行: {e}")
+        return None
+    finally:
+        timer.cancel()
+
+    with _worker_lock:
+        if len(_idle_workers) < _YTDLP_WORKER_MAX_IDLE:
+            _idle_workers.append(proc)
+            proc = None
+    if proc is not None:
+        proc.stdin.close()
+        proc.wait()
+    return msg
+
+
+@atexit.register
+def _close_idle_workers():
+    """进程退出时关闭空闲工作进程（关闭 stdin 后工作进程自行结束）"""
+    with _worker_lock:
+        workers, _idle_workers[:] = list(_idle_workers), []
+    for proc in workers:
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+
+
 def probe_video(url: str) -> dict | None:
     """
     探测 URL 是否包含可下载的视频。
 
     对抖音 URL：直接返回基本信息（跳过 yt-dlp 的已知 bug）
-    对其他 URL：使用 yt-dlp --dump-json 探测
+    对已知视频平台 / 视频直链：使用 yt-dlp --dump-json 探测
+    其他 URL 直接返回 None（设置 DEEPDISTILL_VIDEO_PROBE_ANY_HOST=1 可对任意域名探测）
+    成功的探测结果按 URL（去掉 #fragment）缓存 PROBE_CACHE_TTL 秒。
 
     Returns:
         视频元信息 dict，或 None（非视频/不支持）
@@ -433,6 +835,59 @@ def probe_video(url: str) -> dict | None:
     Raises:
         VideoCookieRequired: 确认是视频平台但需要 Cookie
     """
+    if not PROBE_CACHE_ENABLE:
+        return _probe_video_uncached(url)
+
+    key = urlparse(url)._replace(fragment="").geturl()
+    now = time.monotonic()
+    with _probe_cache_lock:
+        cached = _probe_cache.get(key)
+        if cached and now - cached[0] < PROBE_CACHE_TTL:
+            logger.info(f"视频探测命中缓存: {url}")
+            return dict(cached[1])
+
+    info = _probe_video_uncached(url)
+    if info:
+        with _probe_cache_lock:
+            _probe_cache[key] = (now, info)
+            # 顺带清理过期条目，避免常驻进程中缓存无限增长
+            for k in [k for k, (t, _info) in _probe_cache.items() if now - t >= PROBE_CACHE_TTL]:
+                del _probe_cache[k]
+        return dict(info)
+    return info
+
+
+async def probe_video_batch(urls: list[str], max_concurrency: int = PROBE_BATCH_CONCURRENCY) -> list:
+    """
+    并发探测多个 URL，结果顺序与输入一致。
+
+    每个 URL 走 probe_video（抖音直接解析、非视频域名不启动 yt-dlp、结果缓存），
+    阻塞的探测放到线程池中执行，同时最多 max_concurrency 个；重复的 URL 只探测一次。
+
+    Returns:
+        每个 URL 对应视频元信息 dict 或 None；需要 Cookie 的 URL 位置上是 VideoCookieRequired 实例
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _probe(url: str):
+        async with semaphore:
+            return await loop.run_in_executor(None, probe_video, url)
+
+    unique = list(dict.fromkeys(urls))
+    results = await asyncio.gather(*(_probe(url) for url in unique), return_exceptions=True)
+    by_url = {}
+    for url, result in zip(unique, results):
+        if isinstance(result, Exception) and not isinstance(result, VideoCookieRequired):
+            logger.warning(f"视频探测异常: {url}: {result}")
+            result = None
+        by_url[url] = result
+    # 重复 URL 各自拿一份拷贝，避免调用方修改时互相影响
+    return [dict(by_url[url]) if isinstance(by_url[url], dict) else by_url[url] for url in urls]
+
+
+def _probe_video_uncached(url: str) -> dict | None:
+    """probe_video 的实际探测逻辑（不经缓存）"""
     platform = _get_platform_hint(url)
     logger.info(f"探测视频: {platform} - {url}")
 
@@ -453,23 +908,53 @@ def probe_video(url: str) -> dict | None:
         return None
 
     # ── 通用 yt-dlp 路径 ──
+    # 非视频平台 URL（文章页、文档等）直接跳过，不启动 yt-dlp 子进程
+    if not PROBE_ANY_HOST and not _looks_like_video_url(url):
+        logger.debug(f"非已知视频平台，跳过 yt-dlp 探测: {url}")
+        return None
+
+    cookie_file = _find_cookie_file(url)
+
+    opts = {"noplaylist": True, "nocheckcertificate": True}
+    if cookie_file:
+        opts["cookiefile"] = str(cookie_file)
+    try:
+        resp = _worker_call(url, opts, download=False, timeout=PROBE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"视频探测超时（{PROBE_TIMEOUT}s）: {url}")
+        return None
+    if resp is not None:
+        if not resp["ok"]:
+            if _is_cookie_error(resp["error"]):
+                logger.warning(f"{platform} 需要 Cookie: {resp['error'][:200]}")
+                raise VideoCookieRequired(platform, url)
+            logger.debug(f"非视频 URL: {url}")
+            return None
+        info = resp["info"]
+        logger.info(
+            f"探测到视频: {info.get('title', '未知')} "
+            f"(时长: {info.get('duration', '?')}s)"
+        )
+        return info
+
+    if _YTDLP_BIN is None:
+        logger.warning("yt-dlp 未安装，跳过视频探测")
+        return None
+
     cmd = [
-        "yt-dlp",
+        _YTDLP_BIN,
         "--dump-json",
         "--no-playlist",
         "--no-check-certificates",
         url,
     ]
 
-    cookie_file = _find_cookie_file(url)
     if cookie_file:
         cmd.insert(-1, "--cookies")
         cmd.insert(-1, str(cookie_file))
 
     try:
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=PROBE_TIMEOUT,
-        )
+        returncode, first_line, stderr = _run_ytdlp(cmd, PROBE_TIMEOUT, first_line_only=True)
     except FileNotFoundError:
         logger.warning("yt-dlp 未安装，跳过视频探测")
         return None
@@ -477,8 +962,8 @@ def probe_video(url: str) -> dict | None:
         logger.warning(f"视频探测超时（{PROBE_TIMEOUT}s）: {url}")
         return None
 
-    if result.returncode != 0:
-        stderr = result.stderr.strip()
+    if returncode != 0:
+        stderr = stderr.strip()
         if _is_cookie_error(stderr):
             logger.warning(f"{platform} 需要 Cookie: {stderr[:200]}")
             raise VideoCookieRequired(platform, url)
@@ -486,8 +971,8 @@ def probe_video(url: str) -> dict | None:
         return None
 
     try:
-        first_line = result.stdout.strip().split("\n")[0]
-        info = json.loads(first_line)
+        # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，下面的 except 同样适用
+        info = orjson.loads(first_line) if orjson is not None else json.loads(first_line)
         logger.info(
             f"探测到视频: {info.get('title', '未知')} "
             f"(时长: {info.get('duration', '?')}s)"
@@ -498,6 +983,25 @@ def probe_video(url: str) -> dict | None:
         return None
 
 
+def _latest_media_file(save_dir: Path) -> Path | None:
+    """单次 scandir 遍历，返回目录中最近修改的非空音视频文件（每个文件只 stat 一次）"""
+    best_mtime, best_name = -1.0, None
+    with os.scandir(save_dir) as entries:
+        for entry in entries:
+            ext = entry.name.rpartition(".")[2].lower()
+            if ext not in _MEDIA_EXTS or "." not in entry.name:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            if st.st_size > 0 and st.st_mtime > best_mtime:
+                best_mtime, best_name = st.st_mtime, entry.name
+    return save_dir / best_name if best_name else None
+
+
 def download_video(url: str, save_dir: Path) -> Path:
     """
     下载视频到本地。
@@ -507,7 +1011,6 @@ def download_video(url: str, save_dir: Path) -> Path:
         下载的视频文件路径
     """
     save_dir.mkdir(parents=True, exist_ok=True)
-    platform = _get_platform_hint(url)
 
     # ── 抖音专用路径 ──
     if _is_douyin_url(url):
@@ -515,11 +1018,150 @@ def download_video(url: str, save_dir: Path) -> Path:
         return file_path
 
     # ── 通用 yt-dlp 路径 ──
+    file_path, _info = _ytdlp_download(url, save_dir)
+    return file_path
+
+
+def probe_and_download(url: str, save_dir: Path,
+                       on_info: Callable[[dict], None] | None = None) -> tuple[Path, dict] | None:
+    """
+    探测并下载视频，只启动一次 yt-dlp（等价于 probe_video + download_video，省去一次提取器请求）。
+    yt-dlp 开始下载前通过 --print before_dl 输出元信息，拿到后立即回调 on_info（可用于更新进度展示）。
+
+    Returns:
+        (视频文件路径, 视频元信息 dict)；yt-dlp 未能提取到视频信息（非视频 URL）时返回 None
+
+    Raises:
+        VideoCookieRequired: 确认是视频平台但需要 Cookie
+        RuntimeError: 已识别为视频但下载失败
+    """
+    save_dir.mkdir(parents=True, exist_ok=True)
+
+    if _is_douyin_url(url):
+        info = probe_video(url)
+        if not info:
+            return None
+        if on_info is not None:
+            on_info(info)
+        file_path, douyin_info = _douyin_download(url, save_dir)
+        return file_path, {**info, **douyin_info}
+
+    if _YTDLP_BIN is None and (not YTDLP_WORKER_ENABLE or _worker_unavailable):
+        logger.warning("yt-dlp 未安装，跳过视频探测")
+        return None
+    file_path, info = _ytdlp_download(url, save_dir, on_info=on_info, with_info=True)
+    if file_path is None:
+        return None
+    # 极少数情况下 before_dl 没有输出（如文件已存在），仍按视频处理
+    return file_path, info or {"id": file_path.stem}
+
+
+def _with_download_slot(func, *args):
+    """占用一个下载槽位执行 func（在线程池中运行，槽位跨事件循环共享）"""
+    with _download_slots:
+        return func(*args)
+
+
+async def download_video_async(url: str, save_dir: Path) -> Path:
+    """
+    download_video 的异步版本：在线程池中下载，事件循环不被阻塞，多个 URL 可并行下载；
+    同时进行的下载数受 VIDEO_CONCURRENCY 限制。
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _with_download_slot, download_video, url, save_dir)
+
+
+async def probe_and_download_async(url: str, save_dir: Path,
+                                   on_info: Callable[[dict], None] | None = None) -> tuple[Path, dict] | None:
+    """probe_and_download 的异步版本，与 download_video_async 共用下载槽位"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _with_download_slot, probe_and_download, url, save_dir, on_info)
+
+
+def _ytdlp_download(url: str, save_dir: Path, on_info: Callable[[dict], None] | None = None,
+                    with_info: bool = False) -> tuple[Path | None, dict | None]:
+    """
+    用 yt-dlp 下载视频（优先常驻工作进程，不可用时走 CLI），返回 (文件路径, 元信息)。
+    with_info=True 时额外输出 before_dl 元信息：未拿到元信息就失败视为非视频 URL，返回 (None, None)，
+    需要 Cookie 时抛出 VideoCookieRequired；否则需要 Cookie / 下载失败均抛出 RuntimeError。
+    """
+    platform = _get_platform_hint(url)
     logger.info(f"开始下载 {platform} 视频: {url}")
+
     output_template = str(save_dir / "%(id)s.%(ext)s")
+    cookie_file = _find_cookie_file(url)
+    info_holder: list[dict] = []
+
+    def _record_info(info: dict):
+        # 只取第一份元信息（before_dl 先于文件路径输出）
+        if info_holder:
+            return
+        info_holder.append(info)
+        logger.info(f"探测到视频: {info.get('title', '未知')} (时长: {info.get('duration', '?')}s)")
+        if on_info is not None:
+            on_info(info)
+
+    opts = {
+        "noplaylist": True,
+        "nocheckcertificate": True,
+        "format": "best[ext=mp4]/bestvideo+bestaudio/best",
+        "merge_output_format": "mp4",
+        "max_filesize": MAX_VIDEO_SIZE,
+        "outtmpl": output_template,
+    }
+    if cookie_file:
+        opts["cookiefile"] = str(cookie_file)
+    try:
+        resp = _worker_call(url, opts, download=True, timeout=DOWNLOAD_TIMEOUT,
+                            on_info=_record_info if with_info else None)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"{platform} 视频下载超时（>{DOWNLOAD_TIMEOUT}s）")
+
+    if resp is not None:
+        ok, file_path_str, error_msg = resp["ok"], resp.get("filepath") or "", resp.get("error", "")
+        if ok and with_info and resp.get("info"):
+            _record_info(resp["info"])
+    else:
+        ok, file_path_str, error_msg = _ytdlp_download_cli(url, save_dir, platform, output_template,
+                                                          cookie_file, _record_info if with_info else None)
+
+    if not ok:
+        error_msg = error_msg[-500:] if len(error_msg) > 500 else error_msg
+        if with_info and _is_cookie_error(error_msg):
+            logger.warning(f"{platform} 需要 Cookie: {error_msg[:200]}")
+            raise VideoCookieRequired(platform, url)
+        if with_info and not info_holder:
+            logger.debug(f"非视频 URL: {url}")
+            return None, None
+        logger.error(f"yt-dlp 下载失败: {error_msg}")
+        if _is_cookie_error(error_msg):
+            raise RuntimeError(
+                f"{platform} 视频下载失败：需要 Cookie。"
+                f"请将 Cookie 文件放到 config/cookies/ 目录。"
+            )
+        raise RuntimeError(f"{platform} 视频下载失败: {error_msg}")
+
+    if file_path_str and not file_path_str.startswith("{") and Path(file_path_str).exists():
+        file_path = Path(file_path_str)
+    else:
+        file_path = _latest_media_file(save_dir)
+        if file_path is None:
+            raise RuntimeError(f"{platform} 视频下载完成但未找到文件")
+
+    size_mb = file_path.stat().st_size / 1024 / 1024
+    logger.info(f"{platform} 视频下载完成: {file_path.name} ({size_mb:.1f}MB)")
+    return file_path, (info_holder[0] if info_holder else None)
+
+
+def _ytdlp_download_cli(url: str, save_dir: Path, platform: str, output_template: str,
+                        cookie_file: Path | None,
+                        on_info: Callable[[dict], None] | None) -> tuple[bool, str, str]:
+    """通过 yt-dlp 命令行下载，返回 (是否成功, 文件路径行, stderr)；on_info 指定时解析 before_dl 元信息"""
+    if _YTDLP_BIN is None:
+        raise RuntimeError("yt-dlp 未安装。请运行: pip install yt-dlp")
 
     cmd = [
-        "yt-dlp",
+        _YTDLP_BIN,
         "--no-playlist",
         "--no-check-certificates",
         "-f", "best[ext=mp4]/bestvideo+bestaudio/best",
@@ -531,48 +1173,28 @@ def download_video(url: str, save_dir: Path) -> Path:
         "--no-warnings",
         url,
     ]
+    on_line = None
+    if on_info is not None:
+        cmd[-1:-1] = ["--print", "before_dl:%(.{title,duration,id,extractor})j"]
+
+        def on_line(line: str):
+            if not line.startswith("{"):
+                return
+            try:
+                on_info(orjson.loads(line) if orjson is not None else json.loads(line))
+            except json.JSONDecodeError:
+                pass
 
-    cookie_file = _find_cookie_file(url)
     if cookie_file:
         cmd.insert(-1, "--cookies")
         cmd.insert(-1, str(cookie_file))
 
     try:
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=DOWNLOAD_TIMEOUT,
-            cwd=str(save_dir),
+        returncode, file_path_str, stderr = _run_ytdlp(
+            cmd, DOWNLOAD_TIMEOUT, cwd=str(save_dir), stderr_tail=_YTDLP_STDERR_TAIL, on_line=on_line,
         )
     except FileNotFoundError:
         raise RuntimeError("yt-dlp 未安装。请运行: pip install yt-dlp")
     except subprocess.TimeoutExpired:
         raise RuntimeError(f"{platform} 视频下载超时（>{DOWNLOAD_TIMEOUT}s）")
-
-    if result.returncode != 0:
-        stderr = result.stderr.strip()
-        error_msg = stderr[-500:] if len(stderr) > 500 else stderr
-        logger.error(f"yt-dlp 下载失败: {error_msg}")
-        if _is_cookie_error(error_msg):
-            raise RuntimeError(
-                f"{platform} 视频下载失败：需要 Cookie。"
-                f"请将 Cookie 文件放到 config/cookies/ 目录。"
-            )
-        raise RuntimeError(f"{platform} 视频下载失败: {error_msg}")
-
-    output_lines = result.stdout.strip().split("\n")
-    file_path_str = output_lines[-1].strip() if output_lines else ""
-
-    if file_path_str and Path(file_path_str).exists():
-        file_path = Path(file_path_str)
-    else:
-        video_exts = {".mp4", ".webm", ".mkv", ".flv", ".avi", ".mov", ".m4a", ".mp3"}
-        candidates = [
-            f for f in save_dir.iterdir()
-            if f.suffix.lower() in video_exts and f.stat().st_size > 0
-        ]
-        if not candidates:
-            raise RuntimeError(f"{platform} 视频下载完成但未找到文件")
-        file_path = max(candidates, key=lambda f: f.stat().st_mtime)
-
-    size_mb = file_path.stat().st_size / 1024 / 1024
-    logger.info(f"{platform} 视频下载完成: {file_path.name} ({size_mb:.1f}MB)")
-    return file_path
+    return returncode == 0, file_path_str, stderr.strip()
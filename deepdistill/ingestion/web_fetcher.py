@@ -7,6 +7,7 @@
 
 from __future__ import annotations
 
+import codecs
 import logging
 import re
 from pathlib import Path
@@ -14,6 +15,15 @@ from urllib.parse import urlparse
 
 logger = logging.getLogger("deepdistill.ingestion.web_fetcher")
 
+# 文件名中的非法字符
+_RE_UNSAFE_FILENAME = re.compile(r'[^\w\-]')
+
+# <head> / <html> 开始标签（允许带属性，忽略大小写）
+_RE_HEAD_TAG = re.compile(r"<head\b[^>]*>", re.IGNORECASE)
+_RE_HTML_TAG = re.compile(r"<html\b[^>]*>", re.IGNORECASE)
+_RE_HEAD_TAG_BYTES = re.compile(rb"<head\b[^>]*>", re.IGNORECASE)
+_RE_HTML_TAG_BYTES = re.compile(rb"<html\b[^>]*>", re.IGNORECASE)
+
 
 def fetch_url_with_browser(url: str, save_dir: Path, wait_after_load_ms: int = 5000) -> Path:
     """
@@ -109,8 +119,12 @@ def fetch_url(url: str, save_dir: Path) -> Path:
                 "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
             },
         ) as client:
-            response = client.get(url)
-            response.raise_for_status()
+            # 先只读响应头：明确不是网页的内容（PDF、视频、图片等）不下载正文
+            with client.stream("GET", url) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("content-type", "")
+                if not _is_binary_content_type(content_type):
+                    response.read()
     except httpx.HTTPStatusError as e:
         raise RuntimeError(f"HTTP 错误 {e.response.status_code}: {url}")
     except httpx.ConnectError:
@@ -121,25 +135,58 @@ def fetch_url(url: str, save_dir: Path) -> Path:
         raise RuntimeError(f"抓取失败: {e}")
 
     # 检查内容类型
-    content_type = response.headers.get("content-type", "")
+    if _is_binary_content_type(content_type):
+        raise RuntimeError(f"非网页内容（{content_type}），已跳过下载: {url}")
     if "text/html" not in content_type and "application/xhtml" not in content_type:
         logger.warning(f"非 HTML 内容: {content_type}，尝试按 HTML 处理")
 
-    html_content = response.text
-
     # 生成文件名（从 URL 提取有意义的名称）
     filename = _url_to_filename(url)
     save_dir.mkdir(parents=True, exist_ok=True)
     file_path = save_dir / filename
 
-    # 在 HTML 中注入原始 URL 元信息（供后续处理使用）
-    html_with_meta = _inject_source_meta(html_content, url)
-    file_path.write_text(html_with_meta, encoding="utf-8")
+    # 在 HTML 中注入原始 URL 元信息（供后续处理使用）；保存的文件统一为 UTF-8
+    raw = response.content
+    if _is_valid_utf8(raw, response.encoding):
+        # 页面本身就是 UTF-8：直接在字节上注入并写入，省去整页解码 → 拼接 → 重新编码
+        file_path.write_bytes(_inject_source_meta_bytes(raw, url))
+    else:
+        file_path.write_text(_inject_source_meta(response.text, url), encoding="utf-8")
 
-    logger.info(f"网页已保存: {file_path} ({len(html_content)} 字符)")
+    logger.info(f"网页已保存: {file_path} ({len(raw)} 字节)")
     return file_path
 
 
+# 可能含网页/文本的 application 子类型（其余 application/*、image/* 等视为二进制，不按网页处理）
+_TEXTUAL_APPLICATION_TYPES = ("xhtml", "xml", "json", "javascript")
+
+
+def _is_binary_content_type(content_type: str) -> bool:
+    """Content-Type 明确为非文本内容时返回 True；缺失或文本类型返回 False（仍尝试按 HTML 处理）"""
+    mime = content_type.split(";", 1)[0].strip().lower()
+    if not mime or mime.startswith("text/"):
+        return False
+    if mime.startswith("application/"):
+        return not any(t in mime for t in _TEXTUAL_APPLICATION_TYPES)
+    return mime.startswith(("image/", "video/", "audio/", "font/", "model/"))
+
+
+def _is_valid_utf8(raw: bytes, encoding: str | None) -> bool:
+    """响应按 UTF-8（或未声明）解码且字节是合法 UTF-8 时返回 True（非法字节需走替换解码）"""
+    try:
+        if encoding and codecs.lookup(encoding).name not in ("utf-8", "ascii"):
+            return False
+    except LookupError:
+        return False
+    if raw.isascii():
+        return True
+    try:
+        raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
 def _url_to_filename(url: str) -> str:
     """从 URL 生成有意义的文件名"""
     parsed = urlparse(url)
@@ -153,7 +200,7 @@ def _url_to_filename(url: str) -> str:
         name = domain
 
     # 清理非法字符
-    name = re.sub(r'[^\w\-]', '_', name)
+    name = _RE_UNSAFE_FILENAME.sub('_', name)
     # 限制长度
     name = name[:80]
 
@@ -164,12 +211,29 @@ def _inject_source_meta(html: str, url: str) -> str:
     """在 HTML 头部注入来源 URL 元信息"""
     meta_tag = f'<meta name="deepdistill-source-url" content="{url}">'
 
-    if "<head>" in html.lower():
+    # 忽略大小写的正则直接在原文上查找，不再生成整页的小写副本
+    match = _RE_HEAD_TAG.search(html)
+    if match:
         # 在 <head> 后插入
-        idx = html.lower().index("<head>") + len("<head>")
+        idx = match.end()
         return html[:idx] + "\n" + meta_tag + "\n" + html[idx:]
-    elif "<html>" in html.lower():
-        idx = html.lower().index("<html>") + len("<html>")
+    match = _RE_HTML_TAG.search(html)
+    if match:
+        idx = match.end()
         return html[:idx] + "\n<head>\n" + meta_tag + "\n</head>\n" + html[idx:]
-    else:
-        return meta_tag + "\n" + html
+    return meta_tag + "\n" + html
+
+
+def _inject_source_meta_bytes(html: bytes, url: str) -> bytes:
+    """_inject_source_meta 的字节版本（UTF-8 页面使用）"""
+    meta_tag = f'<meta name="deepdistill-source-url" content="{url}">'.encode("utf-8")
+
+    match = _RE_HEAD_TAG_BYTES.search(html)
+    if match:
+        idx = match.end()
+        return b"".join((html[:idx], b"\n", meta_tag, b"\n", html[idx:]))
+    match = _RE_HTML_TAG_BYTES.search(html)
+    if match:
+        idx = match.end()
+        return b"".join((html[:idx], b"\n<head>\n", meta_tag, b"\n</head>\n", html[idx:]))
+    return meta_tag + b"\n" + html
@@ -13,8 +13,6 @@ from __future__ import annotations
 import logging
 import sys
 
-import uvicorn
-
 from .config import cfg
 
 
@@ -45,6 +43,9 @@ def main() -> None:
     logger.info(f"设备: {cfg.get_device()}")
     logger.info(f"API 端口: {cfg.API_PORT}")
 
+    # 延迟导入：CLI 的 process/config 子命令也会导入本模块（setup_logging），不需要加载 uvicorn
+    import uvicorn
+
     uvicorn.run(
         "deepdistill.api:app",
         host="0.0.0.0",
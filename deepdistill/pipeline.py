@@ -11,7 +11,12 @@ DeepDistill 主管线编排
 
 from __future__ import annotations
 
+import functools
+import importlib
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
@@ -21,6 +26,19 @@ from .config import cfg
 
 logger = logging.getLogger("deepdistill.pipeline")
 
+# process_batch：阶段 1（提取）最大并发文件数，阶段 2（AI 提炼）LLM 并发调用上限
+BATCH_MAX_WORKERS = 32
+BATCH_AI_CONCURRENCY = int(os.getenv("DEEPDISTILL_BATCH_AI_CONCURRENCY", "4"))
+
+
+@functools.lru_cache(maxsize=None)
+def _module(name: str):
+    """
+    按需导入各层模块（相对本包），首次调用后缓存模块对象。
+    各层依赖较重（模型、OpenCV 等），仍保持延迟导入，但不在每个文件的每个步骤重复执行 import 语句。
+    """
+    return importlib.import_module(name, __package__)
+
 
 @dataclass
 class ProcessingResult:
@@ -123,20 +141,109 @@ class Pipeline:
 
     def process(self, file_path: Path) -> ProcessingResult | None:
         """处理单个文件，根据 intent 走不同路径"""
-        import time
         start = time.time()
 
         logger.info(f"🔄 开始处理: {file_path.name} (intent={self.intent})")
 
         # Layer 1: 输入层 — 格式识别
         self._report_progress("identify", 0.0)
+        result = self._new_result(file_path)
+        if result is None:
+            return None
+        self._report_progress("identify", 1.0)
+
+        # Layer 2: 内容处理层 — 文本提取（两条路径都需要）
+        # Layer 3: 风格分析（仅 intent=style 时执行；否则跳过并直接推进进度）
+        self._extract_and_style(result, file_path, report=True)
+        self._report_progress("style", 1.0)
+
+        # Layer 4: AI 分析层 — 结构化提炼
+        self._report_progress("ai", 0.0)
+        self._run_ai(result)
+        self._report_progress("ai", 1.0)
+
+        # Layer 5: 融合输出层
+        self._report_progress("output", 0.0)
+        self._run_output(result)
+        self._report_progress("output", 1.0)
+
+        # Layer 5.5: 视觉素材生成（已移除 — Stable Diffusion 不再集成）
+        self._report_progress("visual", 1.0)
+
+        result.processing_time_sec = round(time.time() - start, 2)
+        self._report_progress("done", 1.0)
+        logger.info(f"✅ 完成: {file_path.name} ({result.processing_time_sec}s)")
+
+        return result
+
+    def process_batch(self, files: list[Path], max_workers: int | None = None) -> list[ProcessingResult | None]:
+        """
+        批量处理多个文件，返回与 files 顺序一致的结果（不支持的格式为 None）。
+        阶段 1（识别 + 文本提取 + 风格分析）按文件并发执行，ffmpeg/ASR/HTTP 等 I/O 会释放 GIL；
+        阶段 2（AI 提炼）以 BATCH_AI_CONCURRENCY 为上限并发调用 LLM；
+        阶段 3（融合 + 格式化输出）交给 generate_outputs_batch 多进程并行。
+        批量模式不触发 progress_callback。
+        """
+        files = list(files)
+        if not files:
+            return []
+        workers = min(max_workers or BATCH_MAX_WORKERS, len(files))
+        logger.info(f"🔄 批量处理 {len(files)} 个文件 (intent={self.intent}, 并发 {workers})")
+        elapsed = [0.0] * len(files)
+
+        def _timed(index: int, func, *args):
+            t0 = time.time()
+            try:
+                return func(*args)
+            finally:
+                elapsed[index] += time.time() - t0
+
+        def _prepare(file_path: Path) -> ProcessingResult | None:
+            result = self._new_result(file_path)
+            if result is not None:
+                self._extract_and_style(result, file_path)
+            return result
+
+        # 阶段 1：识别 + 提取 + 风格分析
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda i: _timed(i, _prepare, files[i]), range(len(files))))
+        pending = [i for i, r in enumerate(results) if r is not None]
+
+        # 阶段 2：AI 提炼（远程 LLM 调用，限制并发避免触发限流）
+        ai_workers = min(BATCH_AI_CONCURRENCY, len(pending)) or 1
+        with ThreadPoolExecutor(max_workers=ai_workers) as executor:
+            list(executor.map(lambda i: _timed(i, self._run_ai, results[i]), pending))
+
+        # 阶段 3：融合 + 输出（整体耗时平摊到每个文件）
+        t0 = time.time()
+        batch = [results[i] for i in pending]
+        try:
+            outputs = _module(".fusion").generate_outputs_batch(
+                batch, self.output_dir, self.output_format, return_exceptions=True,
+            )
+        except Exception as e:  # 如不支持的输出格式：整批失败，错误记录到每个文件
+            outputs = [e] * len(batch)
+        for result, output in zip(batch, outputs):
+            if isinstance(output, Exception):
+                logger.error(f"  ❌ 输出生成失败: {result.filename}: {output}")
+                result.errors.append(f"输出生成失败: {output}")
+            else:
+                result.output_path = output
+        output_share = (time.time() - t0) / len(batch) if batch else 0.0
+
+        for i in pending:
+            result = results[i]
+            result.processing_time_sec = round(elapsed[i] + output_share, 2)
+            logger.info(f"✅ 完成: {result.filename} ({result.processing_time_sec}s)")
+        return results
+
+    def _new_result(self, file_path: Path) -> ProcessingResult | None:
+        """Layer 1: 识别格式并创建结果对象；不支持的格式返回 None"""
         source_type = self._identify_type(file_path)
         if not source_type:
             logger.warning(f"⚠️  不支持的格式: {file_path.suffix}")
             return None
-        self._report_progress("identify", 1.0)
-
-        result = ProcessingResult(
+        return ProcessingResult(
             source_path=str(file_path),
             source_type=source_type,
             filename=file_path.name,
@@ -145,94 +252,96 @@ class Pipeline:
             created_at=datetime.now(timezone.utc).isoformat(),
         )
 
-        # Layer 2: 内容处理层 — 文本提取（两条路径都需要）
-        self._report_progress("extract", 0.0)
+    def _extract_and_style(self, result: ProcessingResult, file_path: Path, report: bool = False):
+        """
+        Layer 2 文本提取 + Layer 3 风格分析（intent=style 时）。
+        视频的 ASR（音轨）与画面分析互不依赖，并行执行，耗时取两者最大值而非之和。
+        report=True 时上报 extract/style 步骤的起始进度（单文件模式）。
+        """
+        progress = self._report_progress if report else (lambda step, sub=0.0: None)
+        progress("extract", 0.0)
+        if self.intent == "style" and result.source_type == "video" and cfg.VIDEO_ANALYSIS_LEVEL != "off":
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                style_future = executor.submit(self._run_style, result, file_path)
+                self._run_extract(result, file_path)
+                progress("extract", 1.0)
+                progress("style", 0.0)
+                style_future.result()
+            return
+        self._run_extract(result, file_path)
+        progress("extract", 1.0)
+        if self.intent == "style":
+            progress("style", 0.0)
+            self._run_style(result, file_path)
+
+    def _run_extract(self, result: ProcessingResult, file_path: Path):
+        """Layer 2: 文本提取，失败记录到 result.errors"""
         try:
-            result.extracted_text = self._extract_content(file_path, source_type)
+            result.extracted_text = self._extract_content(file_path, result.source_type)
             logger.info(f"  📝 提取文本: {len(result.extracted_text)} 字符")
         except Exception as e:
             logger.error(f"  ❌ 文本提取失败: {e}")
             result.errors.append(f"文本提取失败: {e}")
-        self._report_progress("extract", 1.0)
 
-        # Layer 3: 风格分析（仅 intent=style 时执行）
-        if self.intent == "style":
-            self._report_progress("style", 0.0)
-            # 视频风格分析
-            if source_type == "video" and cfg.VIDEO_ANALYSIS_LEVEL != "off":
-                try:
-                    result.video_analysis = self._analyze_video(file_path)
-                    logger.info(f"  🎬 视频风格分析完成")
-                except Exception as e:
-                    logger.error(f"  ❌ 视频风格分析失败: {e}")
-                    result.errors.append(f"视频风格分析失败: {e}")
-
-            # 图片风格分析
-            if source_type == "image":
-                try:
-                    result.image_style = self._analyze_image_style(file_path)
-                    logger.info(f"  🎨 图片风格分析完成")
-                except Exception as e:
-                    logger.error(f"  ❌ 图片风格分析失败: {e}")
-                    result.errors.append(f"图片风格分析失败: {e}")
-            self._report_progress("style", 1.0)
-        else:
-            # 跳过风格分析，直接推进进度
-            self._report_progress("style", 1.0)
+    def _run_style(self, result: ProcessingResult, file_path: Path):
+        """Layer 3: 视频/图片风格分析，失败记录到 result.errors"""
+        # 视频风格分析
+        if result.source_type == "video" and cfg.VIDEO_ANALYSIS_LEVEL != "off":
+            try:
+                result.video_analysis = self._analyze_video(file_path)
+                logger.info(f"  🎬 视频风格分析完成")
+            except Exception as e:
+                logger.error(f"  ❌ 视频风格分析失败: {e}")
+                result.errors.append(f"视频风格分析失败: {e}")
 
-        # Layer 4: AI 分析层 — 结构化提炼
-        self._report_progress("ai", 0.0)
-        if result.extracted_text or result.video_analysis or result.image_style:
+        # 图片风格分析
+        if result.source_type == "image":
             try:
-                result.ai_result = self._ai_analyze(
-                    result.extracted_text,
-                    result.video_analysis,
-                    result.image_style,
-                )
-                logger.info(f"  🧠 AI 提炼完成")
+                result.image_style = self._analyze_image_style(file_path)
+                logger.info(f"  🎨 图片风格分析完成")
             except Exception as e:
-                logger.error(f"  ❌ AI 提炼失败: {e}")
-                result.errors.append(f"AI 提炼失败: {e}")
-        self._report_progress("ai", 1.0)
+                logger.error(f"  ❌ 图片风格分析失败: {e}")
+                result.errors.append(f"图片风格分析失败: {e}")
 
-        # Layer 5: 融合输出层
-        self._report_progress("output", 0.0)
+    def _run_ai(self, result: ProcessingResult):
+        """Layer 4: AI 结构化提炼（有可分析内容时），失败记录到 result.errors"""
+        if not (result.extracted_text or result.video_analysis or result.image_style):
+            return
+        try:
+            result.ai_result = self._ai_analyze(
+                result.extracted_text,
+                result.video_analysis,
+                result.image_style,
+            )
+            logger.info(f"  🧠 AI 提炼完成")
+        except Exception as e:
+            logger.error(f"  ❌ AI 提炼失败: {e}")
+            result.errors.append(f"AI 提炼失败: {e}")
+
+    def _run_output(self, result: ProcessingResult):
+        """Layer 5: 融合输出，失败记录到 result.errors"""
         try:
             result.output_path = self._generate_output(result)
             logger.info(f"  📄 输出: {result.output_path}")
         except Exception as e:
             logger.error(f"  ❌ 输出生成失败: {e}")
             result.errors.append(f"输出生成失败: {e}")
-        self._report_progress("output", 1.0)
-
-        # Layer 5.5: 视觉素材生成（已移除 — Stable Diffusion 不再集成）
-        self._report_progress("visual", 1.0)
-
-        result.processing_time_sec = round(time.time() - start, 2)
-        self._report_progress("done", 1.0)
-        logger.info(f"✅ 完成: {file_path.name} ({result.processing_time_sec}s)")
-
-        return result
 
     def _identify_type(self, file_path: Path) -> str | None:
         """Layer 1: 识别文件类型"""
-        from .ingestion.router import identify_file_type
-        return identify_file_type(file_path)
+        return _module(".ingestion.router").identify_file_type(file_path)
 
     def _extract_content(self, file_path: Path, source_type: str) -> str:
         """Layer 2: 提取文本内容"""
-        from .processing import extract_text
-        return extract_text(file_path, source_type)
+        return _module(".processing").extract_text(file_path, source_type)
 
     def _analyze_video(self, file_path: Path) -> dict:
         """Layer 3: 视频增强分析"""
-        from .video_analysis import analyze_video
-        return analyze_video(file_path)
+        return _module(".video_analysis").analyze_video(file_path)
 
     def _analyze_image_style(self, file_path: Path) -> dict:
         """Layer 3b: 图片风格分析"""
-        from .processing.image_style import analyze_image_style
-        return analyze_image_style(file_path)
+        return _module(".processing.image_style").analyze_image_style(file_path)
 
     def _ai_analyze(
         self,
@@ -241,8 +350,8 @@ class Pipeline:
         image_style: dict | None = None,
     ) -> dict:
         """Layer 4: AI 结构化提炼。仅两模板：summarize / style_analysis；Skill 文档用 summarize+hint。"""
-        from .ai_analysis.extractor import extract_knowledge, resolve_prompt_template
-        template_name = resolve_prompt_template(self.intent, getattr(self, "doc_type", "doc"))
+        extractor = _module(".ai_analysis.extractor")
+        template_name = extractor.resolve_prompt_template(self.intent, getattr(self, "doc_type", "doc"))
         doc_type = getattr(self, "doc_type", "doc")
         hint = None
         if self.intent == "content" and doc_type in ("skill", "both"):
@@ -252,18 +361,16 @@ class Pipeline:
             style_context = image_style if not video_analysis else {
                 **video_analysis, "image_style": image_style
             }
-        return extract_knowledge(text, style_context, template_name=template_name, hint=hint)
+        return extractor.extract_knowledge(text, style_context, template_name=template_name, hint=hint)
 
     def _generate_output(self, result: ProcessingResult) -> str:
         """Layer 5: 生成输出文件"""
-        from .fusion import generate_output
-        return generate_output(result, self.output_dir, self.output_format)
+        return _module(".fusion").generate_output(result, self.output_dir, self.output_format)
 
     def _generate_visuals(self, result: ProcessingResult) -> dict:
         """Layer 5.5: 生成视觉素材（prompt + 可选图片）"""
-        from .fusion.visual_generator import generate_visual_assets
         visual_dir = self.output_dir / "visuals"
-        return generate_visual_assets(
+        return _module(".fusion.visual_generator").generate_visual_assets(
             ai_result=result.ai_result,
             video_analysis=result.video_analysis,
             output_dir=visual_dir,
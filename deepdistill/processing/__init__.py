@@ -5,25 +5,79 @@ Layer 2: 内容处理层 — ASR / OCR / 文档提取
 
 from __future__ import annotations
 
+import functools
+import importlib
+import os
+import threading
 from pathlib import Path
 
+# 同时运行的 OCR 任务上限（批量处理与 API 并发管线共享），避免多个模型同时推理导致显存/内存耗尽
+# ASR 的推理闸门在 asr 模块内（只限制 Whisper 推理，音轨解码不占名额）
+OCR_CONCURRENCY = int(os.getenv("DEEPDISTILL_OCR_CONCURRENCY", "2"))
+
+_ocr_slots = threading.BoundedSemaphore(max(1, OCR_CONCURRENCY))
+
+
+class TruncatedText(str):
+    """处理器因超时只得到部分结果时返回的文本：extract_text 照常返回，但不写入缓存，下次重新提取"""
+
+
+# source_type -> (处理器模块, 函数名, 并发闸门)；文档/网页解析不限流
+_HANDLERS = {
+    "video": (".asr", "transcribe", None),
+    "audio": (".asr", "transcribe", None),
+    "image": (".ocr", "extract_text_from_image", _ocr_slots),
+    "document": (".document", "extract_text_from_document", None),
+    "webpage": (".document", "extract_text_from_html", None),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _module(name: str):
+    """按需导入处理器模块（依赖较重），首次导入后缓存模块对象"""
+    return importlib.import_module(name, __package__)
+
 
 def extract_text(file_path: Path, source_type: str) -> str:
     """
     统一文本提取入口。
-    根据 source_type 分发到对应处理器。
+    根据 source_type 分发到对应处理器；OCR 按 OCR_CONCURRENCY 限流（ASR 在 asr 模块内按 ASR_CONCURRENCY 限流）。
+    同一文件（路径 + 大小 + mtime 不变）且提取配置不变时直接返回磁盘缓存的结果；超时截断的结果不缓存。
     """
-    if source_type in ("video", "audio"):
-        from .asr import transcribe
-        return transcribe(file_path)
-    elif source_type == "image":
-        from .ocr import extract_text_from_image
-        return extract_text_from_image(file_path)
-    elif source_type == "document":
-        from .document import extract_text_from_document
-        return extract_text_from_document(file_path)
-    elif source_type == "webpage":
-        from .document import extract_text_from_html
-        return extract_text_from_html(file_path)
-    else:
+    handler = _HANDLERS.get(source_type)
+    if handler is None:
         raise ValueError(f"不支持的文件类型: {source_type}")
+
+    from .. import cache
+
+    key = cache.file_key(file_path, source_type, _extract_config(source_type))
+    cached = cache.get("extract", key)
+    if cached is not None:
+        return cached["text"]
+
+    module_name, func_name, slots = handler
+    func = getattr(_module(module_name), func_name)
+    if slots is None:
+        text = func(file_path)
+    else:
+        with slots:
+            text = func(file_path)
+    if isinstance(text, TruncatedText):
+        return str(text)
+    cache.put("extract", key, {"text": text})
+    return text
+
+
+def _extract_config(source_type: str) -> dict:
+    """影响提取结果的配置项（参与缓存键，修改后旧缓存自动失效）"""
+    from ..config import cfg
+
+    if source_type in ("video", "audio"):
+        device, compute_type = _module(".asr")._resolve_runtime(cfg)
+        return {
+            "model": cfg.ASR_MODEL, "language": cfg.ASR_LANGUAGE, "beam_size": cfg.ASR_BEAM_SIZE,
+            "device": device, "compute_type": compute_type,
+        }
+    if source_type == "image":
+        return {"engine": cfg.OCR_ENGINE, "languages": cfg.OCR_LANGUAGES, "angle_cls": cfg.OCR_USE_ANGLE_CLS}
+    return {}
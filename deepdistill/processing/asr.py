@@ -1,6 +1,6 @@
 """
 ASR 处理器：视频/音频 → 文本
-使用 ffmpeg 提取音轨 + faster-whisper 转录。
+使用 ffmpeg 提取音轨（PCM 经管道读入内存）+ faster-whisper 转录。
 
 超时保护：
 - ffmpeg 提取音轨：最大 10 分钟（600 秒）
@@ -14,7 +14,9 @@ from __future__ import annotations
 import logging
 import os
 import tempfile
+import threading
 import time
+import wave
 from pathlib import Path
 
 logger = logging.getLogger("deepdistill.asr")
@@ -23,115 +25,229 @@ logger = logging.getLogger("deepdistill.asr")
 FFMPEG_TIMEOUT = int(os.getenv("DEEPDISTILL_FFMPEG_TIMEOUT", "600"))       # 10 分钟
 TRANSCRIBE_TIMEOUT = int(os.getenv("DEEPDISTILL_TRANSCRIBE_TIMEOUT", "1800"))  # 30 分钟
 
+# faster-whisper 要求的输入采样率
+SAMPLE_RATE = 16000
+
+# GPU 批量转录（faster-whisper >= 1.1 的 BatchedInferencePipeline）每批的 VAD 片段数
+ASR_BATCH_SIZE = int(os.getenv("DEEPDISTILL_ASR_BATCH", "16"))
+# 音频短于该时长（秒）时只有一个 30s 窗口，批量没有收益，仍逐段转录
+_BATCH_MIN_AUDIO_SEC = 30
+
+# 同时进行的 Whisper 推理数上限（批量处理与 API 并发管线共享，防止显存耗尽）。
+# 只包住模型推理：多文件并发时，下一个文件的 ffmpeg 解码与当前文件的 GPU 转录重叠进行
+ASR_CONCURRENCY = int(os.getenv("DEEPDISTILL_ASR_CONCURRENCY", "1"))
+_inference_slots = threading.BoundedSemaphore(max(1, ASR_CONCURRENCY))
+# 已解码（或正在解码）待转录的文件数上限：每个文件的 PCM 常驻内存（1 小时音频约 230 MB），
+# 只允许比推理名额多解码一个，批量处理长视频时不再把整个目录的音轨同时读入内存
+_decode_slots = threading.BoundedSemaphore(max(1, ASR_CONCURRENCY) + 1)
+
+# 已加载的 Whisper 模型：(模型名, 设备, 计算精度, 模型目录) -> WhisperModel，进程内复用，避免每个文件重新加载权重
+_MODEL_CACHE: dict[tuple, object] = {}
+_model_lock = threading.Lock()
+
 
 def transcribe(file_path: Path) -> str:
     """
     将视频/音频文件转录为文本。
-    1. ffmpeg 提取音轨 → WAV 16kHz mono（超时 10 分钟）
-    2. faster-whisper 转录（超时 30 分钟）
+    1. ffmpeg 提取音轨 → 16kHz mono PCM，经管道直接读入内存（超时 10 分钟，不占推理名额，
+       但占用解码名额直到转录结束，最多比推理名额多预解码一个文件）
+    2. faster-whisper 转录（超时 30 分钟，受 ASR_CONCURRENCY 限制）
     3. 合并所有片段为完整文本
     """
     from ..config import cfg
 
-    # 提取音轨（带超时）
-    wav_path = _extract_audio(file_path)
+    with _decode_slots:
+        # 提取音轨（带超时）
+        audio = _extract_audio(file_path)
+
+        with _inference_slots:
+            return _transcribe_audio(file_path, audio, cfg)
 
-    try:
-        # 加载 whisper 模型
-        from faster_whisper import WhisperModel
-
-        device = cfg.get_device()
-        # faster-whisper 在 MPS 上暂不支持，fallback 到 CPU
-        compute_type = "float16" if device == "cuda" else "int8"
-        if device == "mps":
-            device = "cpu"
-            logger.info("faster-whisper 暂不支持 MPS，使用 CPU")
-
-        logger.info(f"加载 Whisper 模型: {cfg.ASR_MODEL} (设备: {device})")
-        model = WhisperModel(
-            cfg.ASR_MODEL,
-            device=device,
-            compute_type=compute_type,
-            download_root=str(cfg.MODEL_CACHE_DIR),
-        )
 
-        # 转录（带超时保护）
-        logger.info(f"开始转录: {file_path.name}（超时 {TRANSCRIBE_TIMEOUT}s）")
+def _transcribe_audio(file_path: Path, audio, cfg) -> str:
+    """加载（缓存的）Whisper 模型并转录已解码的音频"""
+    # 加载 whisper 模型（进程内缓存）
+    device, compute_type = _resolve_runtime(cfg)
+    model = _get_model(cfg.ASR_MODEL, device, compute_type, str(cfg.MODEL_CACHE_DIR))
 
-        full_text = _transcribe_with_model(model, wav_path, cfg, use_vad=True)
+    # 转录（带超时保护）
+    logger.info(f"开始转录: {file_path.name}（超时 {TRANSCRIBE_TIMEOUT}s）")
 
-        # VAD 过滤后文本为空时，关闭 VAD 重试（音乐/歌唱类视频可能被 VAD 全部过滤）
-        if not full_text.strip():
-            logger.info("VAD 过滤后无文本，关闭 VAD 重试转录")
-            full_text = _transcribe_with_model(model, wav_path, cfg, use_vad=False)
+    batched = _batched_pipeline(model, device, audio)
+    full_text = _transcribe_with_model(model, audio, cfg, use_vad=True, batched=batched)
 
-        return full_text
+    # VAD 过滤后文本为空时，关闭 VAD 重试（音乐/歌唱类视频可能被 VAD 全部过滤）
+    if not full_text.strip():
+        logger.info("VAD 过滤后无文本，关闭 VAD 重试转录")
+        full_text = _transcribe_with_model(model, audio, cfg, use_vad=False)
 
-    finally:
-        # 清理临时文件
-        if wav_path.exists() and wav_path != file_path:
-            wav_path.unlink()
+    return full_text
 
 
-def _transcribe_with_model(model, wav_path: Path, cfg, use_vad: bool = True) -> str:
-    """使用 Whisper 模型转录音频，带超时保护"""
-    segments, info = model.transcribe(
-        str(wav_path),
-        language=cfg.ASR_LANGUAGE,
-        beam_size=5,
-        vad_filter=use_vad,
-    )
+def _resolve_runtime(cfg) -> tuple[str, str]:
+    """
+    Whisper 实际使用的 (设备, 计算精度)；两者都影响转录结果，同时参与提取缓存键。
+    faster-whisper 在 MPS 上暂不支持，fallback 到 CPU；compute_type=auto 时按设备选择：
+    CUDA 上 INT8 权重 + FP16 计算，较纯 float16 更快且显存减半；CPU 上纯 INT8
+    """
+    device = cfg.get_device()
+    if device == "mps":
+        device = "cpu"
+    compute_type = cfg.ASR_COMPUTE_TYPE
+    if compute_type == "auto":
+        compute_type = "int8_float16" if device == "cuda" else "int8"
+    return device, compute_type
+
+
+def _get_model(model_name: str, device: str, compute_type: str, download_root: str):
+    """获取（必要时加载）Whisper 模型；加锁避免并发处理多个文件时重复加载同一模型"""
+    key = (model_name, device, compute_type, download_root)
+    with _model_lock:
+        model = _MODEL_CACHE.get(key)
+        if model is None:
+            from faster_whisper import WhisperModel
+
+            logger.info(f"加载 Whisper 模型: {model_name} (设备: {device})")
+            model = WhisperModel(
+                model_name,
+                device=device,
+                compute_type=compute_type,
+                download_root=download_root,
+            )
+            _MODEL_CACHE[key] = model
+    return model
+
+
+def _batched_pipeline(model, device: str, audio):
+    """
+    CUDA 上且音频较长时返回 BatchedInferencePipeline（把 VAD 片段按批送入 GPU），否则返回 None。
+    faster-whisper 版本过旧（< 1.1，无该类）时同样返回 None，逐段转录。
+    """
+    if device != "cuda" or ASR_BATCH_SIZE <= 1:
+        return None
+    duration = _audio_duration(audio)
+    if duration <= _BATCH_MIN_AUDIO_SEC:
+        return None
+    try:
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:
+        logger.info("faster-whisper 版本不支持批量转录，逐段转录")
+        return None
+    logger.info(f"批量转录: 音频 {duration:.0f}s，batch_size={ASR_BATCH_SIZE}")
+    return BatchedInferencePipeline(model=model)
+
+
+def _audio_duration(audio) -> float:
+    """音频时长（秒）：内存 PCM 按采样数计算，WAV 文件读文件头；无法判断时返回 0"""
+    if not isinstance(audio, Path):
+        return len(audio) / float(SAMPLE_RATE)
+    try:
+        with wave.open(str(audio), "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except (wave.Error, OSError, ZeroDivisionError):
+        return 0.0
+
+
+def _transcribe_with_model(model, audio, cfg, use_vad: bool = True, batched=None) -> str:
+    """
+    使用 Whisper 模型转录音频，带超时保护；batched 指定且启用 VAD 时按批转录。
+    beam 宽度取 cfg.ASR_BEAM_SIZE；best_of=1 让温度回退重试只采样一次，回退机制本身保留（防止重复/幻听）。
+    超时时返回已转录部分，类型为 TruncatedText（extract_text 不缓存不完整的结果）。
+    """
+    from . import TruncatedText
+
+    source = str(audio) if isinstance(audio, Path) else audio
+    if batched is not None and use_vad:
+        # 批量转录依赖 VAD 切分；关闭 VAD 的重试仍走逐段转录
+        segments, info = batched.transcribe(
+            source,
+            language=cfg.ASR_LANGUAGE,
+            beam_size=cfg.ASR_BEAM_SIZE,
+            best_of=1,
+            batch_size=ASR_BATCH_SIZE,
+            vad_filter=True,
+        )
+    else:
+        segments, info = model.transcribe(
+            source,
+            language=cfg.ASR_LANGUAGE,
+            beam_size=cfg.ASR_BEAM_SIZE,
+            best_of=1,
+            vad_filter=use_vad,
+        )
 
     logger.info(f"检测语言: {info.language} (概率: {info.language_probability:.2f}, VAD={use_vad})")
 
     # 合并片段（带超时检查）
     texts = []
+    truncated = False
     start_time = time.monotonic()
     for segment in segments:
         texts.append(segment.text.strip())
         elapsed = time.monotonic() - start_time
         if elapsed > TRANSCRIBE_TIMEOUT:
             logger.warning(f"转录超时（{elapsed:.0f}s > {TRANSCRIBE_TIMEOUT}s），返回已转录部分")
+            truncated = True
             break
 
     full_text = "\n".join(texts)
+    if truncated:
+        full_text = TruncatedText(full_text)
     elapsed = time.monotonic() - start_time
     logger.info(f"转录完成: {len(full_text)} 字符，耗时 {elapsed:.1f}s (VAD={use_vad})")
     return full_text
 
 
-def _extract_audio(file_path: Path) -> Path:
-    """使用 ffmpeg 提取音轨为 WAV 16kHz mono（带超时保护）"""
+def _extract_audio(file_path: Path):
+    """
+    使用 ffmpeg 提取音轨为 16kHz mono PCM（带超时保护）。
+    PCM 经 stdout 管道直接读入内存并转为 float32 数组交给 faster-whisper，不再写临时 WAV 再读回；
+    输入本身是 WAV 时直接返回文件路径。
+    """
     import subprocess
 
+    import numpy as np
+
     # 如果已经是音频格式，直接返回
     if file_path.suffix.lower() in (".wav",):
         return file_path
 
-    # 创建临时 WAV 文件
-    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-    tmp.close()
-    wav_path = Path(tmp.name)
-
-    logger.info(f"提取音轨: {file_path.name} → WAV（超时 {FFMPEG_TIMEOUT}s）")
+    logger.info(f"提取音轨: {file_path.name} → PCM（超时 {FFMPEG_TIMEOUT}s）")
     cmd = [
-        "ffmpeg", "-i", str(file_path),
-        "-ar", "16000",      # 采样率 16kHz
-        "-ac", "1",          # 单声道
-        "-c:a", "pcm_s16le", # PCM 16-bit
-        "-y",                # 覆盖
-        str(wav_path),
+        "ffmpeg", "-nostdin", "-i", str(file_path),
+        "-vn",                    # 不解码视频流
+        "-ar", str(SAMPLE_RATE),  # 采样率 16kHz
+        "-ac", "1",               # 单声道
+        "-f", "s16le",            # 裸 PCM 16-bit
+        "pipe:1",
     ]
 
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT)
-    except subprocess.TimeoutExpired:
-        # 清理临时文件
-        if wav_path.exists():
-            wav_path.unlink()
-        raise RuntimeError(f"ffmpeg 提取音轨超时（>{FFMPEG_TIMEOUT}s），视频可能过大")
-
-    if result.returncode != 0:
-        raise RuntimeError(f"ffmpeg 提取音轨失败: {result.stderr[:500]}")
-
-    return wav_path
+    # stderr 写入临时文件，避免管道写满阻塞 ffmpeg；超时由定时器结束进程
+    with tempfile.TemporaryFile() as err_file:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err_file)
+        timed_out = threading.Event()
+
+        def _kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(FFMPEG_TIMEOUT, _kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            with proc.stdout:
+                raw = proc.stdout.read()
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+
+        if timed_out.is_set():
+            raise RuntimeError(f"ffmpeg 提取音轨超时（>{FFMPEG_TIMEOUT}s），视频可能过大")
+        if returncode != 0:
+            err_file.seek(0)
+            stderr = err_file.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"ffmpeg 提取音轨失败: {stderr[:500]}")
+
+    # int16 → float32 [-1, 1)，与 faster-whisper 自行解码得到的格式一致；奇数字节（截断）丢弃
+    usable = len(raw) - len(raw) % 2
+    return np.frombuffer(raw[:usable], dtype=np.int16).astype(np.float32) / 32768.0
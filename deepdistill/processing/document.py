@@ -7,28 +7,27 @@
 
 from __future__ import annotations
 
+import functools
 import logging
+import re
+import threading
 from pathlib import Path
 
 logger = logging.getLogger("deepdistill.document")
 
+_pdfium_lock = threading.Lock()
+
+# Word 内置标题样式名
+_HEADING_RE = re.compile(r"Heading (\d+)")
+
 
 def extract_text_from_document(file_path: Path) -> str:
     """根据文件类型分发到对应的提取器"""
     suffix = file_path.suffix.lower()
-
-    if suffix == ".pdf":
-        return _extract_pdf(file_path)
-    elif suffix in (".docx", ".doc"):
-        return _extract_docx(file_path)
-    elif suffix in (".pptx", ".ppt"):
-        return _extract_pptx(file_path)
-    elif suffix in (".xlsx", ".xls"):
-        return _extract_xlsx(file_path)
-    elif suffix in (".txt", ".md"):
-        return _extract_text_file(file_path)
-    else:
+    extractor = _EXTRACTORS.get(suffix)
+    if extractor is None:
         raise ValueError(f"不支持的文档格式: {suffix}")
+    return extractor(file_path)
 
 
 def extract_text_from_html(file_path: Path) -> str:
@@ -37,23 +36,51 @@ def extract_text_from_html(file_path: Path) -> str:
 
 
 def _extract_pdf(file_path: Path) -> str:
-    """PDF → 文本"""
-    from PyPDF2 import PdfReader
-
+    """PDF → 文本（优先 pypdfium2，未安装时回退 PyPDF2）"""
     logger.info(f"提取 PDF: {file_path.name}")
-    reader = PdfReader(str(file_path))
+    try:
+        page_texts = _pdf_page_texts_pdfium(file_path)
+    except ImportError:
+        page_texts = _pdf_page_texts_pypdf2(file_path)
 
-    texts = []
-    for i, page in enumerate(reader.pages):
-        text = page.extract_text()
-        if text:
-            texts.append(f"--- 第 {i + 1} 页 ---\n{text.strip()}")
+    texts = [
+        f"--- 第 {i + 1} 页 ---\n{text.strip()}"
+        for i, text in enumerate(page_texts)
+        if text and text.strip()
+    ]
 
     full_text = "\n\n".join(texts)
-    logger.info(f"PDF 提取完成: {len(reader.pages)} 页, {len(full_text)} 字符")
+    logger.info(f"PDF 提取完成: {len(page_texts)} 页, {len(full_text)} 字符")
     return full_text
 
 
+def _pdf_page_texts_pdfium(file_path: Path) -> list[str]:
+    """pypdfium2（PDFium，C 实现）逐页提取文本，速度为 PyPDF2 的数十倍"""
+    import pypdfium2 as pdfium
+
+    # PDFium 本身不是线程安全的，批量处理时的并发提取需串行进入
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(str(file_path))
+        try:
+            texts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+
+
+def _pdf_page_texts_pypdf2(file_path: Path) -> list[str]:
+    """PyPDF2（纯 Python）逐页提取文本"""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(str(file_path))
+    return [page.extract_text() or "" for page in reader.pages]
+
+
 def _extract_docx(file_path: Path) -> str:
     """Word (.docx) → 文本"""
     from docx import Document
@@ -63,20 +90,29 @@ def _extract_docx(file_path: Path) -> str:
 
     texts = []
     for para in doc.paragraphs:
-        if para.text.strip():
-            # 保留标题层级
-            if para.style and para.style.name.startswith("Heading"):
-                level = para.style.name.replace("Heading ", "")
-                prefix = "#" * int(level) if level.isdigit() else "#"
-                texts.append(f"{prefix} {para.text.strip()}")
-            else:
-                texts.append(para.text.strip())
+        # para.text / para.style 每次访问都会重新遍历 XML，各取一次
+        text = para.text.strip()
+        if not text:
+            continue
+        style = para.style
+        # 保留标题层级
+        prefix = _heading_prefix(style.name or "") if style is not None else None
+        texts.append(f"{prefix} {text}" if prefix is not None else text)
 
     full_text = "\n\n".join(texts)
     logger.info(f"Word 提取完成: {len(texts)} 段, {len(full_text)} 字符")
     return full_text
 
 
+@functools.lru_cache(maxsize=64)
+def _heading_prefix(style_name: str) -> str | None:
+    """Word 样式名 → Markdown 标题前缀："Heading 2" → "##"，其他 Heading 样式 → "#"，非标题 → None"""
+    m = _HEADING_RE.fullmatch(style_name)
+    if m:
+        return "#" * int(m.group(1))
+    return "#" if style_name.startswith("Heading") else None
+
+
 def _extract_pptx(file_path: Path) -> str:
     """PPT (.pptx) → 文本"""
     from pptx import Presentation
@@ -106,25 +142,33 @@ def _extract_pptx(file_path: Path) -> str:
 
 
 def _extract_xlsx(file_path: Path) -> str:
-    """Excel (.xlsx) → 文本"""
+    """
+    Excel (.xlsx) → 文本
+    以 read_only 模式流式解析工作表 XML，不为每个单元格构建 Cell 对象，大表格提速明显且内存占用恒定。
+    """
     from openpyxl import load_workbook
 
     logger.info(f"提取 Excel: {file_path.name}")
-    wb = load_workbook(str(file_path), data_only=True)
+    wb = load_workbook(str(file_path), read_only=True, data_only=True)
 
     texts = []
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
-        rows = []
-        for row in ws.iter_rows(values_only=True):
-            cells = [str(c) if c is not None else "" for c in row]
-            if any(cells):
-                rows.append(" | ".join(cells))
-        if rows:
-            texts.append(f"--- 工作表: {sheet_name} ---\n" + "\n".join(rows))
+    try:
+        sheet_names = wb.sheetnames
+        for sheet_name in sheet_names:
+            ws = wb[sheet_name]
+            rows = []
+            for row in ws.iter_rows(values_only=True):
+                cells = ["" if c is None else str(c) for c in row]
+                if any(cells):
+                    rows.append(" | ".join(cells))
+            if rows:
+                texts.append(f"--- 工作表: {sheet_name} ---\n" + "\n".join(rows))
+    finally:
+        # read_only 模式保持文件句柄打开，需显式关闭
+        wb.close()
 
     full_text = "\n\n".join(texts)
-    logger.info(f"Excel 提取完成: {len(wb.sheetnames)} 表, {len(full_text)} 字符")
+    logger.info(f"Excel 提取完成: {len(sheet_names)} 表, {len(full_text)} 字符")
     return full_text
 
 
@@ -140,7 +184,7 @@ def _extract_html(file_path: Path) -> str:
 
     logger.info(f"提取 HTML: {file_path.name}")
     html = file_path.read_text(encoding="utf-8")
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, _html_parser())
 
     # 移除脚本和样式
     for tag in soup(["script", "style", "nav", "footer", "header"]):
@@ -149,3 +193,27 @@ def _extract_html(file_path: Path) -> str:
     text = soup.get_text(separator="\n", strip=True)
     logger.info(f"HTML 提取完成: {len(text)} 字符")
     return text
+
+
+@functools.lru_cache(maxsize=1)
+def _html_parser() -> str:
+    """BeautifulSoup 解析器：优先 lxml（libxml2，C 实现，快数倍），未安装时回退标准库 html.parser"""
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+# 后缀 -> 提取器（模块加载时建表，逐文件分发只需一次字典查找）
+_EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".docx": _extract_docx,
+    ".doc": _extract_docx,
+    ".pptx": _extract_pptx,
+    ".ppt": _extract_pptx,
+    ".xlsx": _extract_xlsx,
+    ".xls": _extract_xlsx,
+    ".txt": _extract_text_file,
+    ".md": _extract_text_file,
+}
@@ -7,11 +7,20 @@ OCR 处理器：图片 → 文本
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 logger = logging.getLogger("deepdistill.ocr")
 
+# 已初始化的 OCR 引擎：(引擎, 参数...) -> (Reader/PaddleOCR, 推理锁)，进程内复用，避免每张图片重新加载模型。
+# 引擎实例非线程安全（_ocr_slots 允许多张图片同时识别），同一实例的推理调用需持有其推理锁
+_ENGINE_CACHE: dict[tuple, tuple[object, threading.Lock]] = {}
+_engine_lock = threading.Lock()
+
 
 def extract_text_from_image(file_path: Path) -> str:
     """
@@ -25,39 +34,73 @@ def extract_text_from_image(file_path: Path) -> str:
     if engine == "easyocr":
         return _easyocr_extract(file_path, cfg.OCR_LANGUAGES)
     elif engine == "paddleocr":
-        return _paddleocr_extract(file_path)
+        return _paddleocr_extract(file_path, cfg.OCR_USE_ANGLE_CLS)
     else:
         raise ValueError(f"不支持的 OCR 引擎: {engine}")
 
 
+async def extract_text_from_images_async(file_paths: list[Path], concurrency: int | None = None) -> list[str]:
+    """
+    并发识别多张图片（如 PDF 渲染出的页面、扫描件目录），返回与 file_paths 顺序一致的文本列表。
+    库接口：包内管线逐文件调用 extract_text，目前没有调用方，供外部批量识别使用。
+    各图片共用同一个缓存的 OCR 引擎，在线程池中执行；同时识别的图片数默认 OCR_CONCURRENCY，
+    且每次识别都占用与 extract_text 共享的 OCR 名额（_ocr_slots），与并发管线合计不超过上限，
+    避免多路推理同时争用同一引擎/显存。任一图片失败时抛出其异常。
+    """
+    from . import OCR_CONCURRENCY
+
+    file_paths = list(file_paths)
+    if not file_paths:
+        return []
+    workers = max(1, min(concurrency or OCR_CONCURRENCY, len(file_paths)))
+    loop = asyncio.get_running_loop()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") as executor:
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(executor, _extract_with_slot, p) for p in file_paths)
+        ))
+
+
+def _extract_with_slot(file_path: Path) -> str:
+    """占用一个共享 OCR 名额后识别单张图片"""
+    from . import _ocr_slots
+
+    with _ocr_slots:
+        return extract_text_from_image(file_path)
+
+
+def extract_text_from_images(file_paths: list[Path], concurrency: int | None = None) -> list[str]:
+    """extract_text_from_images_async 的同步版本（不可在已运行的事件循环中调用，异步代码请直接 await 异步版本）"""
+    return asyncio.run(extract_text_from_images_async(file_paths, concurrency))
+
+
 def _easyocr_extract(file_path: Path, languages: list[str]) -> str:
     """使用 EasyOCR 提取文字"""
-    import easyocr
-
     logger.info(f"EasyOCR 识别: {file_path.name} (语言: {languages})")
-    reader = easyocr.Reader(languages, gpu=_has_gpu())
+    reader, infer_lock = _get_easyocr_reader(tuple(languages), _has_gpu())
 
-    results = reader.readtext(str(file_path))
+    with infer_lock:
+        results = reader.readtext(str(file_path))
 
-    # 按位置排序（从上到下，从左到右）
+    # 先过滤低置信度噪声框，再按位置排序（从上到下，从左到右）
+    results = [r for r in results if r[2] > 0.3]
     results.sort(key=lambda r: (r[0][0][1], r[0][0][0]))
 
     # 合并文本
-    texts = [text for _, text, conf in results if conf > 0.3]
+    texts = [text for _, text, _conf in results]
     full_text = "\n".join(texts)
 
     logger.info(f"OCR 完成: {len(texts)} 个文本块, {len(full_text)} 字符")
     return full_text
 
 
-def _paddleocr_extract(file_path: Path) -> str:
-    """使用 PaddleOCR 提取文字"""
-    from paddleocr import PaddleOCR
-
+def _paddleocr_extract(file_path: Path, use_angle_cls: bool = False) -> str:
+    """使用 PaddleOCR 提取文字；use_angle_cls 控制是否对每个文本框运行方向分类器"""
     logger.info(f"PaddleOCR 识别: {file_path.name}")
-    ocr = PaddleOCR(use_angle_cls=True, lang="ch")
+    ocr, infer_lock = _get_paddleocr("ch", use_angle_cls)
 
-    result = ocr.ocr(str(file_path), cls=True)
+    with infer_lock:
+        result = ocr.ocr(str(file_path), cls=use_angle_cls)
 
     texts = []
     if result and result[0]:
@@ -72,6 +115,33 @@ def _paddleocr_extract(file_path: Path) -> str:
     return full_text
 
 
+def _get_easyocr_reader(languages: tuple[str, ...], gpu: bool):
+    """获取（必要时创建）EasyOCR Reader 及其推理锁，按 (语言, 是否 GPU) 缓存"""
+    key = ("easyocr", languages, gpu)
+    with _engine_lock:
+        entry = _ENGINE_CACHE.get(key)
+        if entry is None:
+            import easyocr
+
+            entry = (easyocr.Reader(list(languages), gpu=gpu), threading.Lock())
+            _ENGINE_CACHE[key] = entry
+    return entry
+
+
+def _get_paddleocr(lang: str, use_angle_cls: bool):
+    """获取（必要时创建）PaddleOCR 实例及其推理锁，按 (语言, 是否加载方向分类器) 缓存"""
+    key = ("paddleocr", lang, use_angle_cls)
+    with _engine_lock:
+        entry = _ENGINE_CACHE.get(key)
+        if entry is None:
+            from paddleocr import PaddleOCR
+
+            entry = (PaddleOCR(use_angle_cls=use_angle_cls, lang=lang), threading.Lock())
+            _ENGINE_CACHE[key] = entry
+    return entry
+
+
+@functools.lru_cache(maxsize=1)
 def _has_gpu() -> bool:
     """检测是否有可用 GPU"""
     try:
@@ -6,13 +6,124 @@ Layer 3: 视频增强分析层
 
 from __future__ import annotations
 
+import importlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from ..config import cfg
 
 logger = logging.getLogger("deepdistill.video_analysis")
 
+# Haar 人脸级联分类器：每个线程加载一次后复用（detectMultiScale 非线程安全，不跨线程共享）
+_cascade_local = threading.local()
+
+
+def _face_cascade():
+    """获取当前线程的正面人脸 Haar 级联分类器（首次调用时解析 XML）"""
+    cascade = getattr(_cascade_local, "face", None)
+    if cascade is None:
+        import cv2
+
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        _cascade_local.face = cascade
+    return cascade
+
+
+# OpenCV DNN 人脸检测（ResNet-10 SSD）：模型文件放在 cfg.VIDEO_FACE_MODEL_DIR 下时启用，
+# 所有场景关键帧一次批量前向；不存在时回退到逐帧 Haar 级联
+FACE_DNN_FILES = ("deploy.prototxt", "res10_300x300_ssd_iter_140000.caffemodel")
+FACE_DNN_SIZE = 300
+FACE_DNN_CONF = 0.5
+# 单次前向的最大帧数（限制输入 blob 内存：每帧 3x300x300 float32 ≈ 1MB）
+FACE_DNN_BATCH = 32
+_face_net_obj = None
+_face_net_loaded = False
+_face_net_lock = threading.Lock()
+
+
+def _face_net():
+    """获取共享的 DNN 人脸检测网络（首次调用时加载）；模型文件缺失或加载失败返回 None"""
+    global _face_net_obj, _face_net_loaded
+    with _face_net_lock:
+        if not _face_net_loaded:
+            _face_net_loaded = True
+            proto, weights = (cfg.VIDEO_FACE_MODEL_DIR / name for name in FACE_DNN_FILES)
+            if proto.exists() and weights.exists():
+                try:
+                    import cv2
+
+                    net = cv2.dnn.readNetFromCaffe(str(proto), str(weights))
+                    net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+                    net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+                    _face_net_obj = net
+                except Exception as e:
+                    logger.warning(f"DNN 人脸检测模型加载失败，使用 Haar 级联: {e}")
+            else:
+                logger.info(f"未找到 DNN 人脸检测模型（{cfg.VIDEO_FACE_MODEL_DIR}），使用 Haar 级联")
+        return _face_net_obj
+
+
+def _face_dnn_input(frame):
+    """把 BGR 关键帧缩放为 DNN 输入尺寸（分析阶段只保留这张小图，批量检测时再组 blob）"""
+    import cv2
+
+    return cv2.resize(frame, (FACE_DNN_SIZE, FACE_DNN_SIZE))
+
+
+def _detect_faces_dnn(images: list) -> list[list[float]]:
+    """
+    对 _face_dnn_input 产出的小图批量检测人脸，返回每帧各人脸的面积占比（框面积 / 画面面积）。
+    SSD 输出的是归一化坐标，面积占比与原始分辨率无关。
+    """
+    import cv2
+
+    net = _face_net()
+    ratios: list[list[float]] = [[] for _ in images]
+    for start in range(0, len(images), FACE_DNN_BATCH):
+        chunk = images[start:start + FACE_DNN_BATCH]
+        blob = cv2.dnn.blobFromImages(chunk, 1.0, (FACE_DNN_SIZE, FACE_DNN_SIZE), (104, 177, 123),
+                                      swapRB=False, crop=False)
+        with _face_net_lock:  # cv2.dnn.Net 非线程安全
+            net.setInput(blob)
+            detections = net.forward()
+        # detections 形状 (1, 1, N, 7)：[batch_id, class, conf, x1, y1, x2, y2]
+        for det in detections[0, 0]:
+            if det[2] < FACE_DNN_CONF:
+                continue
+            x1, y1 = max(0.0, float(det[3])), max(0.0, float(det[4]))
+            x2, y2 = min(1.0, float(det[5])), min(1.0, float(det[6]))
+            if x2 > x1 and y2 > y1:
+                ratios[start + int(det[0])].append((x2 - x1) * (y2 - y1))
+    return ratios
+
+
+_LEVELS = ("basic", "standard", "full")
+
+# 依赖镜头切割结果的各项分析：
+# (结果键, 模块, 函数, 最低级别, 是否使用预解码关键帧, 名称, 完成日志（{n} 为结果条数）)
+# basic: 基础风格；standard: + 场景识别 + 动作识别；full: + 拍摄手法 + 转场检测
+_STAGES = [
+    ("style", "style_analyzer", "analyze_style", "basic", False, "风格分析", "完成"),
+    ("objects", "object_detector", "detect_objects", "standard", True, "场景识别", ": {n} 个关键帧分析"),
+    ("actions", "action_detector", "detect_actions", "standard", True, "动作识别", ": {n} 个动作"),
+    ("cinematography", "cinematography", "analyze_cinematography", "full", True, "拍摄手法分析", "完成"),
+    ("transitions", "transition_detector", "detect_transitions", "full", False, "转场检测", ": {n} 个转场"),
+]
+
+
+# 只需文件路径与场景列表的分析：cfg.VIDEO_STAGE_PROCESSES > 0 时在常驻进程池中执行（见 _pool）
+_PROCESS_STAGES = {"style", "transitions"}
+
+
+def _run_stage(module: str, func: str, file_path: Path, scenes: list[dict], in_process_pool: bool = False, **kwargs):
+    """导入并执行一项分析（导入失败同样作为该项失败处理）；in_process_pool 时提交到常驻进程池"""
+    if in_process_pool:
+        from . import _pool
+        return _pool.run(module, func, file_path, scenes)
+    return getattr(importlib.import_module(f".{module}", __name__), func)(file_path, scenes, **kwargs)
+
 
 def analyze_video(file_path: Path) -> dict:
     """
@@ -21,6 +132,7 @@ def analyze_video(file_path: Path) -> dict:
     - basic: 仅镜头切割 + 基础风格
     - standard: + 场景识别 + 动作识别
     - full: + 拍摄手法 + 转场检测
+    镜头切割完成后，其余各项并发执行。
     """
     level = cfg.VIDEO_ANALYSIS_LEVEL
     logger.info(f"视频分析开始: {file_path.name} (级别: {level})")
@@ -35,53 +147,46 @@ def analyze_video(file_path: Path) -> dict:
         "analysis_level": level,
     }
 
-    # basic 级别：镜头切割 + 基础风格
-    if level in ("basic", "standard", "full"):
-        try:
-            from .scene_detector import detect_scenes
-            result["scenes"] = detect_scenes(file_path)
-            logger.info(f"  镜头切割: {len(result['scenes'])} 个场景")
-        except Exception as e:
-            logger.warning(f"  镜头切割失败: {e}")
+    if level not in _LEVELS:
+        logger.info(f"视频分析完成: {file_path.name}")
+        return result
 
-        try:
-            from .style_analyzer import analyze_style
-            result["style"] = analyze_style(file_path, result["scenes"])
-            logger.info(f"  风格分析完成")
-        except Exception as e:
-            logger.warning(f"  风格分析失败: {e}")
-
-    # standard 级别：+ 场景识别 + 动作识别
-    if level in ("standard", "full"):
-        try:
-            from .object_detector import detect_objects
-            result["objects"] = detect_objects(file_path, result["scenes"])
-            logger.info(f"  场景识别: {len(result['objects'])} 个关键帧分析")
-        except Exception as e:
-            logger.warning(f"  场景识别失败: {e}")
+    # 镜头切割是其余各项分析的共同输入，先单独完成
+    try:
+        from .scene_detector import detect_scenes
+        result["scenes"] = detect_scenes(file_path)
+        logger.info(f"  镜头切割: {len(result['scenes'])} 个场景")
+    except Exception as e:
+        logger.warning(f"  镜头切割失败: {e}")
 
-        try:
-            from .action_detector import detect_actions
-            result["actions"] = detect_actions(file_path, result["scenes"])
-            logger.info(f"  动作识别: {len(result['actions'])} 个动作")
-        except Exception as e:
-            logger.warning(f"  动作识别失败: {e}")
+    stages = [st for st in _STAGES if _LEVELS.index(st[3]) <= _LEVELS.index(level)]
 
-    # full 级别：+ 拍摄手法 + 转场检测
-    if level == "full":
+    # 物体/动作/拍摄手法都要分析同一批场景关键帧：先解码一次放在内存中共用（不放进 result，结果需可 JSON 序列化）
+    keyframes = {}
+    if cfg.VIDEO_KEYFRAME_CACHE_MB > 0 and result["scenes"] and sum(st[4] for st in stages) > 1:
         try:
-            from .cinematography import analyze_cinematography
-            result["cinematography"] = analyze_cinematography(file_path, result["scenes"])
-            logger.info(f"  拍摄手法分析完成")
+            from .scene_detector import extract_keyframe_array
+            keyframes = extract_keyframe_array(file_path, result["scenes"])
         except Exception as e:
-            logger.warning(f"  拍摄手法分析失败: {e}")
+            logger.warning(f"  关键帧预解码失败，各项分析自行读取: {e}")
 
-        try:
-            from .transition_detector import detect_transitions
-            result["transitions"] = detect_transitions(file_path, result["scenes"])
-            logger.info(f"  转场检测: {len(result['transitions'])} 个转场")
-        except Exception as e:
-            logger.warning(f"  转场检测失败: {e}")
+    use_pool = cfg.VIDEO_STAGE_PROCESSES > 0 and bool(result["scenes"])
+    # 其余分析只依赖场景列表、互不依赖（各自打开 VideoCapture），并发执行；单项失败不影响其他项
+    with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="video-stage") as executor:
+        futures = [
+            (stage, executor.submit(
+                _run_stage, stage[1], stage[2], file_path, result["scenes"],
+                in_process_pool=use_pool and stage[0] in _PROCESS_STAGES,
+                **({"keyframes": keyframes} if stage[4] else {}),
+            ))
+            for stage in stages
+        ]
+        for (key, _, _, _, _, name, done_msg), future in futures:
+            try:
+                result[key] = future.result()
+                logger.info(f"  {name}{done_msg.format(n=len(result[key]))}")
+            except Exception as e:
+                logger.warning(f"  {name}失败: {e}")
 
     logger.info(f"视频分析完成: {file_path.name}")
     return result
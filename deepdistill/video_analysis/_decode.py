@@ -0,0 +1,158 @@
+"""
+视频帧读取工具
+各分析器都按「逐场景 seek → 解码关键帧 → 分析」处理；这里提供按场景并行的调度
+（每个工作线程持有独立的 cv2.VideoCapture，VideoCapture 非线程安全）、
+可选硬件解码的打开方式，以及避免短距离重复 seek 的按帧号读取。
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+
+# 目标帧在当前解码位置之后且相距不超过该帧数时，顺序跳帧而不 seek（约为常见 GOP 长度的一半~一倍）
+FORWARD_GRAB_MAX = 48
+
+
+class LazyCapture:
+    """
+    首次使用时才打开的 VideoCapture 代理（属性访问转发给真实的 capture）。
+    关键帧已预先解码时，各分析器多数场景不必读视频，也就不必（在每个线程上）初始化解码器。
+    """
+
+    def __init__(self, file_path: Path):
+        self._file_path = file_path
+        self._cap: cv2.VideoCapture | None = None
+
+    def __getattr__(self, name):
+        if self._cap is None:
+            self._cap = open_capture(self._file_path)
+        return getattr(self._cap, name)
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+
+
+def map_scenes(file_path: Path, scenes: list[dict], func: Callable, workers: int | None = None) -> list:
+    """
+    对每个场景调用 func(scene, cap)，返回与 scenes 顺序一致的结果（func 返回 None 的场景被丢弃）。
+    cap 为本线程的 LazyCapture（首次读取时才打开视频）。
+    workers 默认取 cfg.VIDEO_WORKERS；OpenCV 解码与推理在原生代码中释放 GIL，线程可真正并行。
+    """
+    from ..config import cfg
+
+    if not scenes:
+        return []
+    workers = max(1, min(workers or cfg.VIDEO_WORKERS, len(scenes)))
+    local = threading.local()
+    caps: list[LazyCapture] = []
+    caps_lock = threading.Lock()
+
+    def _run(scene: dict):
+        cap = getattr(local, "cap", None)
+        if cap is None:
+            cap = LazyCapture(file_path)
+            local.cap = cap
+            with caps_lock:
+                caps.append(cap)
+        return func(scene, cap)
+
+    try:
+        if workers == 1:
+            results = [_run(scene) for scene in scenes]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="video-scene") as executor:
+                results = list(executor.map(_run, scenes))
+    finally:
+        for cap in caps:
+            cap.release()
+    return [r for r in results if r is not None]
+
+
+def open_capture(file_path: Path) -> cv2.VideoCapture:
+    """
+    打开视频用于解码。cfg.VIDEO_HW_DECODE 开启时请求 FFmpeg 后端的硬件解码
+    （VAAPI / NVDEC / VideoToolbox 等，取决于 OpenCV 编译选项），读出的帧与软件解码一样是 BGR ndarray；
+    OpenCV 未编译 FFmpeg/硬件解码支持或打开失败时回退到默认的软件解码。
+    只读取元信息（帧率、帧数）时用 video_info（带缓存，不初始化硬件解码器）。
+    """
+    from ..config import cfg
+
+    if cfg.VIDEO_HW_DECODE:
+        try:
+            # 不指定 CAP_PROP_HW_DEVICE：与 VIDEO_ACCELERATION_ANY 同时使用时 OpenCV 会拒绝打开
+            cap = cv2.VideoCapture(str(file_path), cv2.CAP_FFMPEG, [
+                cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+            ])
+            if cap.isOpened():
+                return cap
+            cap.release()
+        except (cv2.error, AttributeError):  # AttributeError：OpenCV < 4.5.2 无硬件解码属性
+            pass
+    return cv2.VideoCapture(str(file_path))
+
+
+def video_info(file_path: Path) -> tuple[float, int] | None:
+    """
+    读取视频元信息 (帧率, 总帧数)，帧率读不到时按 30fps；无法打开返回 None。
+    按文件身份（路径 + 大小 + mtime）缓存：同一视频的各项分析只解析一次容器头，不再各自打开 VideoCapture。
+    """
+    try:
+        st = file_path.stat()
+    except OSError:
+        return None
+    return _probe_video(str(file_path.resolve()), st.st_size, st.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=32)
+def _probe_video(path: str, size: int, mtime_ns: int) -> tuple[float, int] | None:
+    """打开视频读取元信息（不解码，不需要硬件解码）；size/mtime_ns 只用作缓存键"""
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return None
+        return cap.get(cv2.CAP_PROP_FPS) or 30, int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+
+def mid_frame_index(scene: dict) -> int:
+    """场景关键帧（中间帧）的帧号"""
+    return (scene["start_frame"] + scene["end_frame"]) // 2
+
+
+def scene_keyframe(scene: dict, cap, keyframes: dict | None = None) -> np.ndarray | None:
+    """
+    取场景关键帧（BGR）：keyframes（scene_id → 帧，见 scene_detector.extract_keyframe_array）中有则直接复用，
+    否则从 cap 读取；读取失败返回 None。复用的帧被多个分析器共享，调用方不得原地修改。
+    """
+    frame = keyframes.get(scene["scene_id"]) if keyframes else None
+    if frame is None:
+        ret, frame = read_frame(cap, mid_frame_index(scene))
+        if not ret:
+            return None
+    return frame
+
+
+def read_frame(cap: cv2.VideoCapture, frame_index: int) -> tuple[bool, np.ndarray | None]:
+    """
+    读取第 frame_index 帧，返回值同 cap.read()。
+    目标帧在当前位置之后不远（≤ FORWARD_GRAB_MAX 帧）时顺序 grab 跳过中间帧，不做 seek：
+    seek 会回到前一个关键帧重新解码到目标位置并清空解码器，相邻采样点（转场检测、
+    同一场景内多次取帧）反复 seek 等于同一段 GOP 解码多遍；grab 只解码不做颜色转换。
+    """
+    gap = frame_index - int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    if 0 <= gap <= FORWARD_GRAB_MAX:
+        for _ in range(gap):
+            if not cap.grab():
+                return False, None
+    else:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+    return cap.read()
@@ -0,0 +1,72 @@
+"""
+视频分析常驻进程池
+风格分析、转场检测只需要文件路径与场景列表、结果可 JSON 序列化，且逐帧处理中 Python 层开销较多：
+放到常驻的工作进程中执行，多个视频同时分析（API 并发任务）时不再在同一进程内争用 GIL。
+进程池跨调用复用（cfg.VIDEO_STAGE_PROCESSES > 0 时启用），避免每个视频重新启动进程、导入 OpenCV。
+"""
+
+from __future__ import annotations
+
+import atexit
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+_pool: ProcessPoolExecutor | None = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def _run_in_worker(module: str, func: str, file_path: str, scenes: list[dict]):
+    """工作进程内执行：导入 deepdistill.video_analysis.<module> 并调用 func(file_path, scenes)"""
+    return getattr(importlib.import_module(f".{module}", __package__), func)(Path(file_path), scenes)
+
+
+def get_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    获取（必要时创建）常驻进程池，进程数变化时重建。
+    使用 spawn 启动：主进程可能已初始化 CUDA（Whisper/YOLO），fork 后子进程不可用。
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != processes:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+            _pool_size = processes
+        return _pool
+
+
+def discard_pool(pool: ProcessPoolExecutor):
+    """丢弃已损坏的进程池（若仍是当前进程池），下次提交时重建"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run(module: str, func: str, file_path: Path, scenes: list[dict]):
+    """
+    在进程池中执行一项分析并等待结果（路径转为 str、场景为普通 dict，均可 pickle）。
+    工作进程异常退出（如内存不足被杀）时丢弃进程池，本次改在当前进程执行。
+    """
+    from ..config import cfg
+
+    pool = get_pool(cfg.VIDEO_STAGE_PROCESSES)
+    try:
+        return pool.submit(_run_in_worker, module, func, str(file_path), scenes).result()
+    except BrokenProcessPool:
+        discard_pool(pool)
+        return _run_in_worker(module, func, str(file_path), scenes)
+
+
+@atexit.register
+def _close_pool():
+    """进程退出时关闭进程池"""
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
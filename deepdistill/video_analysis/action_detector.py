@@ -2,22 +2,68 @@
 人物 / 动作识别
 使用 MediaPipe 检测视频中的人体姿态，分析动作类型。
 当 MediaPipe 不可用时，降级为基于 OpenCV 的简易人脸/运动检测。
+
+Pose 默认使用 Lite 模型（video_analysis.pose_model_complexity: 0），CPU 上约为 Full 的 3 倍速度；
+动作推断只用到 9 个主要关节的粗略位置，只有下游需要精细关节坐标时才值得调高到 1（Full）/ 2（Heavy）。
 """
 
 from __future__ import annotations
 
+import atexit
 import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 import cv2
 import numpy as np
 
-logger = logging.getLogger("deepdistill.video_analysis.action")
+from . import _detect_faces_dnn, _face_cascade, _face_dnn_input, _face_net
+from ._decode import map_scenes, mid_frame_index, read_frame, scene_keyframe, video_info
 
+logger = logging.getLogger("deepdistill.video_analysis.action")
 
-def detect_actions(file_path: Path, scenes: list[dict]) -> list[dict]:
+# BlazePose 33 点拓扑中用到的关节索引（与 mp.solutions.pose.PoseLandmark 的取值一致，
+# 预先写成整数常量，避免每个场景重复查枚举，也不必为取常量在模块导入时加载 MediaPipe）
+_NOSE = 0
+_LEFT_SHOULDER, _RIGHT_SHOULDER = 11, 12
+_LEFT_ELBOW, _RIGHT_ELBOW = 13, 14
+_LEFT_WRIST, _RIGHT_WRIST = 15, 16
+_LEFT_HIP, _RIGHT_HIP = 23, 24
+_LEFT_KNEE, _RIGHT_KNEE = 25, 26
+# 输出的关键关节：名称 → 索引
+_KEY_JOINTS = {
+    "nose": _NOSE,
+    "left_shoulder": _LEFT_SHOULDER,
+    "right_shoulder": _RIGHT_SHOULDER,
+    "left_elbow": _LEFT_ELBOW,
+    "right_elbow": _RIGHT_ELBOW,
+    "left_wrist": _LEFT_WRIST,
+    "right_wrist": _RIGHT_WRIST,
+    "left_hip": _LEFT_HIP,
+    "right_hip": _RIGHT_HIP,
+}
+
+# MediaPipe Pose 实例：首次使用时创建，进程内复用（模型图加载较慢）；process() 非线程安全，调用时加锁
+_pose = None
+_pose_lock = threading.Lock()
+
+# Pose 进程池（cfg.VIDEO_POSE_PROCESSES > 1 时启用）：跨调用常驻，避免每个视频重新启动进程、加载模型
+_pose_pool: ProcessPoolExecutor | None = None
+_pose_pool_size = 0
+_pose_pool_lock = threading.Lock()
+# 每个线程复用的 RGB 转换缓冲区（Pose.process 同步返回后即可覆盖）
+_rgb_local = threading.local()
+# 进程池模式下送入工作进程的帧最长边（Pose 模型输入仅 256x256）
+POSE_INPUT_MAX_SIDE = 640
+
+
+def detect_actions(file_path: Path, scenes: list[dict], keyframes: dict | None = None) -> list[dict]:
     """
     对每个场景的关键帧进行人物/动作检测。
+    keyframes 为预解码的关键帧 {scene_id: BGR 帧}（可选，缺失的场景从视频读取）。
 
     Returns:
         动作列表：
@@ -28,77 +74,154 @@ def detect_actions(file_path: Path, scenes: list[dict]) -> list[dict]:
     """
     try:
         import mediapipe as mp
-        return _mediapipe_detect(file_path, scenes)
+        return _mediapipe_detect(file_path, scenes, keyframes)
     except ImportError:
         logger.warning("MediaPipe 未安装，使用 OpenCV 简易检测")
-        return _opencv_detect(file_path, scenes)
+        return _opencv_detect(file_path, scenes, keyframes)
 
 
-def _mediapipe_detect(file_path: Path, scenes: list[dict]) -> list[dict]:
-    """使用 MediaPipe Pose 进行人体姿态检测"""
+def _mediapipe_detect(file_path: Path, scenes: list[dict], keyframes: dict | None = None) -> list[dict]:
+    """
+    使用 MediaPipe Pose 进行人体姿态检测。
+    Pose 推理单线程占满一个核，且 process() 非线程安全：
+    cfg.VIDEO_POSE_PROCESSES > 1 时分发到常驻进程池（每个进程一个 Pose 实例），否则在本进程共享实例上加锁串行。
+    """
+    from ..config import cfg
+
+    pool = _get_pose_pool(cfg.VIDEO_POSE_PROCESSES) if cfg.VIDEO_POSE_PROCESSES > 1 and len(scenes) > 1 else None
+
+    def _scene(scene: dict, cap: cv2.VideoCapture) -> dict | None:
+        frame = scene_keyframe(scene, cap, keyframes)
+        if frame is None:
+            return None
+
+        if pool is not None:
+            # Pose 内部会缩放到 256x256，先缩小再跨进程传递，减少序列化数据量（关节坐标为归一化值，不受影响）
+            h, w = frame.shape[:2]
+            scale = POSE_INPUT_MAX_SIDE / max(h, w)
+            if scale < 1:
+                frame = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+            try:
+                result = pool.submit(_pose_worker, frame).result()
+            except BrokenProcessPool:
+                # 工作进程异常退出（如内存不足被杀）：丢弃进程池（下次调用重建），本场景改在本进程推理
+                _discard_pose_pool(pool)
+                result = _pose_worker(frame)
+        else:
+            result = _pose_worker(frame)
+        return {"scene_id": scene["scene_id"], **result}
+
+    # 解码按场景并行；进程池模式下线程数不少于进程数，保证每个进程都有帧可处理
+    workers = max(cfg.VIDEO_WORKERS, cfg.VIDEO_POSE_PROCESSES) if pool is not None else None
+    return map_scenes(file_path, scenes, _scene, workers=workers)
+
+
+def _pose_worker(frame_bgr: np.ndarray) -> dict:
+    """
+    对单帧做姿态检测并推断动作，返回 person_count / poses / action_type。
+    模块级函数：进程池模式下在工作进程中执行（使用该进程自己的 Pose 实例），也可在本进程直接调用。
+    """
     import mediapipe as mp
 
     mp_pose = mp.solutions.pose
-    pose = mp_pose.Pose(
-        static_image_mode=True,
-        model_complexity=1,
-        min_detection_confidence=0.5,
-    )
-
-    cap = cv2.VideoCapture(str(file_path))
-    results_list = []
-
-    for scene in scenes:
-        mid_frame = (scene["start_frame"] + scene["end_frame"]) // 2
-        cap.set(cv2.CAP_PROP_POS_FRAMES, mid_frame)
-        ret, frame = cap.read()
-        if not ret:
-            continue
-
-        # MediaPipe 需要 RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        mp_results = pose.process(rgb_frame)
-
-        poses = []
-        person_count = 0
-        action_type = "无人物"
-
-        if mp_results.pose_landmarks:
-            person_count = 1  # Pose 模型单人检测
-            landmarks = mp_results.pose_landmarks.landmark
-
-            # 提取关键关节位置
-            key_joints = {
-                "nose": _get_landmark(landmarks, mp_pose.PoseLandmark.NOSE),
-                "left_shoulder": _get_landmark(landmarks, mp_pose.PoseLandmark.LEFT_SHOULDER),
-                "right_shoulder": _get_landmark(landmarks, mp_pose.PoseLandmark.RIGHT_SHOULDER),
-                "left_elbow": _get_landmark(landmarks, mp_pose.PoseLandmark.LEFT_ELBOW),
-                "right_elbow": _get_landmark(landmarks, mp_pose.PoseLandmark.RIGHT_ELBOW),
-                "left_wrist": _get_landmark(landmarks, mp_pose.PoseLandmark.LEFT_WRIST),
-                "right_wrist": _get_landmark(landmarks, mp_pose.PoseLandmark.RIGHT_WRIST),
-                "left_hip": _get_landmark(landmarks, mp_pose.PoseLandmark.LEFT_HIP),
-                "right_hip": _get_landmark(landmarks, mp_pose.PoseLandmark.RIGHT_HIP),
-            }
-            poses.append(key_joints)
-
-            # 推断动作类型
-            action_type = _infer_action(landmarks, mp_pose.PoseLandmark)
-
-        results_list.append({
-            "scene_id": scene["scene_id"],
-            "person_count": person_count,
-            "poses": poses,
-            "action_type": action_type,
-        })
 
-    cap.release()
-    pose.close()
-    return results_list
+    # MediaPipe 需要连续的 RGB 数组：写入本线程复用的缓冲区（同一视频各帧分辨率相同，不再每帧分配）；
+    # 不能用 frame[..., ::-1]，非连续视图会被 MediaPipe 错误转换
+    rgb_frame = getattr(_rgb_local, "buf", None)
+    if rgb_frame is None or rgb_frame.shape != frame_bgr.shape:
+        rgb_frame = _rgb_local.buf = np.empty_like(frame_bgr)
+    cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+    with _pose_lock:
+        mp_results = _get_pose(mp_pose).process(rgb_frame)
+
+    poses = []
+    person_count = 0
+    action_type = "无人物"
+
+    if mp_results.pose_landmarks:
+        person_count = 1  # Pose 模型单人检测
+        landmarks = mp_results.pose_landmarks.landmark
+
+        # 提取关键关节位置
+        key_joints = {name: _get_landmark(landmarks, idx) for name, idx in _KEY_JOINTS.items()}
+        poses.append(key_joints)
+
+        # 推断动作类型
+        action_type = _infer_action(landmarks)
+
+    return {
+        "person_count": person_count,
+        "poses": poses,
+        "action_type": action_type,
+    }
+
+
+def _get_pose(mp_pose):
+    """获取（必要时创建）共享的 Pose 实例；调用方需持有 _pose_lock"""
+    from ..config import cfg
+
+    global _pose
+    if _pose is None:
+        _pose = mp_pose.Pose(
+            static_image_mode=True,  # 各场景关键帧互不相关，逐帧独立检测
+            model_complexity=cfg.VIDEO_POSE_MODEL_COMPLEXITY,
+            smooth_landmarks=False,  # 静态图模式下无跨帧平滑
+            enable_segmentation=False,  # 不需要人体分割掩码
+            min_detection_confidence=0.5,
+        )
+    return _pose
 
 
-def _get_landmark(landmarks, landmark_enum) -> dict:
+def _init_pose_worker():
+    """进程池工作进程初始化：预先创建本进程的 Pose 实例，首个任务不再等待模型图加载"""
+    import mediapipe as mp
+
+    with _pose_lock:
+        _get_pose(mp.solutions.pose)
+
+
+def _get_pose_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    获取（必要时创建）常驻的 Pose 进程池，进程数变化时重建。
+    使用 spawn 启动：主进程可能已初始化 CUDA（Whisper/YOLO），fork 后子进程不可用。
+    """
+    global _pose_pool, _pose_pool_size
+    with _pose_pool_lock:
+        if _pose_pool is None or _pose_pool_size != processes:
+            if _pose_pool is not None:
+                _pose_pool.shutdown(wait=False, cancel_futures=True)
+            _pose_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_pose_worker,
+            )
+            _pose_pool_size = processes
+        return _pose_pool
+
+
+def _discard_pose_pool(pool: ProcessPoolExecutor):
+    """丢弃已损坏的进程池（若仍是当前进程池）"""
+    global _pose_pool
+    with _pose_pool_lock:
+        if _pose_pool is pool:
+            _pose_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def _close_pose():
+    """进程退出时释放 Pose 的计算图资源，并关闭 Pose 进程池"""
+    with _pose_lock:
+        if _pose is not None:
+            _pose.close()
+    with _pose_pool_lock:
+        if _pose_pool is not None:
+            _pose_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_landmark(landmarks, idx: int) -> dict:
     """提取单个关节点坐标"""
-    lm = landmarks[landmark_enum.value]
+    lm = landmarks[idx]
     return {
         "x": round(lm.x, 4),
         "y": round(lm.y, 4),
@@ -106,20 +229,19 @@ def _get_landmark(landmarks, landmark_enum) -> dict:
     }
 
 
-def _infer_action(landmarks, PoseLandmark) -> str:
+def _infer_action(landmarks) -> str:
     """
     基于关节位置推断动作类型。
     简易规则：根据手臂/身体相对位置判断。
     """
-    nose = landmarks[PoseLandmark.NOSE.value]
-    l_wrist = landmarks[PoseLandmark.LEFT_WRIST.value]
-    r_wrist = landmarks[PoseLandmark.RIGHT_WRIST.value]
-    l_shoulder = landmarks[PoseLandmark.LEFT_SHOULDER.value]
-    r_shoulder = landmarks[PoseLandmark.RIGHT_SHOULDER.value]
-    l_hip = landmarks[PoseLandmark.LEFT_HIP.value]
-    r_hip = landmarks[PoseLandmark.RIGHT_HIP.value]
-    l_knee = landmarks[PoseLandmark.LEFT_KNEE.value]
-    r_knee = landmarks[PoseLandmark.RIGHT_KNEE.value]
+    l_wrist = landmarks[_LEFT_WRIST]
+    r_wrist = landmarks[_RIGHT_WRIST]
+    l_shoulder = landmarks[_LEFT_SHOULDER]
+    r_shoulder = landmarks[_RIGHT_SHOULDER]
+    l_hip = landmarks[_LEFT_HIP]
+    r_hip = landmarks[_RIGHT_HIP]
+    l_knee = landmarks[_LEFT_KNEE]
+    r_knee = landmarks[_RIGHT_KNEE]
 
     # 双手举过头顶
     if l_wrist.y < l_shoulder.y and r_wrist.y < r_shoulder.y:
@@ -144,59 +266,56 @@ def _infer_action(landmarks, PoseLandmark) -> str:
     return "站立"
 
 
-def _opencv_detect(file_path: Path, scenes: list[dict]) -> list[dict]:
+def _opencv_detect(file_path: Path, scenes: list[dict], keyframes: dict | None = None) -> list[dict]:
     """
     OpenCV 简易检测（MediaPipe 不可用时的 fallback）。
-    使用 Haar 级联检测人脸，帧间差异检测运动。
+    DNN 人脸检测可用时先收集各场景关键帧、最后整批检测，否则逐帧 Haar 级联；帧间差异检测运动。
     """
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-
-    cap = cv2.VideoCapture(str(file_path))
-    fps = cap.get(cv2.CAP_PROP_FPS) or 30
-    results_list = []
+    info = video_info(file_path)
+    fps = info[0] if info else 30
+    use_dnn = _face_net() is not None
 
-    for scene in scenes:
-        mid_frame = (scene["start_frame"] + scene["end_frame"]) // 2
-        cap.set(cv2.CAP_PROP_POS_FRAMES, mid_frame)
-        ret, frame = cap.read()
-        if not ret:
-            continue
+    def _scene(scene: dict, cap: cv2.VideoCapture) -> dict | None:
+        mid_frame = mid_frame_index(scene)
+        frame = scene_keyframe(scene, cap, keyframes)
+        if frame is None:
+            return None
 
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
-        # 人脸检测
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-        person_count = len(faces)
+        # 人脸检测：DNN 只留缩略图待批量检测；Haar 级联按线程缓存、当场检测
+        face_input = _face_dnn_input(frame) if use_dnn else None
+        person_count = 0 if use_dnn else len(_face_cascade().detectMultiScale(gray, 1.3, 5))
 
-        # 运动检测（比较前后帧）
+        # 运动检测（比较约 1 秒前的帧与中间帧；中间帧的灰度图已在上面算好，不再重复读取/转换）
         motion_level = "静止"
         start_f = max(0, mid_frame - int(fps))
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_f)
-        ret1, frame1 = cap.read()
-        cap.set(cv2.CAP_PROP_POS_FRAMES, mid_frame)
-        ret2, frame2 = cap.read()
-
-        if ret1 and ret2:
-            diff = cv2.absdiff(
-                cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY),
-                cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY),
-            )
-            motion_score = float(np.mean(diff))
+        ret1, frame1 = read_frame(cap, start_f)
+
+        if ret1:
+            diff = cv2.absdiff(cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY), gray)
+            motion_score = cv2.mean(diff)[0]
             if motion_score > 20:
                 motion_level = "剧烈运动"
             elif motion_score > 8:
                 motion_level = "轻微运动"
 
-        action_type = f"{person_count}人, {motion_level}" if person_count > 0 else f"无人物, {motion_level}"
-
-        results_list.append({
+        return {
             "scene_id": scene["scene_id"],
             "person_count": person_count,
             "poses": [],
-            "action_type": action_type,
-        })
-
-    cap.release()
-    return results_list
+            "motion_level": motion_level,
+            "face_input": face_input,
+        }
+
+    results = map_scenes(file_path, scenes, _scene)
+    if use_dnn and results:
+        for r, ratios in zip(results, _detect_faces_dnn([r["face_input"] for r in results])):
+            r["person_count"] = len(ratios)
+
+    for r in results:
+        del r["face_input"]
+        motion_level = r.pop("motion_level")
+        person_count = r["person_count"]
+        r["action_type"] = f"{person_count}人, {motion_level}" if person_count > 0 else f"无人物, {motion_level}"
+    return results
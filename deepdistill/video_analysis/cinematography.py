@@ -7,17 +7,22 @@
 from __future__ import annotations
 
 import logging
+from collections import Counter
 from pathlib import Path
 
 import cv2
 import numpy as np
 
+from . import _detect_faces_dnn, _face_cascade, _face_dnn_input, _face_net
+from ._decode import map_scenes, read_frame, scene_keyframe, video_info
+
 logger = logging.getLogger("deepdistill.video_analysis.cinematography")
 
 
-def analyze_cinematography(file_path: Path, scenes: list[dict]) -> dict:
+def analyze_cinematography(file_path: Path, scenes: list[dict], keyframes: dict | None = None) -> dict:
     """
     分析视频的拍摄手法。
+    keyframes 为预解码的关键帧 {scene_id: BGR 帧}（可选）；镜头运动需要场景内多个采样点，始终从视频读取。
 
     Returns:
         {
@@ -27,45 +32,48 @@ def analyze_cinematography(file_path: Path, scenes: list[dict]) -> dict:
             "summary": "整体拍摄风格描述"
         }
     """
-    cap = cv2.VideoCapture(str(file_path))
-    if not cap.isOpened():
+    info = video_info(file_path)
+    if info is None:
         return {"shot_types": [], "camera_movements": [], "composition": [], "summary": "无法打开视频"}
 
-    fps = cap.get(cv2.CAP_PROP_FPS) or 30
-    frame_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    frame_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-    shot_types = []
-    camera_movements = []
-    compositions = []
-
-    for scene in scenes:
-        mid_frame = (scene["start_frame"] + scene["end_frame"]) // 2
+    fps = info[0]
+    use_dnn = _face_net() is not None
 
-        # --- 景别分析 ---
-        cap.set(cv2.CAP_PROP_POS_FRAMES, mid_frame)
-        ret, frame = cap.read()
-        if not ret:
-            continue
+    def _scene(scene: dict, cap: cv2.VideoCapture) -> tuple[dict, dict, dict] | None:
+        # --- 景别分析（人脸占比 + 边缘密度；DNN 人脸检测在所有场景读完后整批进行）---
+        frame = scene_keyframe(scene, cap, keyframes)
+        if frame is None:
+            return None
 
-        shot_type, shot_conf = _classify_shot_type(frame)
-        shot_types.append({
+        # 灰度图每个场景只转换一次，景别与构图分析共用
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        shot = {
             "scene_id": scene["scene_id"],
-            "shot_type": shot_type,
-            "confidence": round(shot_conf, 3),
-        })
+            "face_input": _face_dnn_input(frame) if use_dnn else _haar_face_ratios(gray),
+            "edge_density": _edge_density(gray),
+        }
 
         # --- 构图分析 ---
-        comp = _analyze_composition(frame)
+        comp = _analyze_composition(gray)
         comp["scene_id"] = scene["scene_id"]
-        compositions.append(comp)
 
         # --- 镜头运动分析 ---
         movement = _analyze_camera_movement(cap, scene, fps)
         movement["scene_id"] = scene["scene_id"]
-        camera_movements.append(movement)
-
-    cap.release()
+        return shot, comp, movement
+
+    # 各场景互不依赖，按场景并行（每个线程独立的 VideoCapture）
+    per_scene = map_scenes(file_path, scenes, _scene)
+    shot_types = [shot for shot, _, _ in per_scene]
+    if use_dnn and shot_types:
+        for shot, ratios in zip(shot_types, _detect_faces_dnn([shot["face_input"] for shot in shot_types])):
+            shot["face_input"] = ratios
+    for shot in shot_types:
+        shot_type, shot_conf = _classify_shot_type(shot.pop("face_input"), shot.pop("edge_density"))
+        shot["shot_type"] = shot_type
+        shot["confidence"] = round(shot_conf, 3)
+    compositions = [comp for _, comp, _ in per_scene]
+    camera_movements = [movement for _, _, movement in per_scene]
 
     # 生成整体描述
     summary = _generate_summary(shot_types, camera_movements, compositions)
@@ -78,24 +86,26 @@ def analyze_cinematography(file_path: Path, scenes: list[dict]) -> dict:
     }
 
 
-def _classify_shot_type(frame: np.ndarray) -> tuple[str, float]:
+def _haar_face_ratios(gray: np.ndarray) -> list[float]:
+    """Haar 级联检测人脸，返回各人脸的面积占比（DNN 人脸检测不可用时使用）"""
+    h, w = gray.shape[:2]
+    faces = _face_cascade().detectMultiScale(gray, 1.1, 4)
+    return [float(fw * fh) / (w * h) for _, _, fw, fh in faces]
+
+
+def _edge_density(gray: np.ndarray) -> float:
+    """Canny 边缘像素占比（无人脸时判断景别）"""
+    edges = cv2.Canny(gray, 50, 150)
+    return cv2.countNonZero(edges) / edges.size
+
+
+def _classify_shot_type(face_ratios: list[float], edge_density: float) -> tuple[str, float]:
     """
     景别分类：远景/全景/中景/近景/特写。
-    基于人脸占比和边缘分布推断。
+    有人脸时按最大人脸的面积占比推断，无人脸时按边缘密度推断。
     """
-    h, w = frame.shape[:2]
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-    # 人脸检测
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-    faces = face_cascade.detectMultiScale(gray, 1.1, 4)
-
-    if len(faces) > 0:
-        # 最大人脸的面积占比
-        max_face = max(faces, key=lambda f: f[2] * f[3])
-        face_ratio = (max_face[2] * max_face[3]) / (w * h)
+    if face_ratios:
+        face_ratio = max(face_ratios)
 
         if face_ratio > 0.15:
             return "特写", 0.85
@@ -107,9 +117,6 @@ def _classify_shot_type(frame: np.ndarray) -> tuple[str, float]:
             return "全景", 0.70
     else:
         # 无人脸：基于边缘密度和纹理判断
-        edges = cv2.Canny(gray, 50, 150)
-        edge_density = float(np.mean(edges > 0))
-
         if edge_density < 0.05:
             return "远景", 0.65
         elif edge_density < 0.10:
@@ -118,52 +125,45 @@ def _classify_shot_type(frame: np.ndarray) -> tuple[str, float]:
             return "中景", 0.55
 
 
-def _analyze_composition(frame: np.ndarray) -> dict:
+def _analyze_composition(gray: np.ndarray) -> dict:
     """
-    构图分析：三分法得分、对称性得分、视觉重心区域。
+    构图分析：三分法得分、对称性得分、视觉重心区域（gray 为关键帧 uint8 灰度图）。
+    三分点 ROI 与 3x3 网格的标准差都由同一对积分图 O(1) 求出，耗时与分辨率基本无关。
     """
-    h, w = frame.shape[:2]
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY).astype(float)
+    h, w = gray.shape[:2]
+    # 积分图：S 为像素和、S2 为平方和，形状 (h+1, w+1)；转 int64 使方差计算全程精确（纯色区域方差恰为 0）
+    S, S2 = cv2.integral2(gray)
+    S, S2 = S.astype(np.int64), S2.astype(np.int64)
 
     # --- 三分法得分 ---
-    # 检查三分线交叉点附近的视觉权重
-    thirds_h = [h // 3, 2 * h // 3]
-    thirds_w = [w // 3, 2 * w // 3]
+    # 检查三分线交叉点附近的视觉权重（高对比度区域 = 视觉焦点）
     roi_size = min(h, w) // 10
-
-    thirds_score = 0.0
-    for th in thirds_h:
-        for tw in thirds_w:
-            roi = gray[max(0, th - roi_size):th + roi_size, max(0, tw - roi_size):tw + roi_size]
-            # 高对比度区域 = 视觉焦点
-            if roi.size > 0:
-                thirds_score += float(np.std(roi))
-    thirds_score = min(1.0, thirds_score / 400.0)
+    ty, tx = np.meshgrid([h // 3, 2 * h // 3], [w // 3, 2 * w // 3], indexing="ij")
+    thirds_std = _rect_std(
+        S, S2,
+        np.maximum(0, ty - roi_size), np.maximum(0, tx - roi_size),
+        np.minimum(h, ty + roi_size), np.minimum(w, tx + roi_size),
+    )
+    thirds_score = min(1.0, float(thirds_std.sum()) / 400.0)
 
     # --- 对称性得分 ---
     left_half = gray[:, :w // 2]
     right_half = cv2.flip(gray[:, w // 2:], 1)
     # 确保尺寸一致
     min_w = min(left_half.shape[1], right_half.shape[1])
-    left_half = left_half[:, :min_w]
-    right_half = right_half[:, :min_w]
-    symmetry_diff = np.mean(np.abs(left_half - right_half))
+    symmetry_diff = cv2.mean(cv2.absdiff(left_half[:, :min_w], right_half[:, :min_w]))[0] if min_w else 0.0
     symmetry_score = max(0.0, 1.0 - symmetry_diff / 128.0)
 
     # --- 视觉重心 ---
-    # 将帧分为 3x3 网格，找到最高权重区域
+    # 将帧分为 3x3 网格，标准差（视觉权重）最高的格子为重心
     regions = ["左上", "中上", "右上", "左中", "中心", "右中", "左下", "中下", "右下"]
     block_h, block_w = h // 3, w // 3
-    max_weight = 0
     dominant_idx = 4  # 默认中心
-
-    for i in range(3):
-        for j in range(3):
-            block = gray[i * block_h:(i + 1) * block_h, j * block_w:(j + 1) * block_w]
-            weight = float(np.std(block))  # 标准差作为视觉权重
-            if weight > max_weight:
-                max_weight = weight
-                dominant_idx = i * 3 + j
+    if block_h > 0 and block_w > 0:
+        gy, gx = np.meshgrid(np.arange(3) * block_h, np.arange(3) * block_w, indexing="ij")
+        weights = _rect_std(S, S2, gy, gx, gy + block_h, gx + block_w)
+        if weights.max() > 0:
+            dominant_idx = int(weights.argmax())
 
     return {
         "rule_of_thirds_score": round(thirds_score, 3),
@@ -172,9 +172,19 @@ def _analyze_composition(frame: np.ndarray) -> dict:
     }
 
 
+def _rect_std(S: np.ndarray, S2: np.ndarray, y1, x1, y2, x2) -> np.ndarray:
+    """由积分图求矩形 [y1, y2) x [x1, x2) 的像素标准差（坐标可为数组，逐元素计算；空矩形为 0）"""
+    n = (y2 - y1) * (x2 - x1)
+    s1 = S[y2, x2] - S[y1, x2] - S[y2, x1] + S[y1, x1]
+    s2 = S2[y2, x2] - S2[y1, x2] - S2[y2, x1] + S2[y1, x1]
+    # var = (n·Σx² − (Σx)²) / n²，分子为精确整数
+    num = n * s2 - s1 * s1
+    return np.where(n > 0, np.sqrt(np.maximum(num, 0) / np.maximum(n, 1) ** 2), 0.0)
+
+
 def _analyze_camera_movement(cap: cv2.VideoCapture, scene: dict, fps: float) -> dict:
     """
-    镜头运动分析：基于光流检测推拉摇移。
+    镜头运动分析：基于稀疏光流检测推拉摇移。
     采样场景的前中后三个时间点，计算光流方向和强度。
     """
     start_f = scene["start_frame"]
@@ -196,22 +206,16 @@ def _analyze_camera_movement(cap: cv2.VideoCapture, scene: dict, fps: float) ->
     all_mag = []
 
     for sp in sample_points:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, sp)
-        ret1, frame1 = cap.read()
+        ret1, frame1 = read_frame(cap, sp)
         ret2, frame2 = cap.read()
         if not (ret1 and ret2):
             continue
 
-        gray1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
-        gray2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
-
-        # 缩小加速
-        small1 = cv2.resize(gray1, (160, 90))
-        small2 = cv2.resize(gray2, (160, 90))
+        # 先缩小再转灰度：颜色转换只处理 160x90 的小图
+        small1 = cv2.cvtColor(cv2.resize(frame1, (160, 90)), cv2.COLOR_BGR2GRAY)
+        small2 = cv2.cvtColor(cv2.resize(frame2, (160, 90)), cv2.COLOR_BGR2GRAY)
 
-        flow = cv2.calcOpticalFlowFarneback(small1, small2, None, 0.5, 3, 15, 3, 5, 1.2, 0)
-        dx = float(np.median(flow[..., 0]))
-        dy = float(np.median(flow[..., 1]))
+        dx, dy = _median_flow(small1, small2)
         mag = float(np.sqrt(dx ** 2 + dy ** 2))
 
         all_dx.append(dx)
@@ -246,24 +250,33 @@ def _analyze_camera_movement(cap: cv2.VideoCapture, scene: dict, fps: float) ->
     }
 
 
+def _median_flow(gray1: np.ndarray, gray2: np.ndarray) -> tuple[float, float]:
+    """
+    两帧间的整体位移（光流 dx/dy 中位数）。
+    只需要中位数，不必算稠密光流：在 Shi-Tomasi 角点上跑金字塔 LK 稀疏光流即可；
+    角点或成功跟踪的点少于 4 个（纯色/极暗画面）时视为无运动。
+    """
+    p0 = cv2.goodFeaturesToTrack(gray1, maxCorners=80, qualityLevel=0.01, minDistance=8)
+    if p0 is None:
+        return 0.0, 0.0
+    p1, st, _ = cv2.calcOpticalFlowPyrLK(gray1, gray2, p0, None, winSize=(15, 15), maxLevel=2)
+    if p1 is None:
+        return 0.0, 0.0
+    good = st.flatten() == 1
+    if int(good.sum()) < 4:
+        return 0.0, 0.0
+    dv = p1[good] - p0[good]
+    return float(np.median(dv[:, 0, 0])), float(np.median(dv[:, 0, 1]))
+
+
 def _generate_summary(shot_types: list, movements: list, compositions: list) -> str:
     """生成整体拍摄风格描述"""
     if not shot_types:
         return "无法分析"
 
-    # 统计景别分布
-    type_counts = {}
-    for st in shot_types:
-        t = st["shot_type"]
-        type_counts[t] = type_counts.get(t, 0) + 1
-    dominant_shot = max(type_counts, key=type_counts.get)
-
-    # 统计运动类型
-    move_counts = {}
-    for m in movements:
-        mt = m["movement_type"]
-        move_counts[mt] = move_counts.get(mt, 0) + 1
-    dominant_move = max(move_counts, key=move_counts.get) if move_counts else "未知"
+    # 统计景别分布与运动类型（并列时取先出现的）
+    dominant_shot = Counter(st["shot_type"] for st in shot_types).most_common(1)[0][0]
+    dominant_move = (Counter(m["movement_type"] for m in movements).most_common(1) or [("未知", 0)])[0][0]
 
     # 平均构图得分
     avg_thirds = np.mean([c["rule_of_thirds_score"] for c in compositions]) if compositions else 0
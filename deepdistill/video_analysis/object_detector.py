@@ -7,15 +7,25 @@
 from __future__ import annotations
 
 import logging
+import threading
+from collections import Counter
 from pathlib import Path
 
 import cv2
 import numpy as np
 
+from ._decode import LazyCapture, map_scenes, mid_frame_index, scene_keyframe
+
 logger = logging.getLogger("deepdistill.video_analysis.object")
 
+# YOLOv8 模型：首次使用时加载，进程内复用；ultralytics 的预测器非线程安全，推理时加锁
+_yolo_model = None
+_yolo_lock = threading.Lock()
+
 
-def detect_objects(file_path: Path, scenes: list[dict], conf_threshold: float = 0.4) -> list[dict]:
+def detect_objects(
+    file_path: Path, scenes: list[dict], conf_threshold: float = 0.4, keyframes: dict | None = None
+) -> list[dict]:
     """
     对每个场景的关键帧进行物体检测。
 
@@ -23,6 +33,7 @@ def detect_objects(file_path: Path, scenes: list[dict], conf_threshold: float =
         file_path: 视频文件路径
         scenes: 场景列表（来自 scene_detector）
         conf_threshold: 置信度阈值
+        keyframes: 预解码的关键帧 {scene_id: BGR 帧}（可选，缺失的场景从视频读取）
 
     Returns:
         每个场景的检测结果列表：
@@ -32,89 +43,108 @@ def detect_objects(file_path: Path, scenes: list[dict], conf_threshold: float =
     """
     try:
         from ultralytics import YOLO
-        return _yolo_detect(file_path, scenes, conf_threshold)
+        return _yolo_detect(file_path, scenes, conf_threshold, keyframes)
     except ImportError:
         logger.warning("YOLOv8 (ultralytics) 未安装，使用 OpenCV 简易检测")
-        return _opencv_detect(file_path, scenes, conf_threshold)
+        return _opencv_detect(file_path, scenes, conf_threshold, keyframes)
 
 
-def _yolo_detect(file_path: Path, scenes: list[dict], conf_threshold: float) -> list[dict]:
-    """使用 YOLOv8 进行物体检测"""
-    from ultralytics import YOLO
+def _yolo_detect(
+    file_path: Path, scenes: list[dict], conf_threshold: float, keyframes: dict | None = None
+) -> list[dict]:
+    """
+    使用 YOLOv8 进行物体检测。
+    关键帧攒满 cfg.VIDEO_YOLO_BATCH 张后一次批量推理（GPU 上单次前向处理整批），
+    只缓存一批帧，长视频的场景再多内存占用也有上限。
+    """
+    from ..config import cfg
 
-    model = YOLO("yolov8n.pt")  # nano 模型，速度优先
-    cap = cv2.VideoCapture(str(file_path))
+    batch_size = max(1, cfg.VIDEO_YOLO_BATCH)
+    cap = LazyCapture(file_path)
     results_list = []
+    batch_frames: list[np.ndarray] = []
+    batch_meta: list[tuple[int, int]] = []  # (scene_id, mid_frame)
+
+    def _flush():
+        # YOLOv8 批量推理：每个输入帧对应一个 Results
+        with _yolo_lock:
+            model = _get_yolo()
+            results = model(batch_frames, verbose=False, conf=conf_threshold)
+        for (scene_id, mid_frame), r in zip(batch_meta, results):
+            results_list.append(_scene_objects(scene_id, mid_frame, r, model.names))
+        batch_frames.clear()
+        batch_meta.clear()
 
     for scene in scenes:
-        mid_frame = (scene["start_frame"] + scene["end_frame"]) // 2
-        cap.set(cv2.CAP_PROP_POS_FRAMES, mid_frame)
-        ret, frame = cap.read()
-        if not ret:
+        frame = scene_keyframe(scene, cap, keyframes)
+        if frame is None:
             continue
-
-        # YOLOv8 推理
-        results = model(frame, verbose=False, conf=conf_threshold)
-
-        objects = []
-        for r in results:
-            for box in r.boxes:
-                cls_id = int(box.cls[0])
-                label = model.names[cls_id]
-                conf = float(box.conf[0])
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                objects.append({
-                    "label": label,
-                    "confidence": round(conf, 3),
-                    "bbox": [round(x1), round(y1), round(x2), round(y2)],
-                })
-
-        # 生成场景描述
-        label_counts = {}
-        for obj in objects:
-            label_counts[obj["label"]] = label_counts.get(obj["label"], 0) + 1
-
-        desc_parts = [f"{count}个{label}" if count > 1 else label for label, count in label_counts.items()]
-        description = "、".join(desc_parts[:8]) if desc_parts else "无明显物体"
-
-        results_list.append({
-            "scene_id": scene["scene_id"],
-            "frame_index": mid_frame,
-            "objects": objects,
-            "object_count": len(objects),
-            "scene_description": description,
-        })
+        batch_frames.append(frame)
+        batch_meta.append((scene["scene_id"], mid_frame_index(scene)))
+        if len(batch_frames) >= batch_size:
+            _flush()
+    if batch_frames:
+        _flush()
 
     cap.release()
     return results_list
 
 
-def _opencv_detect(file_path: Path, scenes: list[dict], conf_threshold: float) -> list[dict]:
+def _get_yolo():
+    """获取（必要时加载）共享的 YOLOv8 模型；调用方需持有 _yolo_lock"""
+    global _yolo_model
+    if _yolo_model is None:
+        from ultralytics import YOLO
+
+        _yolo_model = YOLO("yolov8n.pt")  # nano 模型，速度优先
+    return _yolo_model
+
+
+def _scene_objects(scene_id: int, mid_frame: int, r, names: dict) -> dict:
+    """将单帧的 YOLO 检测结果整理为场景条目"""
+    objects = []
+    for box in r.boxes:
+        cls_id = int(box.cls[0])
+        label = names[cls_id]
+        conf = float(box.conf[0])
+        x1, y1, x2, y2 = box.xyxy[0].tolist()
+        objects.append({
+            "label": label,
+            "confidence": round(conf, 3),
+            "bbox": [round(x1), round(y1), round(x2), round(y2)],
+        })
+
+    # 生成场景描述（按出现次数取前 8 类）
+    label_counts = Counter(obj["label"] for obj in objects)
+    desc_parts = [f"{count}个{label}" if count > 1 else label for label, count in label_counts.most_common(8)]
+    description = "、".join(desc_parts) if desc_parts else "无明显物体"
+
+    return {
+        "scene_id": scene_id,
+        "frame_index": mid_frame,
+        "objects": objects,
+        "object_count": len(objects),
+        "scene_description": description,
+    }
+
+
+def _opencv_detect(
+    file_path: Path, scenes: list[dict], conf_threshold: float, keyframes: dict | None = None
+) -> list[dict]:
     """
     OpenCV 简易检测（YOLOv8 不可用时的 fallback）。
     基于颜色直方图和边缘特征描述场景。
     """
-    cap = cv2.VideoCapture(str(file_path))
-    results_list = []
-
-    for scene in scenes:
-        mid_frame = (scene["start_frame"] + scene["end_frame"]) // 2
-        cap.set(cv2.CAP_PROP_POS_FRAMES, mid_frame)
-        ret, frame = cap.read()
-        if not ret:
-            continue
-
-        # 基于颜色分布判断场景类型
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        h, s, v = cv2.split(hsv)
-
-        # 亮度分析
-        mean_brightness = float(np.mean(v))
-        # 饱和度分析
-        mean_saturation = float(np.mean(s))
-        # 边缘密度（复杂度指标）
+    def _scene(scene: dict, cap: cv2.VideoCapture) -> dict | None:
+        frame = scene_keyframe(scene, cap, keyframes)
+        if frame is None:
+            return None
+
+        # 基于颜色分布判断场景类型：一次 cv2.mean 得到 H/S/V 各通道均值，不拆分通道
+        _, mean_saturation, mean_brightness, _ = cv2.mean(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV))
+        # 边缘密度（复杂度指标）：countNonZero 不分配布尔临时数组
         edges = cv2.Canny(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), 50, 150)
-        edge_density = float(np.mean(edges > 0))
+        edge_density = cv2.countNonZero(edges) / edges.size
 
         # 简易场景分类
         if mean_brightness < 60:
@@ -128,9 +158,9 @@ def _opencv_detect(file_path: Path, scenes: list[dict], conf_threshold: float) -
         else:
             scene_type = "一般场景"
 
-        results_list.append({
+        return {
             "scene_id": scene["scene_id"],
-            "frame_index": mid_frame,
+            "frame_index": mid_frame_index(scene),
             "objects": [],
             "object_count": 0,
             "scene_description": scene_type,
@@ -139,7 +169,7 @@ def _opencv_detect(file_path: Path, scenes: list[dict], conf_threshold: float) -
                 "saturation": round(mean_saturation, 1),
                 "edge_density": round(edge_density, 4),
             },
-        })
+        }
 
-    cap.release()
-    return results_list
+    # 各场景互不依赖，按场景并行解码与分析
+    return map_scenes(file_path, scenes, _scene)
@@ -10,7 +10,8 @@ import tempfile
 from pathlib import Path
 
 import cv2
-import numpy as np
+
+from ._decode import open_capture, read_frame, video_info
 
 logger = logging.getLogger("deepdistill.video_analysis.scene")
 
@@ -63,10 +64,7 @@ def detect_scenes(file_path: Path, threshold: float = 30.0) -> list[dict]:
 
     # 如果没检测到场景切换，把整个视频当一个场景
     if not scenes:
-        cap = cv2.VideoCapture(str(file_path))
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        cap.release()
+        fps, total_frames = video_info(file_path) or (30, 0)
         duration = total_frames / fps
         scenes.append({
             "scene_id": 1,
@@ -83,9 +81,10 @@ def detect_scenes(file_path: Path, threshold: float = 30.0) -> list[dict]:
 def _fallback_detect_scenes(file_path: Path, threshold: float = 30.0) -> list[dict]:
     """
     OpenCV 简易场景检测（PySceneDetect 不可用时的 fallback）。
-    基于帧间差异检测场景切换。
+    基于采样帧间差异检测场景切换：先按约 1 秒的粗步长比较，差异超过阈值时
+    再在该区间内二分到原采样粒度（sample_interval）定位切换点，无切换的区间只取样一次。
     """
-    cap = cv2.VideoCapture(str(file_path))
+    cap = open_capture(file_path)
     if not cap.isOpened():
         logger.error(f"无法打开视频: {file_path}")
         return []
@@ -94,41 +93,72 @@ def _fallback_detect_scenes(file_path: Path, threshold: float = 30.0) -> list[di
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
     scenes = []
-    prev_frame = None
     scene_start_frame = 0
     scene_id = 1
 
-    # 每隔几帧采样（加速处理）
+    # 切换点定位粒度：每秒约 5 个采样点；粗扫描步长取其整数倍（约 1 秒）
     sample_interval = max(1, int(fps / 5))
-    frame_idx = 0
+    coarse_stride = sample_interval * max(1, round(fps / sample_interval))
 
-    while True:
-        ret, frame = cap.read()
+    def _sample(idx: int):
+        ret, frame = read_frame(cap, idx)
         if not ret:
-            break
-
-        if frame_idx % sample_interval == 0:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray = cv2.resize(gray, (160, 90))  # 缩小加速
-
-            if prev_frame is not None:
-                diff = np.mean(np.abs(gray.astype(float) - prev_frame.astype(float)))
-                if diff > threshold:
-                    # 场景切换
-                    scenes.append({
-                        "scene_id": scene_id,
-                        "start_time": round(scene_start_frame / fps, 2),
-                        "end_time": round(frame_idx / fps, 2),
-                        "duration": round((frame_idx - scene_start_frame) / fps, 2),
-                        "start_frame": scene_start_frame,
-                        "end_frame": frame_idx,
-                    })
-                    scene_id += 1
-                    scene_start_frame = frame_idx
-
-            prev_frame = gray
-
-        frame_idx += 1
+            return None
+        # 先缩小再转灰度加速；uint8 上直接求差，不分配 float64 临时数组
+        return cv2.cvtColor(cv2.resize(frame, (160, 90)), cv2.COLOR_BGR2GRAY)
+
+    def _diff(a, b) -> float:
+        return cv2.mean(cv2.absdiff(a, b))[0]
+
+    def _localize(lo: int, lo_gray, hi: int, hi_gray):
+        """
+        在 (lo, hi] 内二分，找到与前一采样点差异超过阈值的采样点，返回 (帧号, 灰度图)；
+        变化是渐变（没有单点跳变）时返回 None
+        """
+        while hi - lo > sample_interval:
+            mid = lo + (hi - lo) // sample_interval // 2 * sample_interval
+            mid_gray = _sample(mid)
+            if mid_gray is None:
+                return None
+            if _diff(lo_gray, mid_gray) > threshold:
+                hi, hi_gray = mid, mid_gray
+            else:
+                lo, lo_gray = mid, mid_gray
+        return (hi, hi_gray) if _diff(lo_gray, hi_gray) > threshold else None
+
+    prev_idx, prev_gray = 0, _sample(0)
+    idx = coarse_stride
+    while prev_gray is not None:
+        gray = _sample(idx)
+        if gray is None:
+            # 末尾不足一个粗步长的部分：退到最后一个采样点再比较一次
+            last = (total_frames - 1) // sample_interval * sample_interval
+            if not prev_idx < last < idx:
+                break
+            idx, gray = last, _sample(last)
+            if gray is None:
+                break
+        # 一个粗步长内可能有多次切换：定位到一个后，从切换点继续与区间终点比较
+        lo, lo_gray = prev_idx, prev_gray
+        while lo < idx and _diff(lo_gray, gray) > threshold:
+            found = _localize(lo, lo_gray, idx, gray)
+            if found is None:
+                break
+            cut, lo_gray = found
+            lo = cut
+            # 场景切换
+            scenes.append({
+                "scene_id": scene_id,
+                "start_time": round(scene_start_frame / fps, 2),
+                "end_time": round(cut / fps, 2),
+                "duration": round((cut - scene_start_frame) / fps, 2),
+                "start_frame": scene_start_frame,
+                "end_frame": cut,
+            })
+            scene_id += 1
+            scene_start_frame = cut
+        prev_idx, prev_gray = idx, gray
+        idx += coarse_stride
 
     # 最后一个场景
     if scene_start_frame < total_frames:
@@ -145,6 +175,35 @@ def _fallback_detect_scenes(file_path: Path, threshold: float = 30.0) -> list[di
     return scenes
 
 
+def extract_keyframe_array(file_path: Path, scenes: list[dict], max_mb: int | None = None) -> dict:
+    """
+    把各场景关键帧（中间帧）解码到内存，返回 {scene_id: BGR ndarray}，供物体/动作/拍摄手法分析共用，
+    免去每个分析器各自 seek + 解码同一批帧。总大小超过 max_mb（默认 cfg.VIDEO_KEYFRAME_CACHE_MB）后
+    不再缓存，缺失的场景由各分析器自行读取。
+    """
+    import threading
+
+    from ..config import cfg
+    from ._decode import map_scenes, mid_frame_index
+
+    budget = (cfg.VIDEO_KEYFRAME_CACHE_MB if max_mb is None else max_mb) * 1024 * 1024
+    used = 0
+    lock = threading.Lock()
+
+    def _scene(scene: dict, cap) -> tuple[int, object] | None:
+        nonlocal used
+        ret, frame = read_frame(cap, mid_frame_index(scene))
+        if not ret:
+            return None
+        with lock:
+            if used + frame.nbytes > budget:
+                return None
+            used += frame.nbytes
+        return scene["scene_id"], frame
+
+    return dict(map_scenes(file_path, scenes, _scene))
+
+
 def extract_keyframes(file_path: Path, scenes: list[dict], output_dir: Path | None = None) -> list[str]:
     """
     从每个场景中提取关键帧（中间帧）。
@@ -157,13 +216,12 @@ def extract_keyframes(file_path: Path, scenes: list[dict], output_dir: Path | No
         output_dir = cfg.DATA_DIR / "output" / "keyframes" / f"kf_{file_path.stem}"
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    cap = cv2.VideoCapture(str(file_path))
+    cap = open_capture(file_path)
     keyframe_paths = []
 
     for scene in scenes:
         mid_frame = (scene["start_frame"] + scene["end_frame"]) // 2
-        cap.set(cv2.CAP_PROP_POS_FRAMES, mid_frame)
-        ret, frame = cap.read()
+        ret, frame = read_frame(cap, mid_frame)
         if ret:
             path = output_dir / f"scene_{scene['scene_id']:03d}.jpg"
             cv2.imwrite(str(path), frame)
@@ -7,11 +7,14 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import cv2
 import numpy as np
 
+from ._decode import open_capture, read_frame
+
 logger = logging.getLogger("deepdistill.video_analysis.style")
 
 
@@ -29,7 +32,9 @@ def analyze_style(file_path: Path, scenes: list[dict]) -> dict:
             "summary": str,
         }
     """
-    cap = cv2.VideoCapture(str(file_path))
+    from ..config import cfg
+
+    cap = open_capture(file_path)
     if not cap.isOpened():
         return {"summary": "无法打开视频"}
 
@@ -39,39 +44,35 @@ def analyze_style(file_path: Path, scenes: list[dict]) -> dict:
     # 采样帧（均匀采样 + 场景关键帧）
     sample_frames = _get_sample_frames(scenes, total_frames, max_samples=20)
 
+    all_color_bins = []
     all_colors = []
     all_brightness = []
     all_contrast = []
     all_saturation = []
     all_edge_density = []
 
-    for frame_idx in sample_frames:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        if not ret:
-            continue
-
-        # 色彩分析
-        colors = _extract_dominant_colors(frame, k=3)
-        all_colors.extend(colors)
-
-        # 光影分析
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        h, s, v = cv2.split(hsv)
-
-        all_brightness.append(float(np.mean(v)))
-        all_contrast.append(float(np.std(v)))
-        all_saturation.append(float(np.mean(s)))
-
-        # 视觉复杂度
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
-        all_edge_density.append(float(np.mean(edges > 0)))
-
-    cap.release()
+    # 解码按帧号顺序进行（VideoCapture 非线程安全）；各帧的特征提取相互独立，OpenCV 调用释放 GIL，
+    # 边解码边提交到线程池，解码与特征计算重叠，已处理的帧随即释放
+    with ThreadPoolExecutor(max_workers=max(1, cfg.VIDEO_WORKERS), thread_name_prefix="video-style") as executor:
+        futures = []
+        for frame_idx in sample_frames:
+            ret, frame = read_frame(cap, frame_idx)
+            if not ret:
+                continue
+            futures.append(executor.submit(_frame_features, frame))
+        cap.release()
+
+        for future in futures:
+            color_bins, colors, brightness, contrast, saturation, edge_density = future.result()
+            all_color_bins.append(color_bins)
+            all_colors.extend(colors)
+            all_brightness.append(brightness)
+            all_contrast.append(contrast)
+            all_saturation.append(saturation)
+            all_edge_density.append(edge_density)
 
     # --- 色彩分析 ---
-    color_palette = _analyze_color_palette(all_colors, all_saturation)
+    color_palette = _analyze_color_palette(all_colors, all_saturation, all_color_bins)
 
     # --- 光影分析 ---
     lighting = _analyze_lighting(all_brightness, all_contrast)
@@ -102,6 +103,42 @@ def analyze_style(file_path: Path, scenes: list[dict]) -> dict:
     }
 
 
+def _frame_features(frame: np.ndarray) -> tuple[tuple, list[list[int]], float, float, float, float]:
+    """
+    单帧风格特征：(主色调桶, 主色调, 亮度, 对比度, 饱和度, 边缘密度)。
+    光影与复杂度统计在缩小到 ANALYSIS_MAX_SIDE 的图上计算：均值/标准差对缩放不敏感，
+    1080p 以上的帧要遍历的像素少一个数量级。
+    """
+    # 色彩分析
+    color_bins = _dominant_color_bins(frame, k=3)
+    colors = _bins_to_rgb(color_bins[1], color_bins[2])
+
+    h, w = frame.shape[:2]
+    scale = ANALYSIS_MAX_SIDE / max(h, w)
+    if scale < 1:
+        frame = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+
+    # 光影分析：只需 HSV 的 V（= max(B, G, R)）与 S（= (max - min) / max），直接由通道最值求得，
+    # 省去整幅 HSV 转换中最耗时的色相计算；数值与 COLOR_BGR2HSV 一致（S 仅舍入差异）
+    blue, green, red = cv2.split(frame)
+    value = cv2.max(cv2.max(blue, green), red)
+    saturation = cv2.divide(cv2.subtract(value, cv2.min(cv2.min(blue, green), red)), value, scale=255)
+    mean, std = cv2.meanStdDev(value)
+
+    # 视觉复杂度：只需边缘像素占比，用 Sobel 梯度幅值阈值代替 Canny（省去非极大值抑制与滞后阈值两步串行处理）。
+    # 边缘不细化为单像素宽，密度约为 Canny 的 2 倍，除以 SOBEL_EDGE_DENSITY_RATIO 换算回 Canny 口径，
+    # 视觉冲击力评分与风格向量的边缘密度维度保持原有含义
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    magnitude = cv2.add(
+        cv2.convertScaleAbs(cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3)),
+        cv2.convertScaleAbs(cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3)),
+    )
+    edges = cv2.threshold(magnitude, EDGE_GRADIENT_THRESHOLD, 255, cv2.THRESH_BINARY)[1]
+    edge_density = cv2.countNonZero(edges) / edges.size / SOBEL_EDGE_DENSITY_RATIO
+
+    return color_bins, colors, float(mean[0, 0]), float(std[0, 0]), cv2.mean(saturation)[0], edge_density
+
+
 def _get_sample_frames(scenes: list[dict], total_frames: int, max_samples: int = 20) -> list[int]:
     """获取采样帧列表"""
     frames = set()
@@ -120,41 +157,64 @@ def _get_sample_frames(scenes: list[dict], total_frames: int, max_samples: int =
     return sorted(frames)[:max_samples]
 
 
-def _extract_dominant_colors(frame: np.ndarray, k: int = 3) -> list[list[int]]:
-    """使用 K-Means 提取主色调"""
-    small = cv2.resize(frame, (64, 64))
-    pixels = small.reshape(-1, 3).astype(np.float32)
+# 光影/复杂度统计前把采样帧缩小到的最长边
+ANALYSIS_MAX_SIDE = 640
+# 边缘像素判定阈值：3x3 Sobel 梯度 |gx| + |gy|（与 Canny L1 梯度同一量纲，取其高阈值 150）
+EDGE_GRADIENT_THRESHOLD = 150
+# Sobel 阈值边缘密度与 Canny 边缘密度之比（边缘未细化），用于换算回 Canny 口径
+SOBEL_EDGE_DENSITY_RATIO = 2.0
+# 主色调直方图：每通道 4 bit，共 4096 个颜色桶
+COLOR_BINS = 4096
+
+
+def _dominant_color_bins(frame: np.ndarray, k: int = 3) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    每通道量化到 4 bit 做颜色直方图，返回像素最多的 k 个桶：(桶号, 像素数, 桶内像素 B/G/R 之和)，按像素数降序。
+    一次 bincount 代替 K-Means 的多轮迭代与重启，结果也不随随机初始化变化。
+    """
+    small = cv2.resize(frame, (64, 64)).reshape(-1, 3)
+    q = (small >> 4).astype(np.uint16)
+    bins = (q[:, 0] << 8) | (q[:, 1] << 4) | q[:, 2]
+    counts = np.bincount(bins, minlength=COLOR_BINS)
 
-    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
-    _, labels, centers = cv2.kmeans(pixels, k, None, criteria, 3, cv2.KMEANS_RANDOM_CENTERS)
+    top = np.argsort(-counts, kind="stable")[:k]
+    top = top[counts[top] > 0]
+    sums = np.stack([np.bincount(bins, weights=small[:, c], minlength=COLOR_BINS)[top] for c in range(3)], axis=1)
+    return top, counts[top], sums
 
-    # 按出现频率排序
-    counts = np.bincount(labels.flatten())
-    sorted_idx = np.argsort(-counts)
 
-    colors = []
-    for idx in sorted_idx:
-        bgr = centers[idx].astype(int).tolist()
-        # BGR -> RGB
-        colors.append([bgr[2], bgr[1], bgr[0]])
+def _bins_to_rgb(counts: np.ndarray, sums: np.ndarray) -> list[list[int]]:
+    """由桶内像素数与 B/G/R 之和得到各桶的平均颜色（RGB）"""
+    means = sums / counts[:, None]
+    # BGR -> RGB
+    return [[int(r), int(g), int(b)] for b, g, r in means]
 
-    return colors
+
+def _extract_dominant_colors(frame: np.ndarray, k: int = 3) -> list[list[int]]:
+    """提取主色调（RGB，按出现频率降序；颜色取桶内像素均值）"""
+    _, counts, sums = _dominant_color_bins(frame, k)
+    return _bins_to_rgb(counts, sums)
 
 
-def _analyze_color_palette(all_colors: list, all_saturation: list) -> dict:
-    """分析色彩风格"""
+def _analyze_color_palette(all_colors: list, all_saturation: list, all_color_bins: list) -> dict:
+    """
+    分析色彩风格。
+    all_color_bins 为各采样帧的主色调桶 (桶号, 像素数, B/G/R 之和)：按桶号累加后取像素最多的 5 个桶作为整体主色。
+    """
     if not all_colors:
         return {"dominant_colors": [], "color_temperature": "未知", "saturation_level": "未知"}
 
-    # 取出现最多的 5 种颜色
-    # 简化：取所有采样颜色的聚类中心
+    # 取出现最多的 5 种颜色：各帧主色调桶按像素数合并
+    bins = np.concatenate([b for b, _, _ in all_color_bins])
+    counts = np.zeros(COLOR_BINS, dtype=np.int64)
+    sums = np.zeros((COLOR_BINS, 3))
+    np.add.at(counts, bins, np.concatenate([c for _, c, _ in all_color_bins]))
+    np.add.at(sums, bins, np.concatenate([s for _, _, s in all_color_bins]))
+    top = np.argsort(-counts, kind="stable")[:5]
+    top = top[counts[top] > 0]
+    dominant = _bins_to_rgb(counts[top], sums[top])
+
     colors_arr = np.array(all_colors, dtype=np.float32)
-    if len(colors_arr) > 5:
-        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
-        _, _, centers = cv2.kmeans(colors_arr, 5, None, criteria, 3, cv2.KMEANS_RANDOM_CENTERS)
-        dominant = centers.astype(int).tolist()
-    else:
-        dominant = colors_arr.astype(int).tolist()
 
     # 色温判断（基于 RGB 平均值）
     avg_color = np.mean(colors_arr, axis=0)
@@ -12,6 +12,8 @@ from pathlib import Path
 import cv2
 import numpy as np
 
+from ._decode import open_capture, read_frame
+
 logger = logging.getLogger("deepdistill.video_analysis.transition")
 
 
@@ -34,12 +36,16 @@ def detect_transitions(file_path: Path, scenes: list[dict]) -> list[dict]:
     if len(scenes) < 2:
         return []
 
-    cap = cv2.VideoCapture(str(file_path))
+    cap = open_capture(file_path)
     if not cap.isOpened():
         return []
 
     fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     transitions = []
+    # 帧号 → 80x45 灰度缩略图（读取失败为 None）：相邻转场窗口重叠处、擦除检测都复用，不再重复 seek/解码；
+    # 每张仅约 3.6KB，整段视频的采样帧全部保留也很小
+    gray_cache: dict[int, np.ndarray | None] = {}
 
     for i in range(len(scenes) - 1):
         current_scene = scenes[i]
@@ -47,13 +53,10 @@ def detect_transitions(file_path: Path, scenes: list[dict]) -> list[dict]:
 
         # 分析转场区域（当前场景末尾 ~ 下一场景开头）
         transition_start = max(0, current_scene["end_frame"] - int(fps * 1.5))
-        transition_end = min(
-            int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
-            next_scene["start_frame"] + int(fps * 1.5)
-        )
+        transition_end = min(total_frames, next_scene["start_frame"] + int(fps * 1.5))
 
         transition_info = _analyze_transition_region(
-            cap, transition_start, transition_end, fps
+            cap, transition_start, transition_end, fps, gray_cache
         )
 
         transitions.append({
@@ -69,8 +72,16 @@ def detect_transitions(file_path: Path, scenes: list[dict]) -> list[dict]:
     return transitions
 
 
+def _small_gray(cap: cv2.VideoCapture, frame_index: int, cache: dict) -> np.ndarray | None:
+    """读取一帧的 80x45 灰度缩略图，结果按帧号缓存"""
+    if frame_index not in cache:
+        ret, frame = read_frame(cap, frame_index)
+        cache[frame_index] = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (80, 45)) if ret else None
+    return cache[frame_index]
+
+
 def _analyze_transition_region(
-    cap: cv2.VideoCapture, start_frame: int, end_frame: int, fps: float
+    cap: cv2.VideoCapture, start_frame: int, end_frame: int, fps: float, cache: dict | None = None
 ) -> dict:
     """
     分析转场区域的帧间变化模式，判断转场类型。
@@ -80,50 +91,39 @@ def _analyze_transition_region(
     - 淡入淡出 (fade): 亮度渐变到黑/白再恢复
     - 溶解 (dissolve): 帧间差异缓慢持续变化
     - 擦除 (wipe): 差异区域从一侧向另一侧扩展
+    cache 为帧号 → 灰度缩略图的缓存（见 _small_gray），擦除检测复用其中已采样的帧。
     """
+    if cache is None:
+        cache = {}
     frame_count = end_frame - start_frame
     if frame_count < 3:
         return {"type": "硬切", "duration": 0.0, "confidence": 0.8}
 
     # 采样帧（每隔几帧取一次）
     sample_interval = max(1, frame_count // 20)
-    brightness_values = []
-    diff_values = []
-    prev_gray = None
-
-    for f in range(start_frame, end_frame, sample_interval):
-        cap.set(cv2.CAP_PROP_POS_FRAMES, f)
-        ret, frame = cap.read()
-        if not ret:
-            continue
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        small = cv2.resize(gray, (80, 45))
-
-        brightness_values.append(float(np.mean(small)))
-
-        if prev_gray is not None:
-            diff = float(np.mean(np.abs(small.astype(float) - prev_gray.astype(float))))
-            diff_values.append(diff)
-
-        prev_gray = small
-
-    if not diff_values:
+    smalls = [_small_gray(cap, f, cache) for f in range(start_frame, end_frame, sample_interval)]
+    smalls = [small for small in smalls if small is not None]
+    if len(smalls) < 2:
         return {"type": "硬切", "duration": 0.0, "confidence": 0.5}
 
+    # 采样帧叠成 (N, 45, 80) 一次性求亮度与相邻帧差（int16 避免 uint8 相减回绕）
+    stack = np.stack(smalls).astype(np.int16)
+    brightness_values = stack.mean(axis=(1, 2))
+    diff_values = np.abs(np.diff(stack, axis=0)).mean(axis=(1, 2))
+
     # --- 判断转场类型 ---
 
-    max_diff = max(diff_values)
-    avg_diff = np.mean(diff_values)
-    diff_std = np.std(diff_values)
+    max_diff = diff_values.max()
+    avg_diff = diff_values.mean()
+    diff_std = diff_values.std()
 
     # 检查亮度是否经过极低值（淡入淡出特征）
-    min_brightness = min(brightness_values) if brightness_values else 128
-    max_brightness = max(brightness_values) if brightness_values else 128
+    min_brightness = brightness_values.min()
+    max_brightness = brightness_values.max()
     brightness_range = max_brightness - min_brightness
 
     # 硬切：差异集中在一个点
-    high_diff_count = sum(1 for d in diff_values if d > avg_diff * 2)
+    high_diff_count = int(np.count_nonzero(diff_values > avg_diff * 2))
 
     if high_diff_count <= 2 and max_diff > 20:
         # 差异突然跳变 = 硬切
@@ -140,7 +140,7 @@ def _analyze_transition_region(
         return {"type": "溶解", "duration": duration, "confidence": 0.70}
 
     # 检查擦除（差异区域是否有方向性）
-    wipe_detected = _check_wipe_pattern(cap, start_frame, end_frame, sample_interval)
+    wipe_detected = _check_wipe_pattern(cap, start_frame, end_frame, sample_interval, cache)
     if wipe_detected:
         duration = frame_count / fps
         return {"type": "擦除", "duration": duration, "confidence": 0.65}
@@ -150,49 +150,45 @@ def _analyze_transition_region(
 
 
 def _check_wipe_pattern(
-    cap: cv2.VideoCapture, start_frame: int, end_frame: int, sample_interval: int
+    cap: cv2.VideoCapture, start_frame: int, end_frame: int, sample_interval: int, cache: dict | None = None
 ) -> bool:
     """
     检查是否存在擦除转场模式。
     擦除特征：差异区域从一侧向另一侧扩展。
+    检查点对齐到转场区域的采样网格（start_frame + k·sample_interval），直接复用区域分析时缓存的帧。
     """
+    if cache is None:
+        cache = {}
     frame_count = end_frame - start_frame
     if frame_count < 6:
         return False
 
-    # 取转场区域的前中后三帧
+    # 取转场区域的前中后三帧（对齐到最近的采样点）
     frames_to_check = [
-        start_frame + frame_count // 4,
-        start_frame + frame_count // 2,
-        start_frame + 3 * frame_count // 4,
+        start_frame + round(offset / sample_interval) * sample_interval
+        for offset in (frame_count // 4, frame_count // 2, 3 * frame_count // 4)
     ]
 
     # 获取第一帧作为参考
-    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-    ret, ref_frame = cap.read()
-    if not ret:
+    ref_gray = _small_gray(cap, start_frame, cache)
+    if ref_gray is None:
         return False
-    ref_gray = cv2.resize(cv2.cvtColor(ref_frame, cv2.COLOR_BGR2GRAY), (80, 45))
 
     # 检查差异区域的重心是否有方向性移动
     centroids = []
     for f in frames_to_check:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, f)
-        ret, frame = cap.read()
-        if not ret:
+        gray = _small_gray(cap, f, cache)
+        if gray is None:
             continue
 
-        gray = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (80, 45))
-        diff = np.abs(gray.astype(float) - ref_gray.astype(float))
-
-        # 差异区域的重心
-        threshold = np.mean(diff) + np.std(diff)
-        mask = diff > threshold
-        if np.any(mask):
-            y_coords, x_coords = np.where(mask)
-            cx = float(np.mean(x_coords))
-            cy = float(np.mean(y_coords))
-            centroids.append((cx, cy))
+        diff = cv2.absdiff(gray, ref_gray)
+
+        # 差异区域的重心：由二值图的一阶矩求得，不生成坐标数组
+        mean, std = cv2.meanStdDev(diff)
+        mask = cv2.threshold(diff, float(mean[0, 0] + std[0, 0]), 255, cv2.THRESH_BINARY)[1]
+        m = cv2.moments(mask, binaryImage=True)
+        if m["m00"] > 0:
+            centroids.append((m["m10"] / m["m00"], m["m01"] / m["m00"]))
 
     if len(centroids) < 2:
         return False
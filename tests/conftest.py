@@ -16,3 +16,5 @@ sys.path.insert(0, str(project_root))
 # 设置测试环境变量（避免连接真实服务）
 os.environ.setdefault("DEEPSEEK_API_KEY", "test-key-not-real")
 os.environ.setdefault("QWEN_API_KEY", "test-key-not-real")
+# 关闭结果磁盘缓存，避免测试读到/写入真实缓存目录
+os.environ.setdefault("DEEPDISTILL_RESULT_CACHE", "0")
@@ -3,25 +3,29 @@
 覆盖各种 AI 分析结果场景下的标题生成
 """
 
+import re
+
 import pytest
 
 from deepdistill.export.google_docs import GoogleDocsExporter
 
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
 
 class TestGenerateShortTitle:
     """中文短标题生成测试"""
 
     def _make_task(self, summary="", key_points=None, keywords=None,
                    filename="test.txt", source_url=""):
-        """构造测试用 task 字典"""
+        """构造测试用 task 字典（_generate_short_title 只读取要点/关键词，缺省用空元组，不分配列表）"""
         return {
             "filename": filename,
             "source_url": source_url,
             "result": {
                 "ai_result": {
                     "summary": summary,
-                    "key_points": key_points or [],
-                    "keywords": keywords or [],
+                    "key_points": key_points or (),
+                    "keywords": keywords or (),
                 },
             },
         }
@@ -48,8 +52,7 @@ class TestGenerateShortTitle:
         title = GoogleDocsExporter._generate_short_title(task)
         assert len(title) <= 8
         # 应包含中文，不应以英文开头
-        import re
-        assert re.search(r'[\u4e00-\u9fff]', title), f"标题应包含中文: {title}"
+        assert _CJK_RE.search(title), f"标题应包含中文: {title}"
 
     def test_summary_truncate_at_virtual_word(self):
         """应在虚词（和/与/的）处优先截断"""
@@ -0,0 +1,138 @@
+"""
+导出上传测试：验证后台上传线程池的提交、去重与结果顺序
+不连接真实 Google Drive，上传函数均以本地桩函数替换
+"""
+
+import threading
+import time
+
+from deepdistill.export.google_docs import GoogleDocsExporter
+
+
+def _make_exporter():
+    exporter = GoogleDocsExporter("missing_credentials.json", "missing_token.json")
+    exporter._ensure_subfolder = lambda category: "folder-id"
+    return exporter
+
+
+class TestSubmitUpload:
+    """后台上传提交测试"""
+
+    def test_same_content_reuses_pending_future(self):
+        """同目录同名且内容相同的文件上传中时，重复提交应复用同一个 Future；内容不同则各自上传"""
+        from deepdistill.export.google_docs import _content_key
+
+        release = threading.Event()
+
+        def slow_upload(doc_id):
+            release.wait(timeout=5)
+            return {"doc_id": doc_id}
+
+        key_a = _content_key("# 内容 A", "text/markdown")
+        key_b = _content_key("# 内容 B", "text/markdown")
+        f1 = GoogleDocsExporter._submit_upload("其他", "重复标题", key_a, slow_upload, "1")
+        f2 = GoogleDocsExporter._submit_upload("其他", "重复标题", key_a, slow_upload, "1")
+        f3 = GoogleDocsExporter._submit_upload("其他", "重复标题", key_b, slow_upload, "2")
+        assert f1 is f2
+        assert f3 is not f1
+        release.set()
+        assert f1.result(timeout=5) == {"doc_id": "1"}
+        assert f3.result(timeout=5) == {"doc_id": "2"}
+
+    def test_export_task_result_keeps_order(self):
+        """并发上传后返回顺序仍为 doc → skill → 源文件"""
+        exporter = _make_exporter()
+
+        def fake_export_markdown(md_content, title, category=None):
+            # skill 文档先完成，验证结果不按完成顺序排列
+            time.sleep(0.05 if "[SKILL]" in title else 0.1)
+            return {"title": title, "category": category}
+
+        exporter.export_markdown = fake_export_markdown
+        task = {
+            "filename": "a.pdf",
+            "result": {
+                "extracted_text": "原始文本",
+                "ai_result": {"summary": "加密货币市场波动", "keywords": ["比特币"]},
+            },
+        }
+        results = exporter.export_task_result(task, category="市场分析", fmt="both")
+        assert [r["title"] for r in results] == [
+            "加密货币市场波动", "加密货币市场波动 [SKILL]", "加密货币市场波动 [源文件]",
+        ]
+        assert results[-1]["is_raw"] is True
+        assert all(r["category"] == "市场分析" for r in results)
+
+
+class TestRetryWait:
+    """重试退避测试"""
+
+    class _FakeResp(dict):
+        def __init__(self, status, headers=None):
+            super().__init__(headers or {})
+            self.status = status
+
+    class _FakeHttpError(Exception):
+        def __init__(self, resp):
+            super().__init__("http error")
+            self.resp = resp
+
+    def test_jitter_within_cap(self):
+        """普通错误的等待时间应落在 [0, 指数退避上限] 内"""
+        from deepdistill.export.google_docs import GDRIVE_RETRY_DELAY, _retry_wait
+
+        for attempt in range(3):
+            wait = _retry_wait(attempt, RuntimeError("boom"))
+            assert 0 <= wait <= GDRIVE_RETRY_DELAY * (2 ** attempt)
+
+    def test_honor_retry_after(self):
+        """429 带 Retry-After 时应按服务端要求等待"""
+        from deepdistill.export.google_docs import _retry_wait
+
+        err = self._FakeHttpError(self._FakeResp(429, {"retry-after": "7"}))
+        assert _retry_wait(0, err) == 7.0
+
+
+class TestBufPool:
+    """上传缓冲区池测试"""
+
+    def test_file_semantics(self):
+        """写入、seek、截断与读取应与 BytesIO 一致"""
+        from deepdistill.export import bufpool
+
+        with bufpool.acquire(16) as buf:
+            buf.write(b"hello world")
+            buf.seek(0)
+            assert buf.read(5) == b"hello"
+            buf.seek(0, 2)
+            assert buf.tell() == 11
+            buf.truncate(5)
+            buf.seek(0)
+            assert buf.read() == b"hello"
+
+    def test_release_returns_slab(self):
+        """归还后同一分级的下一次申请应复用同一内存块"""
+        from deepdistill.export import bufpool
+
+        buf = bufpool.acquire(1000)
+        slab = buf._slab
+        buf.release()
+        buf.release()  # 重复归还无副作用
+        reused = bufpool.acquire(1000)
+        assert reused._slab is slab
+        assert reused.tell() == 0 and reused.read() == b""
+        reused.release()
+
+    def test_grow_beyond_capacity(self):
+        """写入超过容量时应自动扩容，且扩容后的内存块不再入池"""
+        from deepdistill.export import bufpool
+
+        buf = bufpool.acquire(1)
+        data = b"x" * (bufpool.SIZE_CLASSES[0] + 10)
+        buf.write(data)
+        assert buf.getvalue() == data
+        slab = buf._slab
+        buf.release()
+        again = bufpool.acquire(1)
+        assert again._slab is not slab
+        again.release()
@@ -8,15 +8,24 @@ import tempfile
 from pathlib import Path
 
 
+def test_formatters_importable():
+    """Markdown / JSON / Skill 格式化函数均应可导入"""
+    from deepdistill.fusion.formatters.json_fmt import format_json
+    from deepdistill.fusion.formatters.markdown import format_markdown
+    from deepdistill.fusion.formatters.skill_fmt import format_skill
+    assert all(map(callable, (format_markdown, format_json, format_skill)))
+
+
 class TestMarkdownFormatter:
     """Markdown 格式化测试"""
 
-    def test_import(self):
-        """format_markdown 函数应可导入"""
-        from deepdistill.fusion.formatters.markdown import format_markdown
-        assert callable(format_markdown)
+    @pytest.fixture(scope="class")
+    @classmethod
+    def shared_tmpdir(cls, tmp_path_factory) -> Path:
+        """本类各测试共用的输出目录（只创建一次）"""
+        return tmp_path_factory.mktemp("markdown")
 
-    def test_format_basic(self):
+    def test_format_basic(self, shared_tmpdir):
         """基本格式化应生成有效 Markdown 文件"""
         from deepdistill.fusion.formatters.markdown import format_markdown
         from deepdistill.pipeline import ProcessingResult
@@ -33,30 +42,286 @@ class TestMarkdownFormatter:
             "keywords": ["测试", "摘要"],
         }
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_path = format_markdown(result, Path(tmpdir))
-            assert output_path is not None
-            # 输出文件应存在
-            if isinstance(output_path, str):
-                p = Path(output_path)
-                if p.exists():
-                    content = p.read_text(encoding="utf-8")
-                    assert len(content) > 0
+        output_path = format_markdown(result, shared_tmpdir)
+        assert output_path is not None
+        # 输出文件应存在
+        if isinstance(output_path, str):
+            p = Path(output_path)
+            if p.exists():
+                content = p.read_text(encoding="utf-8")
+                assert len(content) > 0
 
 
 class TestJsonFormatter:
     """JSON 格式化测试"""
 
-    def test_import(self):
-        """format_json 函数应可导入"""
+    def test_format_roundtrip(self):
+        """输出文件应为合法 UTF-8 JSON，中文不转义"""
+        import json
+
         from deepdistill.fusion.formatters.json_fmt import format_json
-        assert callable(format_json)
+        from deepdistill.pipeline import ProcessingResult
+
+        result = ProcessingResult(
+            source_path="test.txt",
+            source_type="document",
+            filename="test.txt",
+            extracted_text="测试文本内容",
+        )
+        result.ai_result = {"summary": "这是测试摘要", "key_points": ["要点一"]}
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_path = Path(format_json(result, Path(tmpdir)))
+            raw = output_path.read_text(encoding="utf-8")
+            assert "这是测试摘要" in raw
+            data = json.loads(raw)
+            assert data["source"]["filename"] == "test.txt"
+            assert data["ai_analysis"]["key_points"] == ["要点一"]
+
+    def test_format_numpy_values(self, monkeypatch, tmp_path):
+        """
+        视频分析结果中的 NumPy 标量/数组应按 Python 数值输出（orjson 与标准库 json 两条路径）。
+        两条路径的浮点数文本写法可能不同（orjson 写 1e20，json 写 1e+20），解析后的数值一致
+        """
+        import json
+
+        import numpy as np
+
+        from deepdistill.fusion.formatters import json_fmt
+        from deepdistill.pipeline import ProcessingResult
+
+        result = ProcessingResult(source_path="v.mp4", source_type="video", filename="v.mp4")
+        result.video_analysis = {
+            "style": {"visual_impact": {"score": np.float64(0.625)}, "dominant_bins": np.arange(3, dtype=np.uint8)},
+            "scenes": [{"scene_id": np.int64(1), "duration": np.float32(1.5)}],
+            "extremes": [1e20, 1e-7],
+        }
+        expected = {
+            "style": {"visual_impact": {"score": 0.625}, "dominant_bins": [0, 1, 2]},
+            "scenes": [{"scene_id": 1, "duration": 1.5}],
+            "extremes": [1e20, 1e-7],
+        }
+        for orjson in (json_fmt.orjson, None):
+            monkeypatch.setattr(json_fmt, "orjson", orjson)
+            output_path = Path(json_fmt.format_json(result, tmp_path))
+            data = json.loads(output_path.read_text(encoding="utf-8"))
+            assert data["video_analysis"] == expected
+
+
+class TestFusionProcessor:
+    """融合处理器测试：去重 / 合并 / 补全"""
+
+    def test_text_similarity(self):
+        """相同文本相似度为 1，无共同 2-gram 为 0，忽略大小写与标点"""
+        from deepdistill.fusion.processor import _text_similarity
+
+        assert _text_similarity("比特币价格上涨", "比特币价格上涨") == 1.0
+        assert _text_similarity("比特币", "以太坊") == 0.0
+        assert _text_similarity("Hello World", "hello, world!") == 1.0
+        assert _text_similarity("", "任意文本") == 0.0
+
+    def test_deduplicate_points_and_keywords(self):
+        """高度相似的要点与大小写不同的关键词应被去重"""
+        from deepdistill.fusion.processor import process_fusion
+
+        result = process_fusion(
+            ai_result={
+                "summary": "摘要",
+                "key_points": ["比特币价格大幅上涨", "比特币价格大幅上涨！", "  ", "以太坊升级完成"],
+                "keywords": ["Bitcoin", "bitcoin ", "以太坊", ""],
+            },
+            extracted_text="",
+        )
+        assert result["key_points"] == ["比特币价格大幅上涨", "以太坊升级完成"]
+        assert result["keywords"] == ["Bitcoin", "以太坊"]
+
+    def test_merge_similar_points_keeps_longest(self):
+        """相似度 0.4-0.7 的要点合并为一条，保留最长的"""
+        from deepdistill.fusion.processor import process_fusion
+
+        result = process_fusion(
+            ai_result={
+                "summary": "摘要",
+                "key_points": ["比特币价格上涨", "比特币价格上涨带动市场", "以太坊升级完成"],
+            },
+            extracted_text="",
+        )
+        assert result["key_points"] == ["比特币价格上涨带动市场", "以太坊升级完成"]
+
+    def test_complete_missing_fields(self):
+        """缺失字段应从原文补全"""
+        from deepdistill.fusion.processor import process_fusion
+
+        text = "第一句话内容足够长需要保留。短句。第二句话内容也足够长需要保留！"
+        result = process_fusion(ai_result={"keywords": ["测试"]}, extracted_text=text)
+        assert result["summary"] == text
+        assert result["key_points"] == ["第一句话内容足够长需要保留", "第二句话内容也足够长需要保留"]
+        assert result["structure"] == {"type": "未分类", "sections": []}
+
+    def test_enhance_with_video(self):
+        """视频分析结果应补充结构章节与物体关键词"""
+        from deepdistill.fusion.processor import process_fusion
+
+        result = process_fusion(
+            ai_result={"summary": "摘要", "key_points": ["要点内容"], "keywords": ["person"]},
+            extracted_text="",
+            video_analysis={
+                "style": {"summary": "暖色调"},
+                "scenes": [{"duration": 1.25}, {"duration": 2.5}],
+                "objects": [{"objects": [{"label": "Person"}, {"label": "car"}]}],
+                "cinematography": {"summary": "固定机位"},
+            },
+        )
+        headings = [s["heading"] for s in result["structure"]["sections"]]
+        assert headings == ["视觉风格", "视频结构", "拍摄手法"]
+        assert "总时长 3.8 秒" in result["structure"]["sections"][1]["content"]
+        assert result["keywords"] == ["person", "car"]
+
+    def test_fusion_cache_returns_independent_copy(self):
+        """相同输入命中缓存，返回结果与首次一致且互不影响"""
+        from deepdistill.fusion.processor import process_fusion
+
+        ai_result = {"summary": "缓存测试摘要", "key_points": ["缓存要点一", "缓存要点二"], "keywords": ["缓存"]}
+        first = process_fusion(ai_result=ai_result, extracted_text="原文")
+        first["keywords"].append("被修改")
+        second = process_fusion(ai_result=ai_result, extracted_text="原文")
+        assert second["keywords"] == ["缓存"]
+        assert second["key_points"] == first["key_points"]
+
+    def test_fusion_cache_hit_matches_miss_shape(self):
+        """命中缓存与未命中时返回值结构一致（元组、非字符串键不因缓存改变）"""
+        from deepdistill.fusion.processor import process_fusion
+
+        ai_result = {"summary": "结构测试摘要", "key_points": ["结构要点"], "extra": {"span": (1, 2), 3: "整数键"}}
+        first = process_fusion(ai_result=ai_result, extracted_text="原文")
+        second = process_fusion(ai_result=ai_result, extracted_text="原文")
+        assert second == first
+        assert second["extra"] == {"span": (1, 2), 3: "整数键"}
+
+
+class TestGenerateOutputsBatch:
+    """批量输出测试"""
+
+    def test_parallel_keeps_order_and_writes_back(self, monkeypatch):
+        """多进程批量输出时，路径顺序与输入一致，融合结果写回 result"""
+        import deepdistill.fusion as fusion
+        from deepdistill.pipeline import ProcessingResult
+
+        monkeypatch.setattr(fusion, "BATCH_MIN_PARALLEL", 1)
+        results = []
+        for i in range(3):
+            result = ProcessingResult(source_path=f"doc{i}.txt", source_type="document", filename=f"doc{i}.txt")
+            result.ai_result = {"summary": f"批量摘要{i}", "key_points": [" 要点 "], "keywords": ["批量", "批量"]}
+            results.append(result)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = fusion.generate_outputs_batch(results, Path(tmpdir), "json", max_workers=2)
+            assert [Path(p).name.startswith(f"doc{i}") for i, p in enumerate(paths)] == [True] * 3
+            assert all(Path(p).exists() for p in paths)
+        assert results[0].ai_result["keywords"] == ["批量"]
+        assert results[2].ai_result["key_points"] == ["要点"]
+
+
+class TestVisualBackends:
+    """图片生成后端测试：熔断与并发生成"""
+
+    def test_sd_breaker_opens_after_failures(self, monkeypatch):
+        """SD WebUI 连续探测失败达到阈值后，后续调用不再发起请求"""
+        import httpx
+
+        from deepdistill.fusion import visual_generator as vg
+
+        calls = []
+
+        def failing_get(*args, **kwargs):
+            calls.append(args)
+            raise httpx.ConnectError("refused")
+
+        class FakeClient:
+            get = staticmethod(failing_get)
+
+        monkeypatch.setattr(vg, "_http_client", lambda: FakeClient)
+        monkeypatch.setitem(vg._BREAKERS, "sd", {"state": "closed", "opened_at": 0.0, "fail_count": 0, "ok_at": 0.0})
+        prompts = [{"prompt": "p"}]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for _ in range(vg._BREAKER_FAIL_THRESHOLD + 2):
+                assert vg._try_sd_webui(prompts, Path(tmpdir)) == []
+        assert len(calls) == vg._BREAKER_FAIL_THRESHOLD
+        assert vg._BREAKERS["sd"]["state"] == "open"
+
+    def test_breaker_half_open_admits_single_trial(self, monkeypatch):
+        """冷却期过后只放行一次试探请求；只读检查不占用试探名额；试探成功后复位"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        from deepdistill.fusion import visual_generator as vg
+
+        breaker = {"state": "open", "opened_at": -1e9, "fail_count": vg._BREAKER_FAIL_THRESHOLD, "ok_at": 0.0}
+        monkeypatch.setitem(vg._BREAKERS, "dalle", breaker)
+        assert not vg._breaker_blocked("dalle")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            admitted = list(executor.map(lambda _: vg._breaker_allow("dalle"), range(8)))
+        assert admitted.count(True) == 1
+        assert breaker["state"] == "half_open" and vg._breaker_blocked("dalle")
+
+        vg._breaker_record("dalle", ok=True)
+        assert breaker["state"] == "closed" and vg._breaker_allow("dalle")
+
+    def test_sd_concurrent_keeps_prompt_order(self, monkeypatch):
+        """SD WebUI 并发生成时，返回的图片路径仍按 prompt 顺序排列"""
+        import base64
+        import time
+
+        from deepdistill.fusion import visual_generator as vg
+
+        class FakeResp:
+            status_code = 200
+
+            def __init__(self, data=None):
+                self._data = data
+
+            def json(self):
+                return self._data
+
+        class FakeClient:
+            @staticmethod
+            def get(*args, **kwargs):
+                return FakeResp()
+
+            @staticmethod
+            def post(url, json, timeout):
+                # 排在前面的 prompt 更晚完成
+                time.sleep(0.05 * (3 - int(json["prompt"])))
+                return FakeResp({"images": [base64.b64encode(b"png").decode()]})
+
+        monkeypatch.setattr(vg, "_http_client", lambda: FakeClient)
+        monkeypatch.setitem(vg._BREAKERS, "sd", {"state": "closed", "opened_at": 0.0, "fail_count": 0, "ok_at": 0.0})
+        prompts = [{"prompt": str(i)} for i in range(3)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            images = vg._try_sd_webui(prompts, Path(tmpdir))
+            assert [Path(p).name for p in images] == ["visual_1_1.png", "visual_2_1.png", "visual_3_1.png"]
+            assert Path(images[0]).read_bytes() == b"png"
+
+    def test_generate_images_skips_probe_after_recent_success(self, monkeypatch):
+        """SD 最近探测成功时不再重复请求 options；SD 无结果时回退 DALL-E"""
+        from deepdistill.fusion import visual_generator as vg
+
+        probes = []
+
+        class FakeResp:
+            status_code = 200
 
+        class FakeClient:
+            @staticmethod
+            def get(url, timeout):
+                probes.append(url)
+                return FakeResp()
 
-class TestSkillFormatter:
-    """Skill 文档格式化测试"""
+        monkeypatch.setattr(vg, "_http_client", lambda: FakeClient)
+        monkeypatch.setitem(vg._BREAKERS, "sd", {"state": "closed", "opened_at": 0.0, "fail_count": 0, "ok_at": 0.0})
+        monkeypatch.setattr(vg, "_try_sd_webui", lambda prompts, output_dir, probed=False: [])
+        monkeypatch.setattr(vg, "_probe_dalle_available", lambda: True)
+        monkeypatch.setattr(vg, "_try_dalle", lambda prompts, output_dir: ["dalle.png"])
 
-    def test_import(self):
-        """format_skill 函数应可导入"""
-        from deepdistill.fusion.formatters.skill_fmt import format_skill
-        assert callable(format_skill)
+        assert vg._try_generate_images([{"prompt": "p"}], Path(".")) == ["dalle.png"]
+        assert vg._try_generate_images([{"prompt": "p"}], Path(".")) == ["dalle.png"]
+        assert len(probes) == 1
@@ -9,58 +9,62 @@ from pathlib import Path
 from deepdistill.ingestion.router import identify_file_type, get_supported_extensions
 
 
+# 各类支持格式的 (文件路径, 期望类型)；在单个测试内遍历，避免为每个扩展名生成独立的测试项；Path 在导入时构造一次
+_SUPPORTED_CASES = (
+    # 视频
+    (Path("video.mp4"), "video"),
+    (Path("video.mov"), "video"),
+    (Path("video.avi"), "video"),
+    (Path("video.mkv"), "video"),
+    (Path("video.webm"), "video"),
+    (Path("video.flv"), "video"),
+    # 音频
+    (Path("audio.mp3"), "audio"),
+    (Path("audio.wav"), "audio"),
+    (Path("audio.m4a"), "audio"),
+    (Path("audio.flac"), "audio"),
+    (Path("audio.ogg"), "audio"),
+    (Path("audio.aac"), "audio"),
+    # 文档
+    (Path("doc.pdf"), "document"),
+    (Path("doc.docx"), "document"),
+    (Path("doc.doc"), "document"),
+    (Path("doc.pptx"), "document"),
+    (Path("doc.ppt"), "document"),
+    (Path("doc.xlsx"), "document"),
+    (Path("doc.xls"), "document"),
+    (Path("doc.txt"), "document"),
+    (Path("doc.md"), "document"),
+    # 图片
+    (Path("img.jpg"), "image"),
+    (Path("img.jpeg"), "image"),
+    (Path("img.png"), "image"),
+    (Path("img.bmp"), "image"),
+    (Path("img.tiff"), "image"),
+    (Path("img.webp"), "image"),
+    (Path("img.gif"), "image"),
+    # 网页
+    (Path("page.html"), "webpage"),
+    (Path("page.htm"), "webpage"),
+)
+
+_UNSUPPORTED_CASES = tuple(Path(name) for name in ("file.xyz", "file.exe", "file.zip", "file.tar.gz", "file"))
+
+
 class TestFileTypeIdentification:
     """文件类型识别测试"""
 
-    @pytest.mark.parametrize("filename,expected", [
-        # 视频
-        ("video.mp4", "video"),
-        ("video.mov", "video"),
-        ("video.avi", "video"),
-        ("video.mkv", "video"),
-        ("video.webm", "video"),
-        ("video.flv", "video"),
-        # 音频
-        ("audio.mp3", "audio"),
-        ("audio.wav", "audio"),
-        ("audio.m4a", "audio"),
-        ("audio.flac", "audio"),
-        ("audio.ogg", "audio"),
-        ("audio.aac", "audio"),
-        # 文档
-        ("doc.pdf", "document"),
-        ("doc.docx", "document"),
-        ("doc.doc", "document"),
-        ("doc.pptx", "document"),
-        ("doc.ppt", "document"),
-        ("doc.xlsx", "document"),
-        ("doc.xls", "document"),
-        ("doc.txt", "document"),
-        ("doc.md", "document"),
-        # 图片
-        ("img.jpg", "image"),
-        ("img.jpeg", "image"),
-        ("img.png", "image"),
-        ("img.bmp", "image"),
-        ("img.tiff", "image"),
-        ("img.webp", "image"),
-        ("img.gif", "image"),
-        # 网页
-        ("page.html", "webpage"),
-        ("page.htm", "webpage"),
-    ])
-    def test_supported_formats(self, filename: str, expected: str):
+    def test_supported_formats(self):
         """所有支持的格式应被正确识别"""
-        result = identify_file_type(Path(filename))
-        assert result == expected, f"{filename} 应识别为 {expected}，实际为 {result}"
+        for path, expected in _SUPPORTED_CASES:
+            result = identify_file_type(path)
+            assert result == expected, f"{path} 应识别为 {expected}，实际为 {result}"
 
-    @pytest.mark.parametrize("filename", [
-        "file.xyz", "file.exe", "file.zip", "file.tar.gz", "file",
-    ])
-    def test_unsupported_formats(self, filename: str):
+    def test_unsupported_formats(self):
         """不支持的格式应返回 None"""
-        result = identify_file_type(Path(filename))
-        assert result is None, f"{filename} 应返回 None，实际为 {result}"
+        for path in _UNSUPPORTED_CASES:
+            result = identify_file_type(path)
+            assert result is None, f"{path} 应返回 None，实际为 {result}"
 
     def test_case_insensitive(self):
         """扩展名应不区分大小写"""
@@ -78,3 +82,445 @@ class TestFileTypeIdentification:
         assert ".jpg" in extensions
         # 应已排序
         assert extensions == sorted(extensions)
+
+
+class TestDouyinCdnDownload:
+    """抖音 CDN 候选下载测试（不访问网络，HTTP 请求以桩函数替换）"""
+
+    class _FakeResp:
+        def __init__(self, url, status_code):
+            self.url = url
+            self.status_code = status_code
+            self.closed = False
+
+        def close(self):
+            self.closed = True
+
+    def _patch(self, monkeypatch, statuses, delays=None, dead_hosts=()):
+        import time
+
+        from deepdistill.ingestion import video_downloader as vd
+
+        requested = []
+
+        def fake_get(url, **kwargs):
+            requested.append(url)
+            time.sleep((delays or {}).get(url, 0))
+            return self._FakeResp(url, statuses.get(url, 404))
+
+        monkeypatch.setattr(vd._req_session(), "get", fake_get)
+        monkeypatch.setattr(vd, "_resolve_hosts", lambda hosts, timeout=3.0: {h: h not in dead_hosts for h in hosts})
+        return vd, requested
+
+    def test_collect_urls_ordered_unique(self):
+        """候选 URL 按来源优先级去重，空字符串和非字符串被丢弃"""
+        from deepdistill.ingestion.video_downloader import _collect_douyin_video_urls
+
+        video_obj = {
+            "play_addr": {"url_list": ["", "https://a/1", "https://b/1"]},
+            "download_addr": {"url_list": ["https://b/1", None, "https://c/1"]},
+            "bit_rate": [{"play_addr": {"url_list": ["https://a/1", "https://d/1"]}}, "bad"],
+        }
+        assert _collect_douyin_video_urls(video_obj) == ["https://a/1", "https://b/1", "https://c/1", "https://d/1"]
+
+    def test_race_returns_first_success(self, monkeypatch):
+        """多个 CDN 并发竞速，返回最先成功的响应"""
+        urls = ["https://a.cdn/play/1", "https://b.cdn/play/1", "https://c.cdn/play/1"]
+        vd, _ = self._patch(
+            monkeypatch,
+            statuses={u: 200 for u in urls},
+            delays={urls[0]: 0.3, urls[1]: 0.01, urls[2]: 0.3},
+        )
+        resp = vd._try_download_video(urls, headers={})
+        assert resp.url == urls[1]
+
+    def test_fallback_prefers_nowm_then_skips_dead_dns(self, monkeypatch):
+        """DNS 不可达的 CDN 被跳过；竞速全部失败后按优先级尝试原始（带水印）URL"""
+        urls = ["https://dead.cdn/playwm/1", "https://a.cdn/playwm/1"]
+        vd, requested = self._patch(
+            monkeypatch,
+            statuses={"https://a.cdn/playwm/1": 200},
+            dead_hosts={"dead.cdn"},
+        )
+        resp = vd._try_download_video(urls, headers={})
+        assert resp.url == "https://a.cdn/playwm/1"
+        assert requested == ["https://a.cdn/play/1", "https://a.cdn/playwm/1"]
+
+
+class TestCookieLookup:
+    """Cookie 文件查找与解析缓存测试"""
+
+    def test_new_cookie_file_visible_after_cache(self, monkeypatch, tmp_path):
+        """查找结果被缓存后，新放入的 Cookie 文件仍能被找到，修改后重新解析"""
+        import os
+
+        from deepdistill.ingestion import video_downloader as vd
+
+        monkeypatch.setattr(vd, "COOKIE_DIR", tmp_path)
+        url = "https://www.douyin.com/video/7604065517855163505"
+        assert vd._find_cookie_file(url) is None
+
+        cookie_path = tmp_path / "douyin.txt"
+        cookie_path.write_text("# Netscape\n.douyin.com\tTRUE\t/\tFALSE\t0\tsid\tv1\n", encoding="utf-8")
+        assert vd._find_cookie_file(url) == cookie_path
+        assert vd._load_cookies_as_dict(cookie_path) == {"sid": "v1"}
+
+        cookie_path.write_text(".douyin.com\tTRUE\t/\tFALSE\t0\tsid\tv2\n", encoding="utf-8")
+        st = cookie_path.stat()
+        os.utime(cookie_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert vd._load_cookies_as_dict(cookie_path) == {"sid": "v2"}
+
+    def test_parse_netscape_lines(self, tmp_path):
+        """注释、空行、字段不足的行被跳过；引号按原样保留，CRLF 换行不影响取值"""
+        from deepdistill.ingestion.video_downloader import _load_cookies_as_dict
+
+        cookie_path = tmp_path / "default.txt"
+        cookie_path.write_bytes(
+            b"# Netscape HTTP Cookie File\r\n\r\n"
+            b"#HttpOnly_.x.com\tTRUE\t/\tTRUE\t0\thidden\t1\r\n"
+            b".x.com\tTRUE\t/\n"
+            b'.x.com\tTRUE\t/\tFALSE\t0\tq\t"a b"\r\n'
+            b".x.com\tTRUE\t/\tFALSE\t0\tsid\tv1\r\n"
+        )
+        assert _load_cookies_as_dict(cookie_path) == {"q": '"a b"', "sid": "v1"}
+
+
+class TestRouterData:
+    """抖音分享页 _ROUTER_DATA 解析测试"""
+
+    def test_parse_with_embedded_script_tag(self):
+        """JSON 字符串中含 </script> 与花括号时仍能完整解析"""
+        from deepdistill.ingestion.video_downloader import _extract_router_data
+
+        html = (
+            '<script>window._ROUTER_DATA = {"loaderData": {"desc": "a } </script> b", "n": [1, {"x": "{"}]}}'
+            '</script><script>var other = {"y": 1}</script>'
+        )
+        assert _extract_router_data(html) == {"loaderData": {"desc": "a } </script> b", "n": [1, {"x": "{"}]}}
+
+    def test_parse_trailing_semicolon(self):
+        """赋值语句末尾带分号和换行时同样能解析"""
+        from deepdistill.ingestion.video_downloader import _extract_router_data
+
+        assert _extract_router_data('<script>window._ROUTER_DATA = {"a": [1]};\n</script>') == {"a": [1]}
+
+    def test_missing_router_data(self):
+        """页面中没有 _ROUTER_DATA 时抛出 RuntimeError"""
+        from deepdistill.ingestion.video_downloader import _extract_router_data
+
+        with pytest.raises(RuntimeError):
+            _extract_router_data("<html></html>")
+
+    def test_search_video_first_match_in_order(self):
+        """兜底搜索按先序返回第一个有播放地址的视频对象，超过深度上限的不再搜索"""
+        from deepdistill.ingestion.video_downloader import _search_video_in_router_data
+
+        def video(name):
+            return {"desc": name, "video": {"play_addr": {"url_list": [f"https://cdn/{name}"]}, "duration": 9}}
+
+        data = {"a": [{"desc": "无地址", "video": {}}, {"x": video("first")}], "b": video("second")}
+        assert _search_video_in_router_data(data) == (["https://cdn/first"], "first", 9)
+
+        deep = video("deep")
+        for _ in range(13):
+            deep = [deep]
+        assert _search_video_in_router_data(deep) == ([], "", 0)
+
+
+class TestResolveHosts:
+    """CDN 域名并行解析测试"""
+
+    def test_results_cached(self, monkeypatch):
+        """同一域名在缓存有效期内只解析一次"""
+        import socket
+
+        from deepdistill.ingestion import video_downloader as vd
+
+        calls = []
+
+        def fake_getaddrinfo(host, port):
+            calls.append(host)
+            if host == "dead.cdn":
+                raise socket.gaierror("not found")
+            return [("addr",)]
+
+        monkeypatch.setattr(socket, "getaddrinfo", fake_getaddrinfo)
+        monkeypatch.setattr(vd, "_dns_cache", {})
+        assert vd._resolve_hosts(["ok.cdn", "dead.cdn"]) == {"ok.cdn": True, "dead.cdn": False}
+        assert vd._resolve_hosts(["dead.cdn", "ok.cdn"]) == {"ok.cdn": True, "dead.cdn": False}
+        assert sorted(calls) == ["dead.cdn", "ok.cdn"]
+
+
+class TestVideoUrlWhitelist:
+    """视频 URL 白名单测试"""
+
+    @pytest.mark.parametrize("url,expected", [
+        ("https://www.bilibili.com/video/BV1xx411c7mD", True),
+        ("https://youtu.be/dQw4w9WgXcQ", True),
+        ("https://example.com/media/clip.MP4", True),
+        ("https://example.com/blog/post.html", False),
+        ("https://example.com/paper.pdf", False),
+        ("file:///tmp/video.mp4", False),
+    ])
+    def test_looks_like_video_url(self, url, expected):
+        from deepdistill.ingestion.video_downloader import _looks_like_video_url
+        assert _looks_like_video_url(url) is expected
+
+    def test_probe_skips_non_video_without_subprocess(self, monkeypatch):
+        """非视频平台 URL 不启动 yt-dlp（CLI 子进程与常驻工作进程都不调用）"""
+        from deepdistill.ingestion import video_downloader as vd
+
+        def fail(*args, **kwargs):
+            raise AssertionError("不应启动 yt-dlp")
+
+        monkeypatch.setattr(vd, "_run_ytdlp", fail)
+        monkeypatch.setattr(vd, "_worker_call", fail)
+        monkeypatch.setattr(vd.subprocess, "Popen", fail)
+        monkeypatch.setattr(vd, "PROBE_ANY_HOST", False)
+        assert vd.probe_video("https://example.com/news/article") is None
+
+
+class TestLatestMediaFile:
+    """yt-dlp 输出路径缺失时的兜底查找测试"""
+
+    def test_picks_newest_non_empty_media(self, tmp_path):
+        import os
+
+        from deepdistill.ingestion.video_downloader import _latest_media_file
+
+        (tmp_path / "old.mp4").write_bytes(b"1")
+        (tmp_path / "new.WEBM").write_bytes(b"2")
+        (tmp_path / "empty.mp4").write_bytes(b"")
+        (tmp_path / "notes.txt").write_bytes(b"3")
+        (tmp_path / "mp4").write_bytes(b"4")
+        os.utime(tmp_path / "old.mp4", (1, 1))
+        os.utime(tmp_path / "new.WEBM", (2, 2))
+        assert _latest_media_file(tmp_path) == tmp_path / "new.WEBM"
+
+    def test_none_when_missing(self, tmp_path):
+        from deepdistill.ingestion.video_downloader import _latest_media_file
+
+        assert _latest_media_file(tmp_path) is None
+
+
+class TestProbeCache:
+    """视频探测结果缓存测试"""
+
+    def test_repeat_probe_hits_cache(self, monkeypatch):
+        """同一 URL（忽略 #fragment）在 TTL 内只实际探测一次，失败结果不缓存"""
+        from deepdistill.ingestion import video_downloader as vd
+
+        calls = []
+
+        def fake_probe(url):
+            calls.append(url)
+            return {"title": "t", "duration": 3} if "ok" in url else None
+
+        monkeypatch.setattr(vd, "_probe_video_uncached", fake_probe)
+        monkeypatch.setattr(vd, "_probe_cache", {})
+        monkeypatch.setattr(vd, "PROBE_CACHE_ENABLE", True)
+
+        first = vd.probe_video("https://www.youtube.com/watch?v=ok#t=1")
+        first["title"] = "被修改"
+        assert vd.probe_video("https://www.youtube.com/watch?v=ok") == {"title": "t", "duration": 3}
+        assert vd.probe_video("https://www.youtube.com/watch?v=bad") is None
+        assert vd.probe_video("https://www.youtube.com/watch?v=bad") is None
+        assert len(calls) == 3
+
+    def test_batch_probe_keeps_order(self, monkeypatch):
+        """批量探测结果按输入顺序返回，重复 URL 只探测一次，需要 Cookie 的 URL 返回异常实例"""
+        import asyncio
+
+        from deepdistill.ingestion import video_downloader as vd
+
+        calls = []
+
+        def fake_probe(url):
+            calls.append(url)
+            if "cookie" in url:
+                raise vd.VideoCookieRequired("Bilibili", url)
+            if "boom" in url:
+                raise RuntimeError("boom")
+            return {"id": url[-1]} if "ok" in url else None
+
+        monkeypatch.setattr(vd, "probe_video", fake_probe)
+        urls = ["https://a/ok1", "https://a/none", "https://a/ok1", "https://a/cookie", "https://a/boom"]
+        results = asyncio.run(vd.probe_video_batch(urls, max_concurrency=2))
+        assert results[:3] == [{"id": "1"}, None, {"id": "1"}]
+        assert results[0] is not results[2]
+        assert isinstance(results[3], vd.VideoCookieRequired)
+        assert results[4] is None
+        assert sorted(calls) == sorted(set(urls))
+
+
+class TestInjectSourceMeta:
+    """网页来源元信息注入测试"""
+
+    @pytest.mark.parametrize("html,expected_prefix", [
+        ('<HTML lang="zh"><Head><title>x</title>', '<HTML lang="zh"><Head>\n<meta '),
+        ("<html><body>", "<html>\n<head>\n<meta "),
+        ("<header>正文</header>", "<meta "),
+    ])
+    def test_inject(self, html, expected_prefix):
+        from deepdistill.ingestion.web_fetcher import _inject_source_meta
+
+        out = _inject_source_meta(html, "https://example.com/a")
+        assert out.startswith(expected_prefix)
+        assert out.count('name="deepdistill-source-url"') == 1
+
+    @pytest.mark.parametrize("html", [
+        '<HTML lang="zh"><Head><title>标题</title>', "<html><body>正文", "<header>正文</header>",
+    ])
+    def test_bytes_matches_text(self, html):
+        """字节版本注入结果与文本版本按 UTF-8 编码后一致"""
+        from deepdistill.ingestion.web_fetcher import _inject_source_meta, _inject_source_meta_bytes
+
+        url = "https://example.com/文章"
+        assert _inject_source_meta_bytes(html.encode("utf-8"), url) == _inject_source_meta(html, url).encode("utf-8")
+
+    def test_utf8_check(self):
+        """只有声明为 UTF-8（或未声明）且字节合法时才走字节路径"""
+        from deepdistill.ingestion.web_fetcher import _is_valid_utf8
+
+        assert _is_valid_utf8("正文".encode("utf-8"), "UTF8")
+        assert _is_valid_utf8(b"plain", None)
+        assert not _is_valid_utf8("正文".encode("gbk"), "utf-8")
+        assert not _is_valid_utf8("正文".encode("gbk"), "gbk")
+        assert not _is_valid_utf8(b"x", "no-such-charset")
+
+    @pytest.mark.parametrize("content_type,binary", [
+        ("text/html; charset=utf-8", False),
+        ("application/xhtml+xml", False),
+        ("text/plain", False),
+        ("", False),
+        ("application/pdf", True),
+        ("video/mp4", True),
+        ("Image/PNG", True),
+        ("application/octet-stream", True),
+    ])
+    def test_binary_content_type(self, content_type, binary):
+        """明确为二进制的 Content-Type 在读取正文前被拒绝，缺失或文本类型仍按网页处理"""
+        from deepdistill.ingestion.web_fetcher import _is_binary_content_type
+
+        assert _is_binary_content_type(content_type) is binary
+
+
+class TestProbeAndDownload:
+    """探测 + 下载合并为一次 yt-dlp 调用的测试"""
+
+    def _patch(self, monkeypatch, tmp_path, lines, returncode=0, stderr=""):
+        from deepdistill.ingestion import video_downloader as vd
+
+        calls = []
+
+        def fake_run(cmd, timeout, cwd=None, first_line_only=False, stderr_tail=None, on_line=None):
+            calls.append(cmd)
+            for line in lines:
+                on_line(line)
+            return returncode, lines[-1] if lines else "", stderr
+
+        monkeypatch.setattr(vd, "_YTDLP_BIN", "yt-dlp")
+        monkeypatch.setattr(vd, "YTDLP_WORKER_ENABLE", False)
+        monkeypatch.setattr(vd, "_run_ytdlp", fake_run)
+        monkeypatch.setattr(vd, "_find_cookie_file", lambda url: None)
+        return calls
+
+    def test_info_and_file_from_one_run(self, monkeypatch, tmp_path):
+        """一次 yt-dlp 调用同时得到元信息（先回调）与下载文件路径"""
+        from deepdistill.ingestion import video_downloader as vd
+
+        video = tmp_path / "abc.mp4"
+        video.write_bytes(b"x")
+        calls = self._patch(monkeypatch, tmp_path, ['{"title": "t", "duration": 5, "id": "abc"}', str(video)])
+        seen = []
+        file_path, info = vd.probe_and_download("https://www.youtube.com/watch?v=abc", tmp_path, seen.append)
+        assert file_path == video
+        assert info == {"title": "t", "duration": 5, "id": "abc"}
+        assert seen == [info]
+        assert len(calls) == 1 and any(arg.startswith("before_dl:") for arg in calls[0])
+
+    def test_not_a_video_returns_none(self, monkeypatch, tmp_path):
+        """未输出元信息就失败视为非视频 URL；需要 Cookie 时抛出 VideoCookieRequired"""
+        from deepdistill.ingestion import video_downloader as vd
+
+        self._patch(monkeypatch, tmp_path, [], returncode=1, stderr="ERROR: Unsupported URL")
+        assert vd.probe_and_download("https://www.youtube.com/about", tmp_path) is None
+
+        self._patch(monkeypatch, tmp_path, [], returncode=1, stderr="ERROR: Sign in to confirm")
+        with pytest.raises(vd.VideoCookieRequired):
+            vd.probe_and_download("https://www.youtube.com/watch?v=x", tmp_path)
+
+    def test_async_downloads_respect_concurrency(self, monkeypatch, tmp_path):
+        """异步下载并行执行，但同时进行的下载数不超过槽位数"""
+        import asyncio
+        import threading
+        import time
+
+        from deepdistill.ingestion import video_downloader as vd
+
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def fake_download(url, save_dir):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return save_dir / url.rsplit("/", 1)[-1]
+
+        monkeypatch.setattr(vd, "download_video", fake_download)
+        monkeypatch.setattr(vd, "_download_slots", threading.BoundedSemaphore(2))
+
+        async def run():
+            return await asyncio.gather(*(vd.download_video_async(f"https://a/{i}.mp4", tmp_path) for i in range(5)))
+
+        results = asyncio.run(run())
+        assert results == [tmp_path / f"{i}.mp4" for i in range(5)]
+        assert peak[0] == 2
+
+
+class TestYtdlpWorker:
+    """yt-dlp 常驻工作进程协议测试（用模拟协议的脚本代替真实 yt_dlp）"""
+
+    _FAKE_WORKER = """
+import json, os, sys, time
+print(json.dumps({"event": "ready"}), flush=True)
+for line in sys.stdin:
+    req = json.loads(line)
+    if "hang" in req["url"]:
+        time.sleep(30)
+    info = {"title": req["url"], "pid": os.getpid()}
+    print(json.dumps({"event": "info", "info": info}), flush=True)
+    print(json.dumps({"event": "done", "ok": True, "info": info, "filepath": None}), flush=True)
+"""
+
+    def _patch(self, monkeypatch, tmp_path):
+        from deepdistill.ingestion import video_downloader as vd
+
+        script = tmp_path / "worker.py"
+        script.write_text(self._FAKE_WORKER, encoding="utf-8")
+        monkeypatch.setattr(vd, "YTDLP_WORKER_ENABLE", True)
+        monkeypatch.setattr(vd, "_worker_unavailable", False)
+        monkeypatch.setattr(vd, "_YTDLP_WORKER_SCRIPT", script)
+        monkeypatch.setattr(vd, "_idle_workers", [])
+        return vd
+
+    def test_worker_reused_across_calls(self, monkeypatch, tmp_path):
+        """同一空闲工作进程处理后续请求，info 事件先于结果回调"""
+        vd = self._patch(monkeypatch, tmp_path)
+        seen = []
+        first = vd._worker_call("https://a/1", {}, download=True, timeout=20, on_info=seen.append)
+        second = vd._worker_call("https://a/2", {}, download=False, timeout=20)
+        assert seen == [first["info"]]
+        assert first["info"]["pid"] == second["info"]["pid"]
+        vd._close_idle_workers()
+
+    def test_timeout_kills_worker(self, monkeypatch, tmp_path):
+        """超时的请求结束对应工作进程并抛出 TimeoutExpired，该进程不再放回空闲队列"""
+        import subprocess
+
+        vd = self._patch(monkeypatch, tmp_path)
+        with pytest.raises(subprocess.TimeoutExpired):
+            vd._worker_call("https://a/hang", {}, download=True, timeout=1)
+        assert vd._idle_workers == []
@@ -8,6 +8,8 @@ from datetime import datetime, timezone
 
 from deepdistill.pipeline import ProcessingResult
 
+_LONG_TEXT = "测试" * 10000  # 20000 字符；超出编译期常量折叠的长度上限，导入时构造一次
+
 
 class TestProcessingResult:
     """ProcessingResult 数据结构测试"""
@@ -55,7 +57,7 @@ class TestProcessingResult:
 
     def test_to_dict_preserves_full_text(self):
         """to_dict 应保留完整文本（API 层负责截断）"""
-        long_text = "测试" * 10000  # 20000 字符
+        long_text = _LONG_TEXT
         result = ProcessingResult(
             source_path="big.txt",
             source_type="document",
@@ -95,3 +97,530 @@ class TestProcessingResult:
         d = result.to_dict()
         assert d["has_video_analysis"] is True
         assert d["video_analysis"]["scenes"][0]["start"] == 0
+
+
+class TestProcessBatch:
+    """批量处理测试（提取 / AI 提炼以桩函数替换，不调用真实模型）"""
+
+    def test_order_and_errors(self, monkeypatch, tmp_path):
+        """结果按输入顺序返回，不支持的格式为 None，单个文件失败只记录在自己的结果上"""
+        import time
+
+        from deepdistill.pipeline import Pipeline
+
+        pipeline = Pipeline(output_dir=tmp_path, output_format="json")
+
+        def fake_extract(file_path, source_type):
+            # 先提交的文件后完成，验证结果不按完成顺序排列
+            time.sleep(0.05 if file_path.name == "a.txt" else 0.0)
+            if file_path.name == "bad.txt":
+                raise RuntimeError("坏文件")
+            return f"{file_path.stem} 的正文"
+
+        monkeypatch.setattr(pipeline, "_extract_content", fake_extract)
+        monkeypatch.setattr(pipeline, "_ai_analyze", lambda text, v=None, i=None: {"summary": text, "keywords": []})
+
+        files = [tmp_path / "a.txt", tmp_path / "skip.xyz", tmp_path / "bad.txt", tmp_path / "b.txt"]
+        results = pipeline.process_batch(files, max_workers=4)
+
+        assert [r.filename if r else None for r in results] == ["a.txt", None, "bad.txt", "b.txt"]
+        assert results[0].ai_result["summary"] == "a 的正文"
+        assert results[0].output_path and not results[0].errors
+        assert results[2].ai_result is None
+        assert any("坏文件" in e for e in results[2].errors)
+
+    def test_asr_concurrency_limited(self, monkeypatch, tmp_path):
+        """批量处理多个音视频时，Whisper 推理不超过 ASR_CONCURRENCY，音轨解码可与推理重叠但最多预解码一个"""
+        import threading
+        import time
+
+        from deepdistill.pipeline import Pipeline
+        from deepdistill.processing import asr
+
+        monkeypatch.setattr(asr, "_inference_slots", threading.BoundedSemaphore(1))
+        monkeypatch.setattr(asr, "_decode_slots", threading.BoundedSemaphore(2))
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0, "held": 0, "held_peak": 0}
+
+        def fake_extract_audio(file_path):
+            with lock:
+                state["held"] += 1
+                state["held_peak"] = max(state["held_peak"], state["held"])
+            time.sleep(0.01)
+            return file_path
+
+        def fake_transcribe_audio(file_path, audio, cfg):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+                state["held"] -= 1
+            return "转录文本"
+
+        monkeypatch.setattr(asr, "_extract_audio", fake_extract_audio)
+        monkeypatch.setattr(asr, "_transcribe_audio", fake_transcribe_audio)
+        pipeline = Pipeline(output_dir=tmp_path, output_format="json")
+        monkeypatch.setattr(pipeline, "_ai_analyze", lambda text, v=None, i=None: {"summary": text, "keywords": []})
+
+        results = pipeline.process_batch([tmp_path / f"{i}.mp3" for i in range(4)], max_workers=4)
+        assert all(r.extracted_text == "转录文本" for r in results)
+        assert state["peak"] == 1
+        assert state["held_peak"] == 2
+
+    def test_video_style_runs_alongside_extract(self, monkeypatch, tmp_path):
+        """intent=style 的视频：风格分析与文本提取并行执行"""
+        import threading
+
+        from deepdistill.config import cfg
+        from deepdistill.pipeline import Pipeline
+
+        monkeypatch.setattr(cfg, "VIDEO_ANALYSIS_LEVEL", "standard")
+        pipeline = Pipeline(output_dir=tmp_path, output_format="json", intent="style")
+        style_started = threading.Event()
+
+        def fake_extract(file_path, source_type):
+            # 风格分析未同时开始则超时失败
+            assert style_started.wait(timeout=5)
+            return "转录文本"
+
+        def fake_analyze_video(file_path):
+            style_started.set()
+            return {"scenes": []}
+
+        monkeypatch.setattr(pipeline, "_extract_content", fake_extract)
+        monkeypatch.setattr(pipeline, "_analyze_video", fake_analyze_video)
+        monkeypatch.setattr(pipeline, "_ai_analyze", lambda text, v=None, i=None: {"summary": text, "keywords": []})
+
+        result = pipeline.process(tmp_path / "clip.mp4")
+        assert result.extracted_text == "转录文本"
+        assert result.video_analysis == {"scenes": []}
+        assert not result.errors
+
+
+class TestOcrBatch:
+    """多图片 OCR 并发测试（OCR 引擎以桩函数替换）"""
+
+    def test_order_and_concurrency(self, monkeypatch, tmp_path):
+        """结果按输入顺序返回，同时识别的图片数不超过 concurrency 与共享 OCR 名额"""
+        import threading
+        import time
+
+        from deepdistill import processing
+        from deepdistill.processing import ocr
+
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fake_ocr(file_path):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            # 前面的图片更慢，验证结果不按完成顺序排列
+            time.sleep(0.05 if file_path.stem == "0" else 0.01)
+            with lock:
+                state["running"] -= 1
+            return f"第 {file_path.stem} 页"
+
+        monkeypatch.setattr(ocr, "extract_text_from_image", fake_ocr)
+        texts = ocr.extract_text_from_images([tmp_path / f"{i}.png" for i in range(6)], concurrency=2)
+        assert texts == [f"第 {i} 页" for i in range(6)]
+        assert state["peak"] == 2
+
+        # 与 extract_text 共享 OCR 名额：名额只有 1 个时，即使 concurrency 更大也逐张识别
+        state["peak"] = 0
+        monkeypatch.setattr(processing, "_ocr_slots", threading.BoundedSemaphore(1))
+        assert ocr.extract_text_from_images([tmp_path / f"{i}.png" for i in range(4)], concurrency=4)[3] == "第 3 页"
+        assert state["peak"] == 1
+
+    def test_shared_engine_serialises_inference(self, monkeypatch, tmp_path):
+        """多张图片同时识别时，同一缓存引擎的推理调用逐个执行"""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from deepdistill.processing import ocr
+
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        class FakePaddle:
+            def ocr(self, path, cls=False):
+                with lock:
+                    state["running"] += 1
+                    state["peak"] = max(state["peak"], state["running"])
+                time.sleep(0.02)
+                with lock:
+                    state["running"] -= 1
+                return [[[None, ("文字", 0.9)]]]
+
+        monkeypatch.setitem(ocr._ENGINE_CACHE, ("paddleocr", "ch", False), (FakePaddle(), threading.Lock()))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            texts = list(executor.map(lambda i: ocr._paddleocr_extract(tmp_path / f"{i}.png"), range(4)))
+        assert texts == ["文字"] * 4
+        assert state["peak"] == 1
+
+
+class TestResultCache:
+    """结果磁盘缓存测试"""
+
+    def test_extract_reuses_cache_until_file_changes(self, monkeypatch, tmp_path):
+        """同一文件第二次提取命中缓存；文件修改后重新提取"""
+        import os
+
+        from deepdistill import cache, processing
+        from deepdistill.processing import document
+
+        monkeypatch.setattr(cache, "RESULT_CACHE_ENABLE", True)
+        monkeypatch.setenv("DEEPDISTILL_RESULT_CACHE_DIR", str(tmp_path / "cache"))
+        calls = []
+
+        def fake_extract(file_path):
+            calls.append(file_path)
+            return file_path.read_text(encoding="utf-8")
+
+        monkeypatch.setattr(document, "extract_text_from_document", fake_extract)
+        doc = tmp_path / "a.md"
+        doc.write_text("第一版", encoding="utf-8")
+
+        assert processing.extract_text(doc, "document") == "第一版"
+        assert processing.extract_text(doc, "document") == "第一版"
+        assert len(calls) == 1
+
+        doc.write_text("第二版内容", encoding="utf-8")
+        os.utime(doc, ns=(0, doc.stat().st_mtime_ns + 1_000_000))
+        assert processing.extract_text(doc, "document") == "第二版内容"
+        assert len(calls) == 2
+
+    def test_truncated_transcript_not_cached(self, monkeypatch, tmp_path):
+        """转录超时截断的文本不写入缓存；计算精度变化时不复用旧缓存"""
+        from deepdistill import cache, processing
+        from deepdistill.config import cfg
+        from deepdistill.processing import asr
+
+        monkeypatch.setattr(cache, "RESULT_CACHE_ENABLE", True)
+        monkeypatch.setenv("DEEPDISTILL_RESULT_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setattr(cfg, "ASR_DEVICE", "cpu")
+        monkeypatch.setattr(cfg, "ASR_COMPUTE_TYPE", "int8")
+        outputs = [processing.TruncatedText("前半段"), "完整转录", "float32 转录"]
+
+        monkeypatch.setattr(asr, "_extract_audio", lambda file_path: file_path)
+        monkeypatch.setattr(asr, "_transcribe_audio", lambda file_path, audio, got_cfg: outputs.pop(0))
+        audio = tmp_path / "a.mp3"
+        audio.write_bytes(b"fake")
+
+        first = processing.extract_text(audio, "audio")
+        assert first == "前半段" and type(first) is str
+        assert processing.extract_text(audio, "audio") == "完整转录"
+        assert processing.extract_text(audio, "audio") == "完整转录"
+
+        monkeypatch.setattr(cfg, "ASR_COMPUTE_TYPE", "float32")
+        assert processing.extract_text(audio, "audio") == "float32 转录"
+        assert not outputs
+
+
+class TestAnalyzeVideo:
+    """视频分析入口测试"""
+
+    def test_stages_run_concurrently(self, monkeypatch, tmp_path):
+        """镜头切割后各项分析并发执行，单项失败不影响其他项"""
+        import threading
+
+        from deepdistill import video_analysis
+        from deepdistill.config import cfg
+        from deepdistill.video_analysis import (
+            action_detector,
+            cinematography,
+            object_detector,
+            scene_detector,
+            style_analyzer,
+            transition_detector,
+        )
+
+        monkeypatch.setattr(cfg, "VIDEO_ANALYSIS_LEVEL", "full")
+        monkeypatch.setattr(cfg, "VIDEO_STAGE_PROCESSES", 0)  # 替换的分析函数只在本进程内生效
+        scenes = [{"scene_id": 1}]
+        barrier = threading.Barrier(5, timeout=5)
+
+        keyframes = {1: object()}
+
+        def stage(value, shared=False):
+            def run(file_path, got_scenes, **kwargs):
+                assert got_scenes is scenes
+                # 物体/动作/拍摄手法共用一次预解码的关键帧
+                assert kwargs == ({"keyframes": keyframes} if shared else {})
+                barrier.wait()  # 5 项未同时运行则超时失败
+                if value is None:
+                    raise RuntimeError("boom")
+                return value
+            return run
+
+        monkeypatch.setattr(scene_detector, "detect_scenes", lambda file_path: scenes)
+        monkeypatch.setattr(scene_detector, "extract_keyframe_array", lambda file_path, got_scenes: keyframes)
+        monkeypatch.setattr(style_analyzer, "analyze_style", stage({"pacing": "快"}))
+        monkeypatch.setattr(object_detector, "detect_objects", stage(None, shared=True))
+        monkeypatch.setattr(action_detector, "detect_actions", stage([{"scene_id": 1}], shared=True))
+        monkeypatch.setattr(cinematography, "analyze_cinematography", stage({"summary": "稳定"}, shared=True))
+        monkeypatch.setattr(transition_detector, "detect_transitions", stage([]))
+
+        result = video_analysis.analyze_video(tmp_path / "v.mp4")
+        assert result["analysis_level"] == "full"
+        assert result["scenes"] is scenes
+        assert result["style"] == {"pacing": "快"}
+        assert result["objects"] == []
+        assert result["actions"] == [{"scene_id": 1}]
+        assert result["cinematography"] == {"summary": "稳定"}
+
+    def test_process_pool_stage_matches_in_process(self, tmp_path):
+        """进程池中执行的转场检测与本进程内执行结果一致"""
+        import cv2
+        import numpy as np
+
+        from deepdistill.video_analysis import _pool, transition_detector
+
+        path = tmp_path / "v.avi"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+        for i in range(40):
+            writer.write(np.full((48, 64, 3), (i // 20) * 200, np.uint8))
+        writer.release()
+        scenes = [
+            {"scene_id": 1, "start_frame": 0, "end_frame": 20, "start_time": 0.0, "end_time": 2.0},
+            {"scene_id": 2, "start_frame": 20, "end_frame": 40, "start_time": 2.0, "end_time": 4.0},
+        ]
+
+        expected = transition_detector.detect_transitions(path, scenes)
+        assert _pool.run("transition_detector", "detect_transitions", path, scenes) == expected
+
+    def test_off_level_returns_skeleton(self, monkeypatch, tmp_path):
+        """关闭分析时返回带 analysis_level 的空结果，不调用任何分析器"""
+        from deepdistill import video_analysis
+        from deepdistill.config import cfg
+        from deepdistill.video_analysis import scene_detector
+
+        monkeypatch.setattr(cfg, "VIDEO_ANALYSIS_LEVEL", "off")
+        monkeypatch.setattr(scene_detector, "detect_scenes", lambda file_path: pytest.fail("不应调用"))
+        result = video_analysis.analyze_video(tmp_path / "v.mp4")
+        assert result["analysis_level"] == "off"
+        assert result["scenes"] == [] and result["style"] == {}
+
+
+class TestMapScenes:
+    """视频逐场景并行调度测试"""
+
+    def test_order_and_skip(self, tmp_path):
+        """结果按场景顺序返回，返回 None 的场景被丢弃，每个线程使用自己的 VideoCapture"""
+        import threading
+        import time
+
+        from deepdistill.video_analysis._decode import map_scenes
+
+        seen = {}
+
+        def analyze(scene, cap):
+            seen.setdefault(threading.get_ident(), set()).add(id(cap))
+            time.sleep(0.02 if scene["scene_id"] == 0 else 0.0)
+            return None if scene["scene_id"] == 2 else scene["scene_id"] * 10
+
+        scenes = [{"scene_id": i} for i in range(6)]
+        results = map_scenes(tmp_path / "missing.mp4", scenes, analyze, workers=3)
+        assert results == [0, 10, 30, 40, 50]
+        assert all(len(caps) == 1 for caps in seen.values())
+
+    def test_read_frame_matches_seek(self, tmp_path):
+        """顺序跳帧与直接 seek 读到的帧一致（含向后跳转与越界）"""
+        import cv2
+        import numpy as np
+
+        from deepdistill.video_analysis._decode import read_frame
+
+        path = str(tmp_path / "v.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+        for i in range(80):
+            writer.write(np.full((48, 64, 3), i * 3, np.uint8))
+        writer.release()
+
+        cap, ref = cv2.VideoCapture(path), cv2.VideoCapture(path)
+        for idx in [3, 4, 20, 70, 10, 79, 79, 200]:
+            ret, frame = read_frame(cap, idx)
+            ref.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            ref_ret, ref_frame = ref.read()
+            assert ret == ref_ret
+            if ret:
+                assert np.array_equal(frame, ref_frame)
+        cap.release()
+        ref.release()
+
+    def test_fallback_scene_cuts_localized(self, tmp_path):
+        """粗扫描 + 二分定位的切换点与逐采样点比较一致（含同一粗步长内的两次切换）"""
+        import cv2
+        import numpy as np
+
+        from deepdistill.video_analysis.scene_detector import _fallback_detect_scenes
+
+        path = tmp_path / "v.avi"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+        levels = {0: 0, 40: 80, 100: 160, 110: 240, 200: 120}
+        level = 0
+        for i in range(230):
+            level = levels.get(i, level)
+            writer.write(np.full((48, 64, 3), level, np.uint8))
+        writer.release()
+
+        # 采样间隔 6 帧：切换点对齐到其后的第一个采样点
+        scenes = _fallback_detect_scenes(path)
+        assert [s["end_frame"] for s in scenes] == [42, 102, 114, 204, 230]
+        assert [s["start_frame"] for s in scenes] == [0, 42, 102, 114, 204]
+
+    def test_keyframe_array_shared_and_bounded(self, tmp_path):
+        """关键帧预解码按场景返回中间帧，超出内存上限的场景不缓存；分析器缺失时自行读取"""
+        import cv2
+        import numpy as np
+
+        from deepdistill.video_analysis._decode import scene_keyframe
+        from deepdistill.video_analysis.scene_detector import extract_keyframe_array
+
+        path = tmp_path / "v.avi"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+        for i in range(40):
+            writer.write(np.full((48, 64, 3), i * 6, np.uint8))
+        writer.release()
+        scenes = [{"scene_id": i + 1, "start_frame": i * 10, "end_frame": i * 10 + 10} for i in range(4)]
+
+        keyframes = extract_keyframe_array(path, scenes)
+        assert sorted(keyframes) == [1, 2, 3, 4]
+        cap = cv2.VideoCapture(str(path))
+        for scene in scenes:
+            assert np.array_equal(scene_keyframe(scene, cap), keyframes[scene["scene_id"]])
+        cap.release()
+
+        # 上限不足一帧：全部不缓存
+        assert extract_keyframe_array(path, scenes, max_mb=0) == {}
+
+    def test_transition_frames_decoded_once(self, tmp_path, monkeypatch):
+        """相邻转场窗口重叠时，每帧只解码一次（区域分析与擦除检测共用缓存）"""
+        import cv2
+        import numpy as np
+
+        from deepdistill.video_analysis import transition_detector
+
+        path = tmp_path / "v.avi"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+        for i in range(60):
+            writer.write(np.full((48, 64, 3), (i // 20) * 100, np.uint8))
+        writer.release()
+        scenes = [
+            {
+                "scene_id": i + 1, "start_frame": i * 20, "end_frame": i * 20 + 20,
+                "start_time": i * 2.0, "end_time": i * 2.0 + 2,
+            }
+            for i in range(3)
+        ]
+
+        reads = []
+        real_read = transition_detector.read_frame
+
+        def counting_read(cap, idx):
+            reads.append(idx)
+            return real_read(cap, idx)
+
+        monkeypatch.setattr(transition_detector, "read_frame", counting_read)
+        transitions = transition_detector.detect_transitions(path, scenes)
+        assert len(transitions) == 2
+        assert len(reads) == len(set(reads))
+
+    def test_video_info_cached_per_file(self, tmp_path):
+        """元信息按文件缓存，文件变化后重新读取"""
+        import cv2
+        import numpy as np
+
+        from deepdistill.video_analysis._decode import _probe_video, video_info
+
+        path = tmp_path / "v.avi"
+        for frames in (12, 20):
+            writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+            for _ in range(frames):
+                writer.write(np.zeros((48, 64, 3), np.uint8))
+            writer.release()
+            hits = _probe_video.cache_info().hits
+            assert video_info(path) == (10.0, frames)
+            assert video_info(path) == (10.0, frames)
+            assert _probe_video.cache_info().hits == hits + 1
+        assert video_info(tmp_path / "missing.avi") is None
+
+    def test_infer_action_from_landmarks(self):
+        """按 BlazePose 关节索引推断动作（不依赖 MediaPipe，直接构造 33 个关节点）"""
+        from types import SimpleNamespace
+
+        from deepdistill.video_analysis.action_detector import _infer_action
+
+        def pose(**ys):
+            lms = [SimpleNamespace(x=0.5, y=0.5, visibility=1.0) for _ in range(33)]
+            for idx, y in ys.items():
+                lms[int(idx[1:])].y = y
+            return lms
+
+        # 肩 0.3、髋 0.6、膝 0.8
+        body = {"i11": 0.3, "i12": 0.3, "i23": 0.6, "i24": 0.6, "i25": 0.8, "i26": 0.8}
+        assert _infer_action(pose(**body, i15=0.1, i16=0.1)) == "举手/欢呼"
+        assert _infer_action(pose(**body, i15=0.1, i16=0.5)) == "手势/指向"
+        assert _infer_action(pose(**body, i15=0.5, i16=0.5)) == "坐姿"
+        assert _infer_action(pose(**{**body, "i23": 0.35, "i24": 0.35}, i15=0.5, i16=0.5)) == "弯腰/俯身"
+
+    def test_dominant_colors_by_frequency(self):
+        """主色调按像素占比降序返回 RGB，颜色数不超过画面中实际的颜色"""
+        import numpy as np
+
+        from deepdistill.video_analysis.style_analyzer import _extract_dominant_colors
+
+        frame = np.zeros((100, 100, 3), np.uint8)
+        frame[:60] = (255, 0, 0)      # BGR 蓝
+        frame[60:90] = (0, 0, 200)    # BGR 红
+        frame[90:] = (10, 200, 10)    # BGR 绿
+        assert _extract_dominant_colors(frame, k=3) == [[0, 0, 255], [200, 0, 0], [10, 200, 10]]
+        assert _extract_dominant_colors(np.full((8, 8, 3), 7, np.uint8), k=3) == [[7, 7, 7]]
+
+    def test_median_flow_detects_pan(self):
+        """稀疏光流能测出整体平移，纯色画面视为无运动"""
+        import numpy as np
+
+        from deepdistill.video_analysis.cinematography import _median_flow
+
+        rng = np.random.default_rng(0)
+        base = (rng.random((90, 170)) * 255).astype(np.uint8)
+        dx, dy = _median_flow(base[:, 5:165], base[:, 2:162])
+        assert abs(dx - 3) < 0.5 and abs(dy) < 0.5
+        flat = np.full((90, 160), 128, np.uint8)
+        assert _median_flow(flat, flat) == (0.0, 0.0)
+
+    def test_dnn_faces_batched_per_scene(self, tmp_path, monkeypatch):
+        """DNN 人脸检测对所有场景关键帧只调用一次，结果按场景回填景别与人数"""
+        import cv2
+        import numpy as np
+
+        from deepdistill.video_analysis import action_detector, cinematography
+
+        path = tmp_path / "v.avi"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+        for i in range(40):
+            writer.write(np.full((48, 64, 3), i * 5, np.uint8))
+        writer.release()
+        scenes = [{"scene_id": i, "start_frame": i * 10, "end_frame": i * 10 + 9} for i in range(4)]
+
+        calls = []
+
+        def fake_detect(images):
+            calls.append(len(images))
+            assert all(img.shape == (300, 300, 3) for img in images)
+            return [[0.2], [], [0.02, 0.08], []]
+
+        for mod in (cinematography, action_detector):
+            monkeypatch.setattr(mod, "_face_net", lambda: object())
+            monkeypatch.setattr(mod, "_detect_faces_dnn", fake_detect)
+
+        shots = cinematography.analyze_cinematography(path, scenes)["shot_types"]
+        assert [s["shot_type"] for s in shots] == ["特写", "远景", "近景", "远景"]
+        actions = action_detector._opencv_detect(path, scenes)
+        assert [a["person_count"] for a in actions] == [1, 0, 2, 0]
+        assert set(actions[0]) == {"scene_id", "person_count", "poses", "action_type"}
+        assert calls == [4, 4]